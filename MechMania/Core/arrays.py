@@ -0,0 +1,187 @@
+import ctypes
+import numpy as np
+from core.conf import NUM_PLAYERS
+from core.state import (
+    GameState, PlayerState, BallState, BallPossessionState, BallStagnationState,
+    BallPossessed, BallPassing, Score, PlayerAction, _BallPossessionUnion,
+)
+from core.util import Vec2
+
+# NumPy mirrors of the structs in core/state.py. Offsets are spelled out rather
+# than derived so that `check_layout` catches the engine changing a struct.
+
+VEC2_DTYPE = np.dtype(("<f4", (2,)))
+
+BALL_DTYPE = np.dtype({
+    "names": ["pos", "vel", "radius"],
+    "formats": [VEC2_DTYPE, VEC2_DTYPE, "<f4"],
+    "offsets": [0, 8, 16],
+    "itemsize": 20,
+})
+
+BALL_POSSESSED_DTYPE = np.dtype({
+    "names": ["owner", "team", "capture_ticks"],
+    "formats": ["<u4", "u1", "<u4"],
+    "offsets": [0, 4, 8],
+    "itemsize": 12,
+})
+
+BALL_PASSING_DTYPE = np.dtype({
+    "names": ["team"],
+    "formats": ["u1"],
+    "offsets": [0],
+    "itemsize": 1,
+})
+
+BALL_POSSESSION_UNION_DTYPE = np.dtype({
+    "names": ["possessed", "passing"],
+    "formats": [BALL_POSSESSED_DTYPE, BALL_PASSING_DTYPE],
+    "offsets": [0, 0],
+    "itemsize": 12,
+})
+
+BALL_POSSESSION_DTYPE = np.dtype({
+    "names": ["type", "data"],
+    "formats": ["u1", BALL_POSSESSION_UNION_DTYPE],
+    "offsets": [0, 4],
+    "itemsize": 16,
+})
+
+BALL_STAGNATION_DTYPE = np.dtype({
+    "names": ["center", "tick"],
+    "formats": [VEC2_DTYPE, "<u4"],
+    "offsets": [0, 8],
+    "itemsize": 12,
+})
+
+PLAYER_DTYPE = np.dtype({
+    "names": ["id", "pos", "dir", "speed", "radius", "pickup_radius"],
+    "formats": ["<u4", VEC2_DTYPE, VEC2_DTYPE, "<f4", "<f4", "<f4"],
+    "offsets": [0, 4, 12, 20, 24, 28],
+    "itemsize": 32,
+})
+
+SCORE_DTYPE = np.dtype({
+    "names": ["self", "other"],
+    "formats": ["<u4", "<u4"],
+    "offsets": [0, 4],
+    "itemsize": 8,
+})
+
+GAME_STATE_DTYPE = np.dtype({
+    "names": ["tick", "ball", "_ball_possession", "ball_stagnation", "players", "score"],
+    "formats": [
+        "<u4",
+        BALL_DTYPE,
+        BALL_POSSESSION_DTYPE,
+        BALL_STAGNATION_DTYPE,
+        (PLAYER_DTYPE, (2 * NUM_PLAYERS,)),
+        SCORE_DTYPE,
+    ],
+    "offsets": [0, 4, 24, 40, 52, 308],
+    "itemsize": 316,
+})
+
+PLAYER_ACTION_DTYPE = np.dtype({
+    "names": ["dir", "has_pass", "ball_pass"],
+    "formats": [VEC2_DTYPE, "u1", VEC2_DTYPE],
+    "offsets": [0, 8, 12],
+    "itemsize": 20,
+})
+
+_MIRRORS = {
+    GameState: GAME_STATE_DTYPE,
+    BallState: BALL_DTYPE,
+    BallPossessionState: BALL_POSSESSION_DTYPE,
+    _BallPossessionUnion: BALL_POSSESSION_UNION_DTYPE,
+    BallPossessed: BALL_POSSESSED_DTYPE,
+    BallPassing: BALL_PASSING_DTYPE,
+    BallStagnationState: BALL_STAGNATION_DTYPE,
+    PlayerState: PLAYER_DTYPE,
+    Score: SCORE_DTYPE,
+    PlayerAction: PLAYER_ACTION_DTYPE,
+}
+
+
+def _check_field(path: str, ctype, dtype: np.dtype):
+    assert ctypes.sizeof(ctype) == dtype.itemsize, \
+        f"{path}: ctypes size {ctypes.sizeof(ctype)} != dtype size {dtype.itemsize}"
+
+    if ctype is Vec2:
+        assert dtype == VEC2_DTYPE, f"{path}: expected a float32 pair"
+        assert Vec2.x.offset == 0 and Vec2.y.offset == 4, f"{path}: Vec2 layout changed"
+        return
+
+    if issubclass(ctype, ctypes.Array):
+        assert dtype.subdtype is not None, f"{path}: ctypes array mirrored by a scalar"
+        base, shape = dtype.subdtype
+        assert shape == (ctype._length_,), f"{path}: length {ctype._length_} != {shape}"
+        _check_field(f"{path}[]", ctype._type_, base)
+        return
+
+    if issubclass(ctype, (ctypes.Structure, ctypes.Union)):
+        assert _MIRRORS.get(ctype) == dtype, f"{path}: no dtype mirror for {ctype.__name__}"
+        names = [f[0] for f in ctype._fields_]
+        assert list(dtype.names) == names, f"{path}: fields {names} != {list(dtype.names)}"
+        for name, field_type in ((f[0], f[1]) for f in ctype._fields_):
+            field_dtype, offset = dtype.fields[name][:2]
+            expected = getattr(ctype, name).offset
+            assert offset == expected, f"{path}.{name}: offset {offset} != ctypes offset {expected}"
+            _check_field(f"{path}.{name}", field_type, field_dtype)
+        return
+
+    # Plain scalar, compare kind and width
+    kind = "f" if ctype in (ctypes.c_float, ctypes.c_double) else "u"
+    assert dtype.kind == kind, f"{path}: dtype kind {dtype.kind} != {kind}"
+
+
+def check_layout():
+    """Asserts the NumPy dtypes match the ctypes structs field for field"""
+    _check_field("GameState", GameState, GAME_STATE_DTYPE)
+    _check_field("PlayerAction", PlayerAction, PLAYER_ACTION_DTYPE)
+
+
+class StateArrays:
+    """Read-only NumPy views of a `GameState` living in shared memory.
+
+    No data is copied: the arrays alias the mmap, so they always show the
+    state of the current tick.
+    """
+
+    def __init__(self, buffer, offset: int = 0):
+        self.raw = np.frombuffer(buffer, dtype=GAME_STATE_DTYPE, count=1, offset=offset)
+
+        players = self.raw["players"][0]
+        ball = self.raw["ball"]
+        possession = self.raw["_ball_possession"]
+
+        self.pos = players["pos"]                       # (8, 2)
+        self.dir = players["dir"]                       # (8, 2)
+        self.speed = players["speed"]                   # (8,)
+        self.ball_pos = ball["pos"][0]                  # (2,)
+        self.ball_vel = ball["vel"][0]                  # (2,)
+        self._tick = self.raw["tick"]
+        self._possession_type = possession["type"]
+        self._owner = possession["data"]["possessed"]["owner"]
+
+        for view in (self.pos, self.dir, self.speed, self.ball_pos, self.ball_vel):
+            view.flags.writeable = False
+
+    @classmethod
+    def from_game_state(cls, game: GameState) -> "StateArrays":
+        return cls(game)
+
+    @property
+    def tick(self) -> int:
+        return int(self._tick[0])
+
+    @property
+    def possession_type(self) -> int:
+        return int(self._possession_type[0])
+
+    @property
+    def owner(self) -> int:
+        return int(self._owner[0])
+
+
+check_layout()
@@ -66,3 +66,35 @@ class GameConfig(ctypes.Structure):
         ("field", FieldConfig),
         ("goal", GoalConfig),
     ]
+
+def default_config() -> GameConfig:
+    """Stand-in config for running strategies offline (benchmarks, local
+    simulation). The real engine sends its own in the handshake."""
+    return GameConfig(
+        max_ticks=7200,
+        endgame_ticks=600,
+        spawn_ball_dist=50.0,
+        ball=BallConfig(
+            friction=0.02,
+            radius=5.0,
+            capture_ticks=50,
+            stagnation_radius=20.0,
+            stagnation_ticks=300,
+        ),
+        player=PlayerConfig(
+            radius=10.0,
+            pickup_radius=15.0,
+            speed=4.0,
+            pass_speed=12.0,
+            pass_error=2.0,
+            possession_slowdown=0.75,
+        ),
+        field=FieldConfig(width=1000, height=600),
+        goal=GoalConfig(
+            normal_height=200,
+            thickness=20,
+            penalty_box_width=150,
+            penalty_box_height=300,
+            penalty_box_radius=50,
+        ),
+    )
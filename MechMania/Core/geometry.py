@@ -0,0 +1,107 @@
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+from core.conf import GameConfig
+from core.util import Vec2, FastVec2
+
+# Everything here depends only on GameConfig, so it is built once when the
+# handshake delivers the config and shared read-only by every tick after.
+
+
+class Goal(NamedTuple):
+    center: FastVec2
+    top: FastVec2       # post with the smaller y
+    bottom: FastVec2
+    height: float
+
+
+class Box(NamedTuple):
+    left: float
+    right: float
+    top: float
+    bottom: float
+
+    def contains(self, point) -> bool:
+        return self.left <= point.x <= self.right and self.top <= point.y <= self.bottom
+
+
+class Wall(NamedTuple):
+    """The line `axis == offset` (axis 0 is x, 1 is y)"""
+    axis: int
+    offset: float
+
+    def mirror(self, point) -> FastVec2:
+        if self.axis == 0:
+            return FastVec2(2.0 * self.offset - point.x, point.y)
+        return FastVec2(point.x, 2.0 * self.offset - point.y)
+
+
+def _goal(x: float, center_y: float, height: float) -> Goal:
+    return Goal(
+        FastVec2(x, center_y),
+        FastVec2(x, center_y - height * 0.5),
+        FastVec2(x, center_y + height * 0.5),
+        height,
+    )
+
+
+class Geometry(NamedTuple):
+    """Field geometry in our frame: our goal on the left (x = 0), theirs on the right"""
+    field: FastVec2                                 # bottom right corner
+    center: FastVec2
+    corners: Tuple[FastVec2, FastVec2, FastVec2, FastVec2]  # TL, TR, BL, BR
+    own_goal: Goal
+    enemy_goal: Goal
+    endgame_own_goal: Goal                          # goals span the whole side in endgame
+    endgame_enemy_goal: Goal
+    own_box: Box
+    enemy_box: Box
+    walls: Tuple[Wall, Wall, Wall, Wall]            # top, bottom, left, right
+    max_ticks: int
+    formations: Dict[Tuple[Tuple[float, float], ...], Tuple[Vec2, ...]]
+    spots: Dict[Tuple[float, float], FastVec2]
+
+    @classmethod
+    def from_config(cls, config: GameConfig) -> "Geometry":
+        w = float(config.field.width)
+        h = float(config.field.height)
+        goal = config.goal
+        box_top = h * 0.5 - goal.penalty_box_height * 0.5
+        box_bottom = h * 0.5 + goal.penalty_box_height * 0.5
+
+        return cls(
+            field=FastVec2(w, h),
+            center=FastVec2(w * 0.5, h * 0.5),
+            corners=(FastVec2(0.0, 0.0), FastVec2(w, 0.0), FastVec2(0.0, h), FastVec2(w, h)),
+            own_goal=_goal(0.0, h * 0.5, goal.normal_height),
+            enemy_goal=_goal(w, h * 0.5, goal.normal_height),
+            endgame_own_goal=_goal(0.0, h * 0.5, h),
+            endgame_enemy_goal=_goal(w, h * 0.5, h),
+            own_box=Box(0.0, float(goal.penalty_box_width), box_top, box_bottom),
+            enemy_box=Box(w - goal.penalty_box_width, w, box_top, box_bottom),
+            walls=(Wall(1, 0.0), Wall(1, h), Wall(0, 0.0), Wall(0, w)),
+            max_ticks=config.max_ticks,
+            formations={},
+            spots={},
+        )
+
+    def goals(self, tick: int) -> Tuple[Goal, Goal]:
+        """(own, enemy) goal mouths at `tick`, see `GoalConfig.current_height`"""
+        if tick <= self.max_ticks:
+            return self.own_goal, self.enemy_goal
+        return self.endgame_own_goal, self.endgame_enemy_goal
+
+    def formation(self, slots: Sequence[Tuple[float, float]]) -> List[Vec2]:
+        """Reset positions from (x, y) fractions of the field, cached per slot table"""
+        key = tuple(slots)
+        positions = self.formations.get(key)
+        if positions is None:
+            positions = tuple(Vec2(self.field.x * fx, self.field.y * fy) for fx, fy in key)
+            self.formations[key] = positions
+        return list(positions)
+
+    def spot(self, fraction: Tuple[float, float]) -> FastVec2:
+        """The point at (x, y) fractions of the field, cached. Treat it as read-only"""
+        point = self.spots.get(fraction)
+        if point is None:
+            point = FastVec2(self.field.x * fraction[0], self.field.y * fraction[1])
+            self.spots[fraction] = point
+        return point
@@ -1,10 +1,15 @@
+import time
 import ctypes
 import mmap
 import asyncio
-from typing import Callable, List, Union, assert_never
+from typing import Callable, List, Optional, Union, assert_never
 from pathlib import Path
-from core.state import Score, GameState, PlayerAction, Vec2
+from core.state import Score, GameState, PlayerAction, ActionSlot, Vec2
 from core.conf import GameConfig, NUM_PLAYERS
+from core.geometry import Geometry
+from core.wake import WakeListener
+from core.sched import PollScheduler
+from core.replay import ReplayRecorder
 
 
 HANDSHAKE_BOT = ctypes.c_uint64(0xabe119c019aaffcc)
@@ -53,18 +58,45 @@ class Shm(ctypes.Structure):
         ("protocol", Protocol),
     ]
 
+_ZERO_RESET = bytes(ctypes.sizeof(ResetResponse))
+_ZERO_TICK = bytes(ctypes.sizeof(TickResponse))
+
 
 class Strategy:
+    """Callbacks the channel drives.
+
+    With `in_place=True`, `on_tick(game, actions)` fills the channel's
+    `ActionSlot`s directly instead of returning a list of `PlayerAction`s.
+    Slots start zeroed every tick.
+    """
+
     def __init__(
             self,
             on_reset: Callable[[Score], List[Vec2]],
-            on_tick: Callable[[GameState], List[PlayerAction]]
+            on_tick: Callable[..., Optional[List[PlayerAction]]],
+            in_place: bool = False,
     ):
         self.on_reset = on_reset
         self.on_tick = on_tick
+        self.in_place = in_place
+
 
+async def poll(
+        shm_view: Shm,
+        expected_status: int,
+        waker: Optional[WakeListener] = None,
+        scheduler: Optional[PollScheduler] = None,
+):
+    if waker is not None:
+        # Event-driven: sleep until the engine signals, re-checking on timeout
+        while shm_view.sync != expected_status:
+            await waker.wait()
+        return
+
+    if scheduler is not None:
+        await scheduler.wait(shm_view, expected_status)
+        return
 
-async def poll(shm_view: Shm, expected_status: int):
     i = 0
     while True:
         if shm_view.sync == expected_status:
@@ -84,29 +116,74 @@ class EngineStatus:
     Busy = 1
     Finished = 2
 
-config: None | GameConfig
-team: None | int
+config: None | GameConfig = None
+team: None | int = None
+geometry: None | Geometry = None
+state_arrays = None
 
 def get_config() -> GameConfig:
     global config
     assert config is not None
     return config
 
+def get_geometry() -> Geometry:
+    """Field geometry derived from the handshake config"""
+    global geometry
+    assert geometry is not None
+    return geometry
+
 def get_real_team() -> int:
     global team
     assert team is not None
     return team
 
+def set_config(new_config: GameConfig, new_team: int = 0):
+    """Installs a config outside of a handshake, for running strategies offline.
+    Installing the config object that is already current (both sides of a
+    batch take turns) keeps its Geometry, and with it every cache keyed on
+    it; to change the field, install a new config"""
+    global config, team, geometry
+    if new_config is not config or geometry is None:
+        geometry = Geometry.from_config(new_config)
+    config = new_config
+    team = new_team
+
+def get_state_arrays():
+    """NumPy views of the current tick's GameState (see core.arrays), if NumPy is installed"""
+    global state_arrays
+    assert state_arrays is not None
+    return state_arrays
+
 
 class EngineChannel:
-    def __init__(self, path: Union[str, Path]):
+    def __init__(
+            self,
+            path: Union[str, Path],
+            wake_path: Union[str, Path, None] = None,
+            adaptive: bool = True,
+            recorder: Optional[ReplayRecorder] = None,
+    ):
         self.path = Path(path)
         self.file = open(self.path, "r+b")
         self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_WRITE)
+        # Without a wakeup FIFO we fall back to polling the sync byte, either
+        # on a learned schedule or on the fixed one in `poll`
+        self.waker = WakeListener.from_fifo(wake_path) if wake_path is not None else None
+        self.scheduler = PollScheduler() if adaptive else None
+        # Opt-in replay of every message and answer; the channel closes it
+        self.recorder = recorder
+
+        self.shm: Optional[Shm] = None
 
     @classmethod
-    def from_path(cls, path: Union[str, Path]) -> "EngineChannel":
-        return cls(path)
+    def from_path(
+            cls,
+            path: Union[str, Path],
+            wake_path: Union[str, Path, None] = None,
+            adaptive: bool = True,
+            recorder: Optional[ReplayRecorder] = None,
+    ) -> "EngineChannel":
+        return cls(path, wake_path, adaptive, recorder)
 
     def __enter__(self):
         return self
@@ -115,52 +192,129 @@ class EngineChannel:
         self.close()
 
     def close(self):
+        if getattr(self, 'waker', None) is not None:
+            self.waker.close()
+        # The views pin the mmap, they have to go before it can close
+        self._unbind()
+        if getattr(self, 'recorder', None) is not None:
+            self.recorder.close()
         if hasattr(self, 'mmap'):
             self.mmap.close()
         if hasattr(self, 'file'):
             self.file.close()
 
+    def _bind(self):
+        """Creates the persistent views into the mmap; the tick path only reuses them"""
+        self.shm = Shm.from_buffer(self.mmap, 0)
+        self.protocol = self.shm.protocol
+        data = self.protocol.data
+        self.reset_msg = data.reset_msg
+        self.reset_response = data.reset_response
+        self.tick_msg = data.tick_msg
+
+        # Responses share the union with the message the strategy is still
+        # reading, so they are built in a private buffer and copied over in
+        # one go once the strategy returns
+        offset = Shm.protocol.offset + Protocol.data.offset
+        self.response = TickResponse()
+        self.response_bytes = memoryview(self.response).cast("B")
+        self.response_out = memoryview(self.mmap)[offset:offset + ctypes.sizeof(TickResponse)]
+        self.reset_out = memoryview(self.mmap)[offset:offset + ctypes.sizeof(ResetResponse)]
+        # Message bytes for the recorder, taken before the response overwrites them
+        self.state_bytes = memoryview(self.mmap)[offset:offset + ctypes.sizeof(TickMsg)]
+        self.reset_msg_bytes = memoryview(self.mmap)[offset:offset + ctypes.sizeof(ResetMsg)]
+        self.actions = [ActionSlot(self.response, i) for i in range(NUM_PLAYERS)]
+
+        # NumPy is optional for the bot, the ctypes path works without it
+        global state_arrays
+        try:
+            from core.arrays import StateArrays
+            state_arrays = self.arrays = StateArrays(self.mmap, offset)
+        except ImportError:
+            state_arrays = self.arrays = None
+
+    def _unbind(self):
+        global state_arrays
+        if state_arrays is not None and state_arrays is getattr(self, "arrays", None):
+            state_arrays = None
+        self.__dict__.pop("arrays", None)
+        for name in ("response_out", "reset_out", "response_bytes", "state_bytes", "reset_msg_bytes"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        for name in ("actions", "response", "tick_msg", "reset_response", "reset_msg", "protocol"):
+            self.__dict__.pop(name, None)
+        self.shm = None
+
     async def handle_handshake(self):
-        shm = Shm.from_buffer(self.mmap, 0)
-        await poll(shm, EngineStatus.Ready)
+        if self.shm is None:
+            self._bind()
+        shm = self.shm
+        await poll(shm, EngineStatus.Ready, self.waker, self.scheduler)
 
         assert shm.protocol.type == ProtocolId.HandshakeMsg
 
-        global config, team
+        global config, team, geometry
         team_value = shm.protocol.data.handshake_msg.team
         config = GameConfig()
         ctypes.pointer(config)[0] = shm.protocol.data.handshake_msg.config
+        geometry = Geometry.from_config(config)
 
         # Store the team value globally
         team = team_value
+        if self.recorder is not None:
+            self.recorder.config(team_value, config)
 
         shm.protocol.data.handshake_response = HANDSHAKE_BOT
         shm.protocol.type = ProtocolId.HandshakeResponse
         shm.sync = EngineStatus.Busy
+        if self.scheduler is not None:
+            self.scheduler.release()
 
         return team_value
 
 
     async def handle_msg(self, strategy: Strategy):
-        shm = Shm.from_buffer(self.mmap, 0)
-
-        await poll(shm, EngineStatus.Ready)
-
-        match shm.protocol.type:
+        if self.shm is None:
+            self._bind()
+        await poll(self.shm, EngineStatus.Ready, self.waker, self.scheduler)
+        self.respond(strategy)
+
+    def respond(self, strategy: Strategy):
+        """Answers the message in the mmap. Only reuses the views bound in
+        `_bind`: with an in-place strategy it allocates nothing at all"""
+        shm = self.shm
+        protocol = self.protocol
+        recorder = self.recorder
+
+        match protocol.type:
             case ProtocolId.ResetMsg:
-                score = shm.protocol.data.reset_msg
-                response = strategy.on_reset(score)
-                shm.protocol.data.reset_response = (Vec2 * NUM_PLAYERS)()
+                if recorder is not None:
+                    score = bytes(self.reset_msg_bytes)
+                    start = time.perf_counter_ns()
+                response = strategy.on_reset(self.reset_msg)
+                self.reset_out[:] = _ZERO_RESET
                 for i in range(min(len(response), NUM_PLAYERS)):
-                    shm.protocol.data.reset_response[i] = response[i]
+                    self.reset_response[i] = response[i].to_c()
+                if recorder is not None:
+                    recorder.reset(score, self.reset_out, time.perf_counter_ns() - start)
             case ProtocolId.TickMsg:
-                msg = shm.protocol.data.tick_msg
-                response = strategy.on_tick(msg)
-                shm.protocol.data.tick_response = (PlayerAction * NUM_PLAYERS)()
-                for i in range(min(len(response), NUM_PLAYERS)):
-                    shm.protocol.data.tick_response[i] = response[i]
+                if recorder is not None:
+                    start = time.perf_counter_ns()
+                self.response_bytes[:] = _ZERO_TICK
+                if strategy.in_place:
+                    strategy.on_tick(self.tick_msg, self.actions)
+                else:
+                    response = strategy.on_tick(self.tick_msg)
+                    for i in range(min(len(response), NUM_PLAYERS)):
+                        self.response[i] = response[i]
+                if recorder is not None:
+                    recorder.tick(self.state_bytes, self.response_bytes, time.perf_counter_ns() - start)
+                self.response_out[:] = self.response_bytes
             case _ as unreachable:
                 assert_never(unreachable)
 
-        shm.protocol.type += 1
+        protocol.type += 1
         shm.sync = EngineStatus.Busy
+        if self.scheduler is not None:
+            self.scheduler.release()
@@ -0,0 +1,258 @@
+import os
+import json
+import atexit
+import time
+import ctypes
+import mmap
+import struct
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Union
+from core.state import Score, GameState, PlayerAction, Vec2
+from core.conf import GameConfig, NUM_PLAYERS
+
+# Replay files: everything the bot saw and answered, as raw protocol bytes.
+#
+#   header      HEADER_SIZE bytes: ReplayHeader, then the JSON layout of
+#               ReplayRecord (see `describe`) padded with zeros
+#   records     ReplayRecord, back to back
+#
+# Every record has the same size, so record i sits at a fixed offset and a
+# reader can map the whole file as one array. A record is written payload
+# first and `kind` last; a zero kind marks the end of a file whose writer
+# died before `close` trimmed it. The layout hash changes whenever any struct
+# involved changes, and the embedded layout lets readers decode replays
+# written by older versions of the structs.
+
+REPLAY_MAGIC = b"MMREPLAY"
+REPLAY_VERSION = 1
+HEADER_SIZE = 4096
+
+REPLAY_ENV = "MM_REPLAY"
+
+
+class RecordKind:
+    Empty = 0
+    Config = 1
+    Reset = 2
+    Tick = 3
+
+
+class ConfigRecord(ctypes.Structure):
+    _fields_ = [
+        ("config", GameConfig),
+    ]
+
+
+class ResetRecord(ctypes.Structure):
+    _fields_ = [
+        ("score", Score),
+        ("formation", Vec2 * NUM_PLAYERS),
+    ]
+
+
+class TickRecord(ctypes.Structure):
+    _fields_ = [
+        ("state", GameState),
+        ("response", PlayerAction * NUM_PLAYERS),
+    ]
+
+
+class RecordUnion(ctypes.Union):
+    _fields_ = [
+        ("config", ConfigRecord),
+        ("reset", ResetRecord),
+        ("tick", TickRecord),
+    ]
+
+
+class ReplayRecord(ctypes.Structure):
+    _fields_ = [
+        ("kind", ctypes.c_uint8),
+        ("team", ctypes.c_uint8),
+        ("_pad", ctypes.c_uint16),
+        ("elapsed_ns", ctypes.c_uint32),     # time spent in the strategy, saturating
+        ("data", RecordUnion),
+    ]
+
+
+class ReplayHeader(ctypes.Structure):
+    _fields_ = [
+        ("magic", ctypes.c_char * 8),
+        ("version", ctypes.c_uint32),
+        ("header_size", ctypes.c_uint32),
+        ("record_size", ctypes.c_uint32),
+        ("layout_size", ctypes.c_uint32),
+        ("layout_hash", ctypes.c_uint64),
+        ("records", ctypes.c_uint64),        # as of the last background update or close
+        ("created_ns", ctypes.c_uint64),
+    ]
+
+
+_SCALARS = {
+    ctypes.c_float: "f4", ctypes.c_double: "f8", ctypes.c_bool: "b1", ctypes.c_char: "S1",
+    ctypes.c_uint8: "u1", ctypes.c_uint16: "u2", ctypes.c_uint32: "u4", ctypes.c_uint64: "u8",
+    ctypes.c_int8: "i1", ctypes.c_int16: "i2", ctypes.c_int32: "i4", ctypes.c_int64: "i8",
+}
+
+
+def describe(ctype) -> dict:
+    """JSON-able layout of a ctypes type: names, offsets and sizes all the way down"""
+    if issubclass(ctype, ctypes.Array):
+        return {"array": describe(ctype._type_), "length": ctype._length_, "size": ctypes.sizeof(ctype)}
+    if issubclass(ctype, (ctypes.Structure, ctypes.Union)):
+        return {
+            "name": ctype.__name__,
+            "size": ctypes.sizeof(ctype),
+            "fields": [[name, getattr(ctype, name).offset, describe(t)] for name, t, *_ in ctype._fields_],
+        }
+    scalar = next((code for t, code in _SCALARS.items() if ctypes.sizeof(t) == ctypes.sizeof(ctype)
+                   and t._type_ == ctype._type_), None)
+    assert scalar is not None, f"no scalar code for {ctype}"
+    return {"scalar": "<" + scalar if scalar[1] != "1" else scalar, "size": ctypes.sizeof(ctype)}
+
+
+def layout_hash(layout: dict) -> int:
+    text = json.dumps(layout, sort_keys=True, separators=(",", ":")).encode()
+    return int.from_bytes(hashlib.blake2b(text, digest_size=8).digest(), "little")
+
+
+RECORD_LAYOUT = describe(ReplayRecord)
+RECORD_SIZE = ctypes.sizeof(ReplayRecord)
+LAYOUT_HASH = layout_hash(RECORD_LAYOUT)
+
+_DATA = ReplayRecord.data.offset
+_TICK_STATE = _DATA + TickRecord.state.offset
+_TICK_RESPONSE = _DATA + TickRecord.response.offset
+_RESET_SCORE = _DATA + ResetRecord.score.offset
+_RESET_FORMATION = _DATA + ResetRecord.formation.offset
+_ELAPSED = struct.Struct("<I")
+_MAX_ELAPSED = (1 << 32) - 1
+
+
+class ReplayRecorder:
+    """Appends records to a memory-mapped replay file.
+
+    The file is created sparse at `capacity` bytes and mapped once, so a
+    record is a few slice copies into the page cache and nothing on the tick
+    path waits for the disk. A background thread keeps the blocks and pages
+    ahead of the writer allocated and faulted in, and publishes the record
+    count in the header. Records past `capacity` are dropped and counted.
+    """
+
+    def __init__(self, path: Union[str, Path], capacity: int = 1 << 30, ahead: int = 1 << 20, interval: float = 0.05):
+        self.path = Path(path)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self.capacity = HEADER_SIZE + (capacity - HEADER_SIZE) // RECORD_SIZE * RECORD_SIZE
+        os.ftruncate(self.fd, self.capacity)
+        self.mmap = mmap.mmap(self.fd, self.capacity, access=mmap.ACCESS_WRITE)
+        self.view = memoryview(self.mmap)
+
+        layout = json.dumps(RECORD_LAYOUT, separators=(",", ":")).encode()
+        header = ReplayHeader(REPLAY_MAGIC, REPLAY_VERSION, HEADER_SIZE, RECORD_SIZE, len(layout),
+                              LAYOUT_HASH, 0, time.time_ns())
+        assert ctypes.sizeof(header) + len(layout) <= HEADER_SIZE, "record layout does not fit the header"
+        self.view[:ctypes.sizeof(header)] = bytes(header)
+        self.view[ctypes.sizeof(header):ctypes.sizeof(header) + len(layout)] = layout
+
+        self.offset = HEADER_SIZE
+        self.records = 0
+        self.dropped = 0
+        self.ahead = ahead
+        self.interval = interval
+        self.prepared = HEADER_SIZE
+        self._prepare()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replay-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> Optional["ReplayRecorder"]:
+        """A recorder if MM_REPLAY is set: a file, or a directory to create one in"""
+        target = os.environ.get(REPLAY_ENV)
+        if not target:
+            return None
+        path = Path(target)
+        if path.is_dir():
+            path = path / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.mmr"
+        return cls(path)
+
+    def _claim(self) -> Optional[int]:
+        offset = self.offset
+        if offset + RECORD_SIZE > self.capacity:
+            self.dropped += 1
+            return None
+        self.offset = offset + RECORD_SIZE
+        self.records += 1
+        return offset
+
+    def config(self, team: int, config: GameConfig):
+        offset = self._claim()
+        if offset is None:
+            return
+        view = self.view
+        view[offset + _DATA:offset + _DATA + ctypes.sizeof(GameConfig)] = bytes(config)
+        view[offset + 1] = team
+        view[offset] = RecordKind.Config
+
+    def reset(self, score: bytes, formation, elapsed_ns: int):
+        """`score` is the ResetMsg, `formation` the ResetResponse bytes"""
+        offset = self._claim()
+        if offset is None:
+            return
+        view = self.view
+        view[offset + _RESET_SCORE:offset + _RESET_SCORE + len(score)] = score
+        view[offset + _RESET_FORMATION:offset + _RESET_FORMATION + len(formation)] = formation
+        _ELAPSED.pack_into(view, offset + 4, min(elapsed_ns, _MAX_ELAPSED))
+        view[offset] = RecordKind.Reset
+
+    def tick(self, state, response, elapsed_ns: int):
+        """`state` is the GameState, `response` the TickResponse bytes"""
+        offset = self._claim()
+        if offset is None:
+            return
+        view = self.view
+        view[offset + _TICK_STATE:offset + _TICK_STATE + len(state)] = state
+        view[offset + _TICK_RESPONSE:offset + _TICK_RESPONSE + len(response)] = response
+        _ELAPSED.pack_into(view, offset + 4, min(elapsed_ns, _MAX_ELAPSED))
+        view[offset] = RecordKind.Tick
+
+    def _prepare(self):
+        """Allocates blocks and faults pages in up to `ahead` bytes past the writer"""
+        target = min(self.offset + self.ahead, self.capacity)
+        if target <= self.prepared:
+            return
+        start = self.prepared // mmap.PAGESIZE * mmap.PAGESIZE
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self.fd, start, target - start)
+            except OSError:
+                pass
+        if hasattr(self.mmap, "madvise"):
+            self.mmap.madvise(mmap.MADV_WILLNEED, start, target - start)
+        self.prepared = target
+
+    def _publish(self):
+        struct.pack_into("<Q", self.view, ReplayHeader.records.offset, self.records)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._prepare()
+            self._publish()
+
+    def close(self):
+        """Stops the background thread and trims the file to the records written"""
+        if self.fd is None:
+            return
+        atexit.unregister(self.close)
+        self._stop.set()
+        self._thread.join()
+        self._publish()
+        self.view.release()
+        self.mmap.flush()
+        self.mmap.close()
+        os.ftruncate(self.fd, self.offset)
+        os.close(self.fd)
+        self.fd = None
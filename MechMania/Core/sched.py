@@ -0,0 +1,89 @@
+import time
+import asyncio
+import statistics
+from collections import deque
+from typing import Optional
+
+
+class PollScheduler:
+    """Polling schedule for the shared-memory channel that learns the engine's cadence.
+
+    The engine turnaround (time from handing the channel back to the next
+    message) is tracked over a window of recent ticks. Once it is known the bot
+    sleeps until just before the next message is due, spins only inside a
+    short window around that point, and falls back to exponential backoff with
+    a capped sleep if the message is late.
+    """
+
+    def __init__(
+            self,
+            window: int = 32,
+            spin_window: float = 0.0002,
+            min_sleep: float = 0.00005,
+            max_sleep: float = 0.002,
+    ):
+        self.intervals = deque(maxlen=window)
+        self.spin_window = spin_window
+        self.min_sleep = min_sleep
+        # Upper bound on any single sleep, and so on how late we can wake up
+        self.max_sleep = max_sleep
+
+        self.cadence: Optional[float] = None
+        self.released_at: Optional[float] = None
+
+        self.ticks = 0
+        self.spins = 0
+        self.sleeps = 0
+
+    def release(self):
+        """Call right after handing the channel back to the engine"""
+        self.released_at = time.perf_counter()
+
+    def _arrived(self):
+        self.ticks += 1
+        if self.released_at is not None:
+            self.intervals.append(time.perf_counter() - self.released_at)
+            self.cadence = statistics.median(self.intervals)
+
+    async def wait(self, shm_view, expected_status: int):
+        if shm_view.sync == expected_status:
+            self._arrived()
+            return
+
+        now = time.perf_counter()
+
+        # Sleep until just before the next message is due
+        if self.cadence is not None and self.released_at is not None:
+            due = self.released_at + self.cadence - self.spin_window
+            while now < due:
+                await asyncio.sleep(min(due - now, self.max_sleep))
+                self.sleeps += 1
+                if shm_view.sync == expected_status:
+                    self._arrived()
+                    return
+                now = time.perf_counter()
+
+        # Spin in a short window around the expected arrival
+        spin_until = now + 2 * self.spin_window
+        while now < spin_until:
+            self.spins += 1
+            if shm_view.sync == expected_status:
+                self._arrived()
+                return
+            now = time.perf_counter()
+
+        # Late message: back off, never sleeping longer than max_sleep at a time
+        delay = self.min_sleep
+        while shm_view.sync != expected_status:
+            await asyncio.sleep(delay)
+            self.sleeps += 1
+            delay = min(delay * 2, self.max_sleep)
+        self._arrived()
+
+    def stats(self) -> dict:
+        return {
+            "cadence": self.cadence,
+            "ticks": self.ticks,
+            "spins": self.spins,
+            "sleeps": self.sleeps,
+        }
@@ -36,13 +36,40 @@ class PlayerAction(ctypes.Structure):
     ]
 
     def __init__(self, dir: Vec2, ball_pass: Optional[Vec2]):
-        super().__init__()
-        self.dir = dir
+        # Accepts FastVec2 as well, to_c() is a no-op for Vec2
         if ball_pass is not None:
-            self.has_pass = ctypes.c_bool(True)
-            self.ball_pass = ball_pass
+            super().__init__(dir.to_c(), True, ball_pass.to_c())
         else:
-            self.has_pass = ctypes.c_bool(False)
+            super().__init__(dir.to_c())
+
+
+class ActionSlot:
+    """Writes one player's action in place into a persistent response buffer.
+
+    The field views are taken once, so filling a slot every tick does not
+    create any ctypes objects. `set` copies a whole PlayerAction in through
+    the response array, which does not create any either.
+    """
+    __slots__ = ("response", "index", "action", "dir", "ball_pass")
+
+    def __init__(self, response, index: int):
+        self.response = response
+        self.index = index
+        self.action = response[index]
+        self.dir = self.action.dir
+        self.ball_pass = self.action.ball_pass
+
+    def set_dir(self, x: float, y: float):
+        self.dir.x = x
+        self.dir.y = y
+
+    def set_pass(self, x: float, y: float):
+        self.action.has_pass = True
+        self.ball_pass.x = x
+        self.ball_pass.y = y
+
+    def set(self, action: PlayerAction):
+        self.response[self.index] = action
 
 class BallPossessionType:
     Possessed = 0
@@ -7,32 +7,33 @@ class Vec2(ctypes.Structure):
         ("y", ctypes.c_float),
     ]
 
-    def __add__(self, other) -> "Vec2":
-        return Vec2(self.x + other.x, self.y + other.y)
+    # Arithmetic hands back FastVec2 values: anything derived from the game
+    # state stays out of ctypes until it crosses the IPC boundary again
 
-    def __sub__(self, other) -> "Vec2":
-        return Vec2(self.x - other.x, self.y - other.y)
+    def __add__(self, other) -> "FastVec2":
+        return FastVec2(self.x + other.x, self.y + other.y)
 
-    def __mul__(self, scalar) -> "Vec2":
-        return Vec2(self.x * scalar, self.y * scalar)
+    def __sub__(self, other) -> "FastVec2":
+        return FastVec2(self.x - other.x, self.y - other.y)
 
-    def __rmul__(self, scalar) -> "Vec2":
+    def __mul__(self, scalar) -> "FastVec2":
+        return FastVec2(self.x * scalar, self.y * scalar)
+
+    def __rmul__(self, scalar) -> "FastVec2":
         return self.__mul__(scalar)
 
-    def normalize(self) -> "Vec2":
-        magnitude = math.sqrt(self.x**2 + self.y**2)
-        if magnitude == 0:
-            return Vec2(0, 0)
-        return Vec2(self.x/magnitude, self.y/magnitude)
+    def normalize(self) -> "FastVec2":
+        return self.fast().normalize()
 
-    def rotate(self, angle_deg: float) -> "Vec2":
+    def rotate(self, angle_deg: float) -> "FastVec2":
         """Rotates the vector by a given angle in degrees."""
-        angle_rad = math.radians(angle_deg) # Convert degrees to radians
-        cos_a = math.cos(angle_rad)
-        sin_a = math.sin(angle_rad)
-        new_x = self.x * cos_a - self.y * sin_a
-        new_y = self.x * sin_a + self.y * cos_a
-        return Vec2(new_x, new_y)
+        return self.fast().rotate(angle_deg)
+
+    def fast(self) -> "FastVec2":
+        return FastVec2(self.x, self.y)
+
+    def to_c(self) -> "Vec2":
+        return self
 
     def dot(self, other: "Vec2") -> float:
         return self.x * other.x + self.y * other.y
@@ -51,3 +52,70 @@ class Vec2(ctypes.Structure):
 
     def dist_sq(self, other: "Vec2") -> float:
         return (self - other).norm_sq()
+
+
+class FastVec2:
+    """Plain-Python 2D vector with the same API as `Vec2`.
+
+    Used for all strategy math; `Vec2` only exists to match the engine's
+    memory layout. Convert with `Vec2.fast()` / `FastVec2.to_c()`.
+    """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float = 0.0, y: float = 0.0):
+        self.x = x
+        self.y = y
+
+    def __repr__(self) -> str:
+        return f"FastVec2({self.x}, {self.y})"
+
+    def __add__(self, other) -> "FastVec2":
+        return FastVec2(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other) -> "FastVec2":
+        return FastVec2(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, scalar) -> "FastVec2":
+        return FastVec2(self.x * scalar, self.y * scalar)
+
+    def __rmul__(self, scalar) -> "FastVec2":
+        return FastVec2(self.x * scalar, self.y * scalar)
+
+    def normalize(self) -> "FastVec2":
+        magnitude = math.sqrt(self.x * self.x + self.y * self.y)
+        if magnitude == 0:
+            return FastVec2(0.0, 0.0)
+        return FastVec2(self.x / magnitude, self.y / magnitude)
+
+    def rotate(self, angle_deg: float) -> "FastVec2":
+        """Rotates the vector by a given angle in degrees."""
+        angle_rad = math.radians(angle_deg)
+        cos_a = math.cos(angle_rad)
+        sin_a = math.sin(angle_rad)
+        return FastVec2(self.x * cos_a - self.y * sin_a, self.x * sin_a + self.y * cos_a)
+
+    def dot(self, other) -> float:
+        return self.x * other.x + self.y * other.y
+
+    def norm_sq(self) -> float:
+        return self.x * self.x + self.y * self.y
+
+    def norm(self) -> float:
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def theta(self) -> float:
+        return math.atan2(self.y, self.x)
+
+    def dist(self, other) -> float:
+        return math.hypot(self.x - other.x, self.y - other.y)
+
+    def dist_sq(self, other) -> float:
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return dx * dx + dy * dy
+
+    def fast(self) -> "FastVec2":
+        return self
+
+    def to_c(self) -> Vec2:
+        return Vec2(self.x, self.y)
@@ -0,0 +1,121 @@
+import os
+import errno
+import asyncio
+from typing import Optional, Tuple, Union
+from pathlib import Path
+
+# How long a listener waits for a notification before re-checking the sync
+# byte on its own. Covers a lost wakeup or an engine that stopped signalling.
+WAKE_TIMEOUT = 0.05
+
+
+def _drain(fd: int):
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+
+
+class WakeListener:
+    """Bot side of the wakeup side channel.
+
+    The engine writes a byte to the pipe every time it flips `Shm.sync` to
+    `EngineStatus.Ready`; the bot sleeps on the read end through the event
+    loop instead of spinning on shared memory.
+    """
+
+    def __init__(self, fd: int, keepalive_fd: Optional[int] = None):
+        os.set_blocking(fd, False)
+        self.fd = fd
+        # A FIFO with no writer reports EOF as readable forever, so the
+        # listener holds a write end of its own to keep it quiet.
+        self.keepalive_fd = keepalive_fd
+        self.event: Optional[asyncio.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_fifo(cls, path: Union[str, Path]) -> "WakeListener":
+        path = Path(path)
+        if not path.exists():
+            os.mkfifo(path)
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        keepalive_fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        return cls(fd, keepalive_fd)
+
+    def _on_readable(self):
+        _drain(self.fd)
+        assert self.event is not None
+        self.event.set()
+
+    def _register(self):
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.loop.add_reader(self.fd, self._on_readable)
+
+    async def wait(self, timeout: float = WAKE_TIMEOUT):
+        """Returns once notified or after `timeout` seconds, whichever is first"""
+        if self.event is None:
+            self._register()
+        assert self.event is not None
+
+        if not self.event.is_set():
+            try:
+                await asyncio.wait_for(self.event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.event.clear()
+
+    def close(self):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.remove_reader(self.fd)
+            self.loop = None
+        os.close(self.fd)
+        if self.keepalive_fd is not None:
+            os.close(self.keepalive_fd)
+
+
+class WakeNotifier:
+    """Engine side of the wakeup side channel"""
+
+    def __init__(self, fd: Optional[int] = None, path: Union[str, Path, None] = None):
+        self.fd = fd
+        self.path = Path(path) if path is not None else None
+        if self.fd is not None:
+            os.set_blocking(self.fd, False)
+
+    @classmethod
+    def from_fifo(cls, path: Union[str, Path]) -> "WakeNotifier":
+        path = Path(path)
+        if not path.exists():
+            os.mkfifo(path)
+        return cls(path=path)
+
+    def notify(self):
+        if self.fd is None:
+            if self.path is None:
+                return
+            try:
+                self.fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                # No bot has opened the read end yet
+                if e.errno == errno.ENXIO:
+                    return
+                raise
+
+        try:
+            os.write(self.fd, b"\x01")
+        except BlockingIOError:
+            # Pipe is full of unread wakeups, the bot is awake anyway
+            pass
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def wake_pipe() -> Tuple[WakeListener, WakeNotifier]:
+    """Anonymous listener/notifier pair for an engine living in the same process tree"""
+    r, w = os.pipe()
+    return WakeListener(r), WakeNotifier(w)
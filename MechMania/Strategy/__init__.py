@@ -1,11 +1,12 @@
 from typing import List
-from core.ipc import Strategy, get_config
+from core.ipc import Strategy, get_config, get_geometry
 from core.state import Score, GameState, PlayerAction, Team, PlayerState
-from core.util import Vec2
+from core.util import Vec2, FastVec2
 from core.conf import GameConfig, NUM_PLAYERS
 
 __all__ = [
    'get_config', 
+   'get_geometry',
    'PlayerState', 
    'Team', 
    'Strategy', 
@@ -13,6 +14,7 @@ __all__ = [
    'GameState', 
    'PlayerAction', 
    'Vec2', 
+   'FastVec2',
    'GameConfig', 
    'NUM_PLAYERS', 
    'List'
@@ -0,0 +1,300 @@
+import math
+import numpy as np
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+from . import *
+from core.geometry import Geometry, Wall
+from .lanes import lane_gap, lane_gaps
+
+# A shot off a wall is a straight line to the target's mirror image across
+# that wall, and a shot off two walls is a straight line to the image of an
+# image. Images depend only on the field and the targets, so they are built
+# once. At shot time `evaluate` checks and scores every candidate in one
+# pass; `plan` only needs the best one, so it walks them from the shortest
+# line out and stops at the first that is open.
+#
+# Bounces are treated as elastic: distance travelled is the length of the
+# unfolded line and speed only drops to friction. With per-tick friction the
+# ball loses `friction` speed per unit of distance, so a shot of length d
+# arrives at `pass_speed - friction * d` after
+#     t = log(1 - friction * d / pass_speed) / log(1 - friction)
+# ticks, and cannot reach past pass_speed / friction.
+
+# Bounce points closer than this to a corner are skipped, the ball would
+# hit both walls at once
+_CORNER_MARGIN = 1.0
+
+# Stand-in wall coordinate for a bounce a candidate does not have
+_FAR = 1e9
+
+# Keeps the travel time finite for shots that would stop short of the target,
+# they are discarded anyway
+_MAX_REACH = 1.0 - 1e-12
+
+
+class Shot(NamedTuple):
+    direction: FastVec2     # unit vector to shoot along
+    aim: FastVec2           # first point the ball reaches: a bounce point or the target
+    target: FastVec2
+    bounces: int
+    ticks: float            # time until the ball reaches the target
+    gap: float              # closest opponent to any leg of the path
+
+
+class BouncePlanner:
+    """Direct, one-bounce and two-bounce shots at a fixed set of targets"""
+
+    def __init__(self, geometry: Geometry, targets: Sequence[FastVec2]):
+        self.geometry = geometry
+        self.targets = [FastVec2(t.x, t.y) for t in targets]
+        w, h = geometry.field.x, geometry.field.y
+
+        # One row per candidate: target index, image, walls in the order the
+        # ball hits them (None = no bounce). Perpendicular walls give the same
+        # image in either order; only the order the line really crosses them
+        # passes the checks in `evaluate`
+        rows = []
+        for k, target in enumerate(self.targets):
+            rows.append((k, target, None, None))
+            for first in geometry.walls:
+                rows.append((k, first.mirror(target), first, None))
+                for second in geometry.walls:
+                    if second != first:
+                        rows.append((k, first.mirror(second.mirror(target)), first, second))
+
+        self.target_index = np.array([r[0] for r in rows])
+        self.images = np.array([complex(r[1].x, r[1].y) for r in rows])
+        self.target_points = np.array([complex(t.x, t.y) for t in self.targets])[self.target_index]
+        self.bounces = np.array([(r[2] is not None) + (r[3] is not None) for r in rows])
+        has = np.array([[r[2] is not None for r in rows], [r[3] is not None for r in rows]])
+
+        # Both bounces are handled as one (2, C) array. A missing first bounce
+        # gets a stand-in wall through the target, which mirrors it onto itself
+        walls = []
+        for k, _, first, second in rows:
+            first = first or Wall(1, self.targets[k].y)
+            if second is not None and second.axis == first.axis:
+                # Seen from the shooter's side of the first wall the second
+                # wall is mirrored too, which only moves it when they are parallel
+                second = Wall(second.axis, 2.0 * first.offset - second.offset)
+            walls.append((first, second or first))
+        axis = np.array([[pair[i].axis for pair in walls] for i in range(2)])
+        offset = np.array([[pair[i].offset for pair in walls] for i in range(2)])
+
+        # Multiplying a point by `across` puts its coordinate across the wall
+        # in the real part, by `along` its coordinate along the wall
+        self.across = np.where(axis == 0, 1.0, -1j)
+        self.along = np.where(axis == 0, -1j, 1.0)
+        # A missing bounce is crossed at the very end of the line, where the
+        # unfolded line meets the target
+        self.offset = np.where(has, offset, _FAR)
+        self.image_across = np.where(has, (self.images * self.across).real, _FAR)
+        # Reflection across the first wall as z -> sign * conj(z) + shift
+        self.mirror_sign = np.where(axis[0] == 0, -1.0, 1.0)
+        self.mirror_shift = np.where(axis[0] == 0, 2.0 * offset[0], 2j * offset[0])
+        # Half the usable length of each wall. Bounces off the sides may not
+        # land in a goal mouth: ours, or theirs which would not be a bounce
+        self.half_length = np.where(axis == 0, h, w) * 0.5 - _CORNER_MARGIN
+        self.side = has & (axis == 0)
+        self.missing = ~has
+
+        # The same per candidate as plain Python values, for `plan`, which
+        # looks at a few candidates and would mostly pay NumPy's overhead
+        per_wall = [a.tolist() for a in (self.across, self.along, self.offset, self.image_across,
+                                          self.half_length, self.side, self.missing)]
+        self._image_list = self.images.tolist()
+        self._target_list = self.target_points.tolist()
+        self._walls = [[tuple(a[j][i] for a in per_wall) for j in range(2)] for i in range(len(rows))]
+        self._mirror = list(zip(self.mirror_sign.tolist(), self.mirror_shift.tolist()))
+        self._bounce_list = self.bounces.tolist()
+        self._direct = [(i, self._target_list[i]) for i in range(len(rows)) if self._bounce_list[i] == 0]
+
+    def evaluate(
+            self,
+            shooter: FastVec2,
+            blockers: np.ndarray,
+            radius: float,
+            pass_speed: float,
+            friction: float,
+            mouth: Tuple[float, float],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Scores every candidate from `shooter` in one pass.
+
+        `blockers` are complex positions, `mouth` is the (top, bottom) y range
+        of the goal mouths, where a ball would not bounce. Returns per
+        candidate the ticks until the ball reaches the target (inf if the path
+        is blocked, out of range or leaves the field), the closest opponent to
+        the path (inf for candidates that are out anyway), and the first point
+        to aim at.
+        """
+        p = complex(shooter.x, shooter.y)
+        line = self.images - p
+        travel = np.abs(line)
+
+        # Where the unfolded line crosses each wall, as a fraction of its length
+        start = (p * self.across).real
+        s = (self.offset - start) / (self.image_across - start)            # (2, C)
+
+        # The ball path: shooter, first bounce, second bounce, target. Back in
+        # the real field the first bounce is where it is, the second one is on
+        # the far side of the first wall
+        path = np.empty((4, len(line)), dtype=np.complex128)
+        path[0] = p
+        path[1:3] = p + s * line
+        path[2] = self.mirror_sign * np.conj(path[2]) + self.mirror_shift
+        path[3] = self.target_points
+
+        along = (path[1:3] * self.along).real
+        top, bottom = mouth
+        ok = (s * (1.0 - s) > 0) & (np.abs(along - self.half_length - _CORNER_MARGIN) < self.half_length)
+        ok &= ~(self.side & (along >= top) & (along <= bottom))
+        ok |= self.missing
+        valid = ok[0] & ok[1] & (s[1] >= s[0]) & (travel * friction < pass_speed)
+
+        # Only the candidates still in play are checked against the blockers
+        gap = np.full(len(line), np.inf)
+        live = np.flatnonzero(valid)
+        if len(live):
+            legs = path[:, live]
+            gap[live] = lane_gaps(legs[:3], legs[1:] - legs[:3], blockers).min(axis=0)
+
+        if friction > 0:
+            reach = np.minimum(travel * (friction / pass_speed), _MAX_REACH)
+            ticks = np.log1p(-reach) / math.log1p(-friction)
+        else:
+            ticks = travel / pass_speed
+        ticks[~(valid & (gap >= radius))] = np.inf
+        return ticks, gap, path[1]
+
+    def plan(
+            self,
+            shooter: FastVec2,
+            blockers,
+            radius: float,
+            pass_speed: float,
+            friction: float,
+            mouth: Tuple[float, float],
+    ) -> Optional[Shot]:
+        """Fastest open shot from `shooter`, or None if there is none. Same
+        answer as the smallest tick count from `evaluate`; `blockers` may
+        also be a list of complex positions"""
+        p = complex(shooter.x, shooter.y)
+        if isinstance(blockers, np.ndarray):
+            blockers = blockers.tolist()
+        # A bounce is never shorter than the direct shot at its own target, so
+        # the direct shot at the nearest target is the shortest line of all.
+        # It has no walls to check: if it is open nothing else is looked at,
+        # and if the ball cannot travel it nothing else can be played either
+        distance, nearest = min([(abs(target - p), i) for i, target in self._direct])
+        if distance * friction >= pass_speed:
+            return None
+        gap = lane_gap(p, self._target_list[nearest], blockers)
+        if gap >= radius:
+            return self._shot(shooter, nearest, self._target_list[nearest], distance, gap, pass_speed, friction)
+
+        # Otherwise the rest that the ball can travel, shortest first: ticks
+        # grow with the length of the line
+        travel = [abs(image - p) for image in self._image_list]
+        candidates = sorted([(distance, i) for i, distance in enumerate(travel) if distance * friction < pass_speed])
+        for distance, i in candidates[1:]:
+            stops = self._stops(i, p, mouth)
+            if stops is None:
+                continue
+            first, second = stops
+            target = self._target_list[i]
+            # Only the legs the ball really travels
+            if self._bounce_list[i] == 1:
+                legs = ((p, first), (first, target))
+            else:
+                legs = ((p, first), (first, second), (second, target))
+            # A single blocked leg rules the candidate out
+            gap = math.inf
+            for start, end in legs:
+                gap = min(gap, lane_gap(start, end, blockers))
+                if gap < radius:
+                    break
+            else:
+                return self._shot(shooter, i, first, distance, gap, pass_speed, friction)
+        return None
+
+    def _shot(self, shooter: FastVec2, i: int, aim: complex, distance: float, gap: float,
+              pass_speed: float, friction: float) -> Shot:
+        if friction > 0:
+            reach = min(distance * (friction / pass_speed), _MAX_REACH)
+            ticks = math.log1p(-reach) / math.log1p(-friction)
+        else:
+            ticks = distance / pass_speed
+        return Shot(
+            FastVec2(aim.real - shooter.x, aim.imag - shooter.y).normalize(),
+            FastVec2(aim.real, aim.imag),
+            self.targets[self.target_index[i]],
+            self._bounce_list[i],
+            ticks,
+            gap,
+        )
+
+    def _stops(self, i: int, p: complex, mouth: Tuple[float, float]) -> Optional[Tuple[complex, complex]]:
+        """Both bounce points of candidate `i` from `p` (the target for a
+        bounce it does not have), None if the checks in `evaluate` fail"""
+        line = self._image_list[i] - p
+        top, bottom = mouth
+        stops = []
+        for j, (across, along, offset, image_across, half_length, side, missing) in enumerate(self._walls[i]):
+            start = (p * across).real
+            if image_across == start:
+                return None
+            s = (offset - start) / (image_across - start)
+            if stops and s < stops[-1][0]:
+                return None
+            point = p + s * line
+            if j == 1:
+                sign, shift = self._mirror[i]
+                point = sign * point.conjugate() + shift
+            if not missing:
+                at = (point * along).real
+                if not (s * (1.0 - s) > 0 and abs(at - half_length - _CORNER_MARGIN) < half_length):
+                    return None
+                if side and top <= at <= bottom:
+                    return None
+            stops.append((s, point))
+        return stops[0][1], stops[1][1]
+
+_planners: Dict[Tuple[Tuple[float, float], ...], BouncePlanner] = {}
+_planner_geometry: Optional[Geometry] = None
+
+
+def get_planner(geometry: Geometry, targets: Sequence[FastVec2]) -> BouncePlanner:
+    """Planner for these targets on this field, built on first use"""
+    global _planner_geometry
+    if geometry is not _planner_geometry:
+        _planners.clear()
+        _planner_geometry = geometry
+    key = tuple([(t.x, t.y) for t in targets])
+    planner = _planners.get(key)
+    if planner is None:
+        planner = BouncePlanner(geometry, targets)
+        _planners[key] = planner
+    return planner
+
+
+def plan_shot(shooter: FastVec2, targets: Sequence[FastVec2], ctx=None) -> Optional[Shot]:
+    """Fastest open shot at any of `targets`, direct or off the walls. Without
+    a TickContext nobody is in the way"""
+    geometry = get_geometry()
+    planner = get_planner(geometry, targets)
+    # Helpers ask for the same shooter more than once per tick
+    key = (planner, shooter.x, shooter.y)
+    if ctx is None:
+        config, blockers, radius, tick = get_config(), [], 0.0, 0
+    elif key in ctx.shots:
+        return ctx.shots[key]
+    else:
+        config, blockers, radius, tick = ctx.config, ctx.blockers, ctx.block_radius, ctx.game.tick
+    mouth = geometry.goals(tick)[1]
+    shot = planner.plan(
+        shooter, blockers, radius,
+        config.player.pass_speed, config.ball.friction,
+        (mouth.top.y, mouth.bottom.y),
+    )
+    if ctx is not None:
+        ctx.shots[key] = shot
+    return shot
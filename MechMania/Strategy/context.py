@@ -0,0 +1,95 @@
+import numpy as np
+from functools import cached_property
+from . import *
+from core.arrays import GAME_STATE_DTYPE
+from .lanes import lane_clearance
+from .params import get_params
+
+# Column of `TickContext.lane_clear` / `lane_gap` holding the lane to the enemy goal
+GOAL_LANE = NUM_PLAYERS
+
+
+class TickContext:
+    """Derived state for one tick, computed once and shared by every helper.
+
+    NumPy arrays are kept for vectorized callers; the `.tolist()` copies are
+    what the per-player Python code indexes, since scalar NumPy indexing is
+    slower than list indexing.
+    """
+
+    def __init__(self, game: GameState, config: GameConfig):
+        self.game = game
+        self.config = config
+
+        raw = np.frombuffer(game, dtype=GAME_STATE_DTYPE, count=1)
+        self.pos = raw["players"]["pos"][0].astype(np.float64)              # (8, 2)
+        self.ball = raw["ball"]["pos"][0].astype(np.float64)                # (2,)
+        # Positions as complex numbers make every distance a single abs()
+        self.points = self.pos.view(np.complex128).ravel()                  # (8,)
+        self.ball_point = complex(*self.ball.tolist())
+
+        self.positions = [FastVec2(x, y) for x, y in self.pos.tolist()]
+        self.teammates = self.positions[:NUM_PLAYERS]
+        self.opponents = self.positions[NUM_PLAYERS:]
+        self.ball_pos = FastVec2(self.ball_point.real, self.ball_point.imag)
+        self.ball_vel = game.ball.vel.fast()
+
+        # Engine's view of possession, not a distance guess
+        self.owner = game.ball_owner
+        self.holder = self.owner if self.owner is not None and self.owner < NUM_PLAYERS else None
+
+        self.geometry = get_geometry()
+        self.field = self.geometry.field
+        self.enemy_goal = self.geometry.enemy_goal.center
+        self.params = get_params()
+        self.block_radius = config.player.radius * self.params.block_radius_scale
+        # `plan_shot` results by planner and shooter, filled in as they are asked for
+        self.shots = {}
+
+    @cached_property
+    def dist_matrix(self) -> np.ndarray:
+        """(8, 8) pairwise player distances"""
+        return np.abs(self.points[:, None] - self.points)
+
+    @cached_property
+    def ball_dist_array(self) -> np.ndarray:
+        """(8,) player distances to the ball"""
+        return np.abs(self.points - self.ball_point)
+
+    @cached_property
+    def dist(self) -> List[List[float]]:
+        return self.dist_matrix.tolist()
+
+    @cached_property
+    def ball_dist(self) -> List[float]:
+        return self.ball_dist_array.tolist()
+
+    @cached_property
+    def nearest_opponent(self) -> List[float]:
+        """Distance from every player to the closest player of team Other"""
+        return self.dist_matrix[:, NUM_PLAYERS:].min(axis=1).tolist()
+
+    @cached_property
+    def blockers(self) -> List[complex]:
+        """Opponent positions as complex numbers, for scalar lane checks"""
+        return self.points[NUM_PLAYERS:].tolist()
+
+    def clearance(self, origins, targets):
+        """`lane_clearance` of origins x targets against the opponents"""
+        return lane_clearance(origins, targets, self.points[NUM_PLAYERS:], self.block_radius)
+
+    @cached_property
+    def _lanes(self):
+        targets = np.append(self.points[:NUM_PLAYERS], complex(self.enemy_goal.x, self.enemy_goal.y))
+        clear, gap = self.clearance(self.points[:NUM_PLAYERS], targets)
+        return clear.tolist(), gap.tolist()
+
+    @property
+    def lane_clear(self) -> List[List[bool]]:
+        """`lane_clear[i][j]`: teammate i can pass to teammate j (or shoot, j == GOAL_LANE)"""
+        return self._lanes[0]
+
+    @property
+    def lane_gap(self) -> List[List[float]]:
+        """Closest opponent to each lane in `lane_clear`"""
+        return self._lanes[1]
@@ -0,0 +1,216 @@
+import math
+import numpy as np
+from typing import Optional, Tuple
+from . import *
+from core.state import BallPossessionType
+
+# Ball model (matches the local engine): every tick the ball moves by its
+# velocity and the velocity is scaled by (1 - friction). Time is in ticks:
+#     B(t) = p0 + v0 * (1 - k^t) / (1 - k),   k = 1 - friction
+# A player covers `speed` per tick in a straight line and touches the ball
+# once within `reach` of it. Wall bounces are not modelled.
+
+# While the ball is faster than the player the gap between them can close and
+# reopen, so the first crossing is found by stepping forward as far as the gap
+# allows: it cannot shrink faster than ball speed + player speed. After that
+# the gap only shrinks and plain bisection is exact.
+_MIN_STEP = 0.05
+_MAX_STEPS = 64
+_BISECT_STEPS = 30
+
+# Grid sizes and refinement steps for the vectorized solver
+_GRID_FAST = 512
+_GRID_SLOW = 512
+_REFINE_STEPS = 1
+
+
+def _travel(k: float, t: float) -> float:
+    """How far a unit initial velocity carries the ball in t ticks"""
+    if k >= 1.0:
+        return t
+    return (1.0 - k**t) / (1.0 - k)
+
+
+def ball_position_at(ball_pos: Vec2, ball_vel: Vec2, friction: float, t: float) -> FastVec2:
+    f = _travel(1.0 - friction, t)
+    return FastVec2(ball_pos.x + ball_vel.x * f, ball_pos.y + ball_vel.y * f)
+
+
+def ball_motion(game: GameState, config: GameConfig) -> Tuple[FastVec2, FastVec2, float]:
+    """Position, velocity and friction to feed the solver.
+
+    A possessed ball moves with its carrier at the slowed-down player speed
+    and does not decelerate.
+    """
+    pos = game.ball.pos.fast()
+    if game._ball_possession.type == BallPossessionType.Possessed:
+        owner = game.players[game._ball_possession.data.possessed.owner]
+        vel = owner.dir.normalize() * (config.player.speed * config.player.possession_slowdown)
+        return pos, vel, 0.0
+    return pos, game.ball.vel.fast(), config.ball.friction
+
+
+def _constant_velocity_time(dx: float, dy: float, vx: float, vy: float, speed: float, reach: float) -> Optional[float]:
+    # |d + v t| = speed t + reach, smallest t >= 0
+    a = vx * vx + vy * vy - speed * speed
+    b = 2.0 * (dx * vx + dy * vy - speed * reach)
+    c = dx * dx + dy * dy - reach * reach
+    if c <= 0:
+        return 0.0
+    if abs(a) < 1e-12:
+        if b >= 0:
+            return None
+        return -c / b
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return None
+    root = math.sqrt(disc)
+    for t in sorted(((-b - root) / (2 * a), (-b + root) / (2 * a))):
+        if t >= 0:
+            return t
+    return None
+
+
+def intercept_time(
+        player_pos: Vec2,
+        ball_pos: Vec2,
+        ball_vel: Vec2,
+        friction: float,
+        speed: float,
+        reach: float = 0.0,
+) -> Optional[float]:
+    """Earliest tick (fractional) at which the player can touch the ball, or
+    None if the ball outruns them forever (only possible without friction)"""
+    dx = ball_pos.x - player_pos.x
+    dy = ball_pos.y - player_pos.y
+    vx, vy = ball_vel.x, ball_vel.y
+
+    if dx * dx + dy * dy <= reach * reach:
+        return 0.0
+    if speed <= 0:
+        return None
+
+    k = 1.0 - friction
+    if friction <= 0:
+        return _constant_velocity_time(dx, dy, vx, vy, speed, reach)
+
+    def gap(t: float) -> float:
+        f = (1.0 - k**t) / (1.0 - k)
+        return math.hypot(dx + vx * f, dy + vy * f) - speed * t - reach
+
+    ball_speed = math.hypot(vx, vy)
+    t = 0.0
+
+    if ball_speed > speed:
+        t_slow = math.log(speed / ball_speed) / math.log(k)
+        g = gap(0.0)
+        for _ in range(_MAX_STEPS):
+            if t >= t_slow:
+                break
+            step = max(g / (ball_speed * k**t + speed), _MIN_STEP)
+            next_t = min(t + step, t_slow)
+            next_g = gap(next_t)
+            if next_g <= 0:
+                return _bisect(gap, t, next_t)
+            t, g = next_t, next_g
+
+    # This bound always closes the gap
+    hi = max(t, (math.hypot(dx, dy) + ball_speed / friction) / speed)
+    return _bisect(gap, t, hi)
+
+
+def _bisect(gap, lo: float, hi: float) -> float:
+    for _ in range(_BISECT_STEPS):
+        mid = 0.5 * (lo + hi)
+        if gap(mid) <= 0:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def intercept_point(
+        player_pos: Vec2,
+        ball_pos: Vec2,
+        ball_vel: Vec2,
+        friction: float,
+        speed: float,
+        reach: float = 0.0,
+) -> FastVec2:
+    """Where to run to meet the ball; falls back to where it comes to rest,
+    or to where it is now if it never does"""
+    t = intercept_time(player_pos, ball_pos, ball_vel, friction, speed, reach)
+    if t is None:
+        if friction > 0:
+            return FastVec2(ball_pos.x + ball_vel.x / friction, ball_pos.y + ball_vel.y / friction)
+        return FastVec2(ball_pos.x, ball_pos.y)
+    return ball_position_at(ball_pos, ball_vel, friction, t)
+
+
+def intercept_times(
+        players_pos: np.ndarray,
+        ball_pos: np.ndarray,
+        ball_vel: np.ndarray,
+        friction: float,
+        speed: float,
+        reach: float = 0.0,
+) -> np.ndarray:
+    """Vectorized `intercept_time` for many players at once.
+
+    `players_pos` is (N, 2); returns (N,) intercept ticks, inf where the ball
+    can never be reached.
+    """
+    players_pos = np.asarray(players_pos, dtype=np.float64)
+    d = np.asarray(ball_pos, dtype=np.float64) - players_pos          # (N, 2)
+    v = np.asarray(ball_vel, dtype=np.float64)
+    ball_speed = float(np.hypot(v[0], v[1]))
+    d0 = np.hypot(d[:, 0], d[:, 1])
+    n = len(players_pos)
+
+    if speed <= 0:
+        return np.where(d0 <= reach, 0.0, np.inf)
+
+    if friction <= 0:
+        out = np.empty(n)
+        for i in range(n):
+            t = _constant_velocity_time(d[i, 0], d[i, 1], v[0], v[1], speed, reach)
+            out[i] = np.inf if t is None else t
+        return out
+
+    k = 1.0 - friction
+    t_slow = math.log(speed / ball_speed) / math.log(k) if ball_speed > speed else 0.0
+    t_max = (d0 + ball_speed / friction) / speed
+
+    # One dense grid over the part where the ball outruns the player and a
+    # coarser one (denser near its start) up to the latest possible touch.
+    # Crossings shorter than the grid spacing can be missed here, the scalar
+    # solver is exact.
+    grid = np.concatenate((
+        np.linspace(0.0, t_slow, _GRID_FAST + 1),
+        t_slow + (max(t_max.max(), t_slow) - t_slow) * np.linspace(0.0, 1.0, _GRID_SLOW + 1)[1:] ** 2,
+    ))
+    f = (1.0 - k**grid) / (1.0 - k)                                   # (S,)
+    g = np.hypot(d[:, 0:1] + v[0] * f, d[:, 1:2] + v[1] * f) - speed * grid - reach
+    closed = g <= 0                                                   # (N, S)
+    first = np.argmax(closed, axis=1)
+    rows = np.arange(n)
+    hit = closed[rows, first]
+
+    # The brackets are narrow enough for a couple of secant steps
+    i_lo = np.maximum(first - 1, 0)
+    lo, hi = grid[i_lo], grid[first]
+    g_lo, g_hi = g[rows, i_lo], g[rows, first]
+    for _ in range(_REFINE_STEPS):
+        span = g_lo - g_hi
+        mid = lo + g_lo * (hi - lo) / np.where(span > 0, span, np.inf)
+        fm = (1.0 - k**mid) / (1.0 - k)
+        g_mid = np.hypot(d[:, 0] + v[0] * fm, d[:, 1] + v[1] * fm) - speed * mid - reach
+        inside = g_mid <= 0
+        hi, g_hi = np.where(inside, mid, hi), np.where(inside, g_mid, g_hi)
+        lo, g_lo = np.where(inside, lo, mid), np.where(inside, g_lo, g_mid)
+    span = g_lo - g_hi
+    hi = lo + g_lo * (hi - lo) / np.where(span > 0, span, np.inf)
+
+    out = np.where(hit, hi, np.inf)
+    out[d0 <= reach] = 0.0
+    return out
@@ -0,0 +1,64 @@
+import math
+import numpy as np
+from typing import List, Tuple
+
+# Lanes shorter than this are treated as clear, the passer is practically
+# standing on the target
+_MIN_LANE = 1.0
+
+
+def as_points(points) -> np.ndarray:
+    """(N, 2) coordinates, a single (2,) point, or complex numbers -> (N,) complex128"""
+    points = np.asarray(points)
+    if np.iscomplexobj(points):
+        return points.astype(np.complex128, copy=False).ravel()
+    points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+    return points.view(np.complex128).ravel()
+
+
+def lane_clearance(origins, targets, blockers, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Evaluates every origin -> target lane against every blocker at once.
+
+    Returns `(clear, gap)`, both (M, T) for M origins and T targets. `gap` is
+    the smallest perpendicular distance from a blocker standing between the
+    two ends of the lane to the lane itself (inf if nobody is in between);
+    a lane is clear when that gap is at least `radius`.
+    """
+    o = as_points(origins)
+    t = as_points(targets)
+    gap = lane_gaps(o[:, None], t - o[:, None], as_points(blockers))
+    return gap >= radius, gap
+
+
+def lane_gaps(start: np.ndarray, lane: np.ndarray, blockers: np.ndarray) -> np.ndarray:
+    """Closest blocker to each lane running from `start` along `lane`, inf if
+    none stands between its ends. All complex; `start` and `lane` broadcast
+    against each other and `blockers` is (K,)"""
+    length = np.abs(lane)
+    unit = np.conj(lane) / np.maximum(length, _MIN_LANE)
+    # Nothing can stand between the ends of a degenerate lane
+    np.putmask(length, length < _MIN_LANE, -1.0)
+
+    # Rotating each blocker into the lane's frame gives the distance along
+    # the lane as the real part and the distance across it as the imaginary
+    rel = (blockers - start[..., None]) * unit[..., None]    # (..., K)
+    along = rel.real
+    gap = np.abs(rel.imag)
+    np.putmask(gap, (along < 0) | (along > length[..., None]), np.inf)
+    return gap.min(axis=-1, initial=np.inf)
+
+
+def lane_gap(start: complex, end: complex, blockers: List[complex]) -> float:
+    """`lane_gaps` for one lane in plain Python, for callers that check a
+    handful of lanes and would mostly pay NumPy's per-call overhead"""
+    lane = end - start
+    length = abs(lane)
+    if length < _MIN_LANE:
+        return math.inf
+    unit = lane.conjugate() / length
+    gap = math.inf
+    for blocker in blockers:
+        rel = (blocker - start) * unit
+        if 0.0 <= rel.real <= length:
+            gap = min(gap, abs(rel.imag))
+    return gap
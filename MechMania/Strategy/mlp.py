@@ -0,0 +1,308 @@
+import io
+import math
+import mmap
+import struct
+import zipfile
+import numpy as np
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from numpy.lib import format as npy_format
+from . import *
+from core.arrays import GAME_STATE_DTYPE
+from core.state import BallPossessionType
+
+# Inference for the dense network exported to soccer_weights.npz: ReLU hidden
+# layers, tanh output, no TensorFlow. The four players are the rows of one
+# (4, FEATURES) input, so every layer is a single matmul.
+#
+# Input, per player, in our frame. Positions are fractions of the field,
+# offsets are relative to the player, velocities are in units of pass speed:
+#    0-1   own position                 20-22  possession: ours, theirs, loose
+#    2-3   ball offset                  23     this player has the ball
+#    4-5   ball velocity                24-27  player index, one-hot
+#    6-11  teammate offsets, by index   28-29  enemy goal offset
+#   12-19  opponent offsets, by index   30-31  own goal offset
+#   32     tick / match length          33     endgame
+#   34     score difference / 5, clipped to [-1, 1]
+#
+# Output, per player, in [-1, 1]:
+#    0-1   move direction               4      pass when > 0 (only the ball holder)
+#    2-3   pass direction               5      throttle, -1 stands still, 1 full speed
+
+FEATURES = 35
+OUTPUTS = 6
+
+DEFAULT_WEIGHTS = Path(__file__).resolve().parent.parent / "soccer_weights.npz"
+
+# Weight storage `quantize` can produce. Activations are float32 throughout
+PRECISIONS = ("float32", "float16", "int8")
+
+# Points the offset features are measured to: players 0-7, ball, enemy goal, own goal
+_BALL, _ENEMY_GOAL, _OWN_GOAL = 2 * NUM_PLAYERS, 2 * NUM_PLAYERS + 1, 2 * NUM_PLAYERS + 2
+# For each player, the points whose offsets fill columns 2-3, 6-19 and 28-31
+_OFFSET_POINTS = np.array([
+    [_BALL] + [j for j in range(NUM_PLAYERS) if j != i] + list(range(NUM_PLAYERS, 2 * NUM_PLAYERS)) + [_ENEMY_GOAL, _OWN_GOAL]
+    for i in range(NUM_PLAYERS)
+])
+_OFFSET_COLUMNS = np.r_[2:4, 6:20, 28:32]
+_ONE_HOT = np.eye(NUM_PLAYERS)
+
+_LOCAL_HEADER = 30
+
+
+def load_npz(path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """Arrays of an .npz, memory-mapped where the archive stores them
+    uncompressed (np.savez does). Compressed or pickled members are read"""
+    path = Path(path)
+    arrays = {}
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type == zipfile.ZIP_STORED:
+                # The local header's extra field can differ from the central directory's
+                name_len, extra_len = struct.unpack_from("<HH", buffer, info.header_offset + 26)
+                start = info.header_offset + _LOCAL_HEADER + name_len + extra_len
+                header = io.BytesIO(buffer[start:start + min(info.file_size, 1 << 16)])
+                version = npy_format.read_magic(header)
+                read_header = npy_format.read_array_header_1_0 if version == (1, 0) else npy_format.read_array_header_2_0
+                shape, fortran, dtype = read_header(header)
+                if not dtype.hasobject:
+                    arrays[name] = np.ndarray(shape, dtype, buffer=buffer, offset=start + header.tell(),
+                                              order="F" if fortran else "C")
+                    continue
+            with archive.open(info) as member:
+                arrays[name] = np.load(member, allow_pickle=True)
+    return arrays
+
+
+def read_layers(arrays: Dict[str, np.ndarray]) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """(weights, biases) from either export layout: `weight_i` / `bias_i` /
+    `num_layers` arrays, or the `weights` / `biases` lists train.py saves"""
+    if "num_layers" in arrays:
+        n = int(arrays["num_layers"])
+        return [arrays[f"weight_{i}"] for i in range(n)], [arrays[f"bias_{i}"] for i in range(n)]
+    return list(arrays["weights"]), list(arrays["biases"])
+
+
+def save_layers(path: Union[str, Path, BinaryIO], weights: List[np.ndarray], biases: List[np.ndarray], **extra):
+    """Writes the `weight_i` / `bias_i` layout, uncompressed so it can be mapped"""
+    arrays = {f"weight_{i}": w for i, w in enumerate(weights)}
+    arrays.update({f"bias_{i}": b for i, b in enumerate(biases)})
+    np.savez(path, num_layers=np.array(len(weights)), **arrays, **extra)
+
+
+def read_scales(arrays: Dict[str, np.ndarray]) -> Optional[List[np.ndarray]]:
+    """Per-column `scale_i` of an int8 export, or None for float weights"""
+    if "scale_0" not in arrays:
+        return None
+    return [arrays[f"scale_{i}"] for i in range(int(arrays["num_layers"]))]
+
+
+def quantize(weights: List[np.ndarray], precision: str) -> Tuple[List[np.ndarray], Optional[List[np.ndarray]]]:
+    """(stored weights, scales) at `precision`, one of PRECISIONS. int8 is
+    symmetric per output column: w ~= q * scale with q in [-127, 127]"""
+    if precision == "int8":
+        scales = [np.maximum(np.abs(w).max(axis=0), 1e-12).astype(np.float32) / 127.0 for w in weights]
+        return [np.clip(np.rint(w / s), -127, 127).astype(np.int8) for w, s in zip(weights, scales)], scales
+    assert precision in PRECISIONS, f"unknown precision {precision}, expected one of {PRECISIONS}"
+    return [np.asarray(w, dtype=precision) for w in weights], None
+
+
+def save_quantized(path: Union[str, Path], source: Union[str, Path], precision: str):
+    """Converts the export at `source` to `precision`; biases stay float32"""
+    weights, biases = read_layers(load_npz(source))
+    stored, scales = quantize([np.asarray(w, dtype=np.float32) for w in weights], precision)
+    extra = {f"scale_{i}": s for i, s in enumerate(scales)} if scales is not None else {}
+    save_layers(path, stored, [np.asarray(b, dtype=np.float32) for b in biases], **extra)
+
+
+class MLP:
+    """Dense ReLU network with a tanh output. Weights may be float16 or int8
+    (with `scales`, one per output column); they are used as stored, so a
+    mapped export stays at its size in memory, and widened to float32 inside
+    each matmul. `dequantized()` trades that memory for float32 speed."""
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray], scales: Optional[List[np.ndarray]] = None):
+        assert len(weights) == len(biases) and weights, "need one bias per weight matrix"
+        for w, b in zip(weights, biases):
+            assert w.ndim == 2 and b.shape == (w.shape[1],), f"bad layer shapes {w.shape} {b.shape}"
+        for a, b in zip(weights, weights[1:]):
+            assert a.shape[1] == b.shape[0], f"layers do not chain: {a.shape} -> {b.shape}"
+        assert scales is None or [s.shape for s in scales] == [b.shape for b in biases], "need one scale per column"
+        self.weights = weights
+        self.biases = biases
+        self.scales = scales
+
+    @classmethod
+    def from_npz(cls, path: Union[str, Path] = DEFAULT_WEIGHTS) -> "MLP":
+        arrays = load_npz(path)
+        return cls(*read_layers(arrays), read_scales(arrays))
+
+    @property
+    def inputs(self) -> int:
+        return self.weights[0].shape[0]
+
+    @property
+    def outputs(self) -> int:
+        return self.weights[-1].shape[1]
+
+    @property
+    def precision(self) -> str:
+        return self.weights[0].dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        arrays = self.weights + self.biases + (self.scales or [])
+        return sum(a.nbytes for a in arrays)
+
+    def dequantized(self) -> "MLP":
+        """float32 copy, as fast as an unquantized network"""
+        scales = self.scales or [1.0] * len(self.weights)
+        weights = [np.asarray(w, dtype=np.float32) * s for w, s in zip(self.weights, scales)]
+        return MLP(weights, [np.asarray(b, dtype=np.float32) for b in self.biases])
+
+    def forward(self, x: np.ndarray) -> np.ndarray:
+        """(N, inputs) -> (N, outputs)"""
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            x = x @ w
+            if self.scales is not None:
+                x *= self.scales[i]
+            x += b
+            if i < last:
+                np.maximum(x, 0.0, out=x)
+        return np.tanh(x, out=x)
+
+
+def encode(game: GameState, config: GameConfig, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """(4, FEATURES) network input for our players"""
+    if out is None:
+        out = np.zeros((NUM_PLAYERS, FEATURES), dtype=np.float32)
+    raw = np.frombuffer(game, dtype=GAME_STATE_DTYPE, count=1)[0]
+    w, h = config.field.width, config.field.height
+
+    points = np.empty((_OWN_GOAL + 1, 2))
+    points[:_BALL] = raw["players"]["pos"]
+    ball = raw["ball"]
+    points[_BALL] = ball["pos"]
+    points[_ENEMY_GOAL] = (w, h * 0.5)
+    points[_OWN_GOAL] = (0.0, h * 0.5)
+    points *= (1.0 / w, 1.0 / h)
+    own = points[:NUM_PLAYERS]
+
+    out[:, 0:2] = own
+    offsets = points[_OFFSET_POINTS] - own[:, None]                     # (4, 11, 2)
+    out[:, _OFFSET_COLUMNS] = offsets.reshape(NUM_PLAYERS, -1)
+    out[:, 4:6] = ball["vel"] * (1.0 / config.player.pass_speed)
+
+    out[:, 20:24] = 0.0
+    if game._ball_possession.type == BallPossessionType.Possessed:
+        owner = game._ball_possession.data.possessed.owner
+        if owner < NUM_PLAYERS:
+            out[:, 20] = 1.0
+            out[owner, 23] = 1.0
+        else:
+            out[:, 21] = 1.0
+    else:
+        out[:, 22] = 1.0
+    out[:, 24:28] = _ONE_HOT
+
+    tick = game.tick
+    score = game.score
+    out[:, 32] = tick / (config.max_ticks + config.endgame_ticks)
+    out[:, 33] = tick > config.max_ticks
+    out[:, 34] = min(max((score.self - score.other) / 5.0, -1.0), 1.0)
+    return out
+
+
+def decode(outputs: np.ndarray, holder: Optional[int]) -> List[PlayerAction]:
+    """Actions from (4, OUTPUTS) network output"""
+    actions = []
+    # Four rows: plain floats beat NumPy calls here
+    for i, (mx, my, px, py, gate, throttle) in enumerate(outputs.tolist()):
+        length = math.hypot(mx, my)
+        scale = (throttle + 1.0) * 0.5 / length if length > 1e-6 else 0.0
+        ball_pass = FastVec2(px, py) if i == holder and gate > 0 else None
+        actions.append(PlayerAction(FastVec2(mx * scale, my * scale), ball_pass))
+    return actions
+
+
+def encode_batch(raw: np.ndarray, config: GameConfig) -> np.ndarray:
+    """`encode` for an (N,) GAME_STATE_DTYPE array: (N, 4, FEATURES)"""
+    n = len(raw)
+    out = np.zeros((n, NUM_PLAYERS, FEATURES), dtype=np.float32)
+    w, h = config.field.width, config.field.height
+
+    points = np.empty((n, _OWN_GOAL + 1, 2))
+    points[:, :_BALL] = raw["players"]["pos"]
+    points[:, _BALL] = raw["ball"]["pos"]
+    points[:, _ENEMY_GOAL] = (w, h * 0.5)
+    points[:, _OWN_GOAL] = (0.0, h * 0.5)
+    points *= (1.0 / w, 1.0 / h)
+    own = points[:, :NUM_PLAYERS]
+
+    out[..., 0:2] = own
+    offsets = points[:, _OFFSET_POINTS] - own[:, :, None]               # (N, 4, 11, 2)
+    out[..., _OFFSET_COLUMNS] = offsets.reshape(n, NUM_PLAYERS, -1)
+    out[..., 4:6] = raw["ball"]["vel"][:, None] * (1.0 / config.player.pass_speed)
+
+    owners = holders(raw)
+    possessed = raw["_ball_possession"]["type"] == BallPossessionType.Possessed
+    ours = possessed & (raw["_ball_possession"]["data"]["possessed"]["owner"] < NUM_PLAYERS)
+    out[..., 20] = ours[:, None]
+    out[..., 21] = (possessed & ~ours)[:, None]
+    out[..., 22] = ~possessed[:, None]
+    out[ours, owners[ours], 23] = 1.0
+    out[..., 24:28] = _ONE_HOT
+
+    tick = raw["tick"].astype(np.float64)
+    score = raw["score"]
+    out[..., 32] = (tick / (config.max_ticks + config.endgame_ticks))[:, None]
+    out[..., 33] = (tick > config.max_ticks)[:, None]
+    out[..., 34] = np.clip((score["self"].astype(np.float64) - score["other"]) / 5.0, -1.0, 1.0)[:, None]
+    return out
+
+
+def holders(raw: np.ndarray) -> np.ndarray:
+    """(N,) index of our player holding the ball in each state, -1 for none"""
+    possession = raw["_ball_possession"]
+    owner = possession["data"]["possessed"]["owner"].astype(np.int64)
+    ours = (possession["type"] == BallPossessionType.Possessed) & (owner < NUM_PLAYERS)
+    return np.where(ours, owner, -1)
+
+
+def decode_batch(outputs: np.ndarray, holder: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """`decode` for (N, 4, OUTPUTS) outputs and (N,) holders: (dirs, passes, has_pass)"""
+    move = outputs[..., 0:2].astype(np.float64)
+    length = np.hypot(move[..., 0], move[..., 1])
+    scale = np.where(length > 1e-6, (outputs[..., 5] + 1.0) * 0.5 / np.maximum(length, 1e-6), 0.0)
+    has_pass = (np.arange(NUM_PLAYERS) == holder[:, None]) & (outputs[..., 4] > 0)
+    return move * scale[..., None], outputs[..., 2:4].astype(np.float64), has_pass
+
+
+class MLPPolicy:
+    """On-tick callable around an MLP; the input buffer is reused every tick"""
+
+    def __init__(self, model: MLP):
+        assert model.inputs == FEATURES and model.outputs == OUTPUTS, \
+            f"network is {model.inputs} -> {model.outputs}, expected {FEATURES} -> {OUTPUTS}"
+        self.model = model
+        self.features = np.zeros((NUM_PLAYERS, FEATURES), dtype=np.float32)
+
+    def __call__(self, game: GameState) -> List[PlayerAction]:
+        x = encode(game, get_config(), self.features)
+        owner = game.ball_owner
+        return decode(self.model.forward(x), owner if owner is not None and owner < NUM_PLAYERS else None)
+
+
+_policy: Optional[MLPPolicy] = None
+
+
+def mlp_strategy(game: GameState) -> List[PlayerAction]:
+    """Plays the exported network in DEFAULT_WEIGHTS, loaded on the first tick"""
+    global _policy
+    if _policy is None:
+        _policy = MLPPolicy(MLP.from_npz(DEFAULT_WEIGHTS))
+    return _policy(game)
@@ -0,0 +1,54 @@
+import numpy as np
+from typing import NamedTuple, Tuple
+from . import *
+
+# Tunable constants of the strategies in main.py. The defaults are the
+# hand-picked values; sim/search.py tunes them in simulation.
+
+Slots = Tuple[Tuple[float, float], ...]
+
+
+class StrategyParams(NamedTuple):
+    receiver_safe_radius: float = 80.0      # no opponent this close to a pass receiver
+    shot_range: float = 270.0               # side runner shoots from this close to goal
+    screener_radius: float = 69.0           # screener goes for the ball inside this
+    block_radius_scale: float = 2.5         # lane blocked within this many player radii
+    cheese_slots: Slots = (
+        (0.3, 0.5),    # Player 0: Ball rusher - closer to center
+        (0.25, 0.85),  # Player 1: Back corner receiver - in back corner
+        (0.5, 0.9),    # Player 2: Side field runner - side position
+        (0.5, 0.9),    # Player 3: Support - defensive position
+    )
+
+    def to_vector(self) -> np.ndarray:
+        """Flat float vector, in the order of PARAM_BOUNDS"""
+        scalars = [self.receiver_safe_radius, self.shot_range, self.screener_radius, self.block_radius_scale]
+        return np.array(scalars + [f for slot in self.cheese_slots for f in slot])
+
+    @classmethod
+    def from_vector(cls, vector) -> "StrategyParams":
+        v = [float(x) for x in np.clip(vector, PARAM_BOUNDS[:, 0], PARAM_BOUNDS[:, 1])]
+        slots = tuple((v[i], v[i + 1]) for i in range(4, 4 + 2 * NUM_PLAYERS, 2))
+        return cls(v[0], v[1], v[2], v[3], slots)
+
+
+# (low, high) per entry of `to_vector`
+PARAM_BOUNDS = np.array(
+    [(20.0, 200.0), (100.0, 600.0), (20.0, 200.0), (1.0, 5.0)]
+    # Formation slots stay in our half
+    + [(0.02, 0.5), (0.02, 0.98)] * NUM_PLAYERS
+)
+
+DEFAULT_PARAMS = StrategyParams()
+
+params = DEFAULT_PARAMS
+
+
+def get_params() -> StrategyParams:
+    return params
+
+
+def set_params(new_params: StrategyParams):
+    """Installs the constants the strategies read from now on"""
+    global params
+    params = new_params
@@ -1,17 +1,25 @@
 import sys
+import signal
 import asyncio
 from pathlib import Path
 from strategy.main import get_strategy
 from core.ipc import EngineChannel
+from core.replay import ReplayRecorder
 
 async def run() -> None:
     args = sys.argv
     if len(args) < 2:
-        print("usage: [bin name] [shmem path]")
+        print("usage: [bin name] [shmem path] [wake fifo (optional)]")
         return
 
     path = Path(args[1])
-    chan = EngineChannel.from_path(path)
+    wake_path = Path(args[2]) if len(args) > 2 else None
+    # MM_REPLAY=<file or directory> records the match (see core/replay.py)
+    recorder = ReplayRecorder.from_env()
+    if recorder is not None:
+        # The engine ends a match with SIGTERM; exit normally so the replay is trimmed
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    chan = EngineChannel.from_path(path, wake_path, recorder=recorder)
 
     team = await chan.handle_handshake()
 
@@ -0,0 +1,23 @@
+import itertools
+import tracemalloc
+from core.ipc import EngineChannel, EngineStatus, ProtocolId, Shm, Strategy
+
+
+def respond_peak(chan: EngineChannel, strategy: Strategy, ticks: int) -> int:
+    """Largest number of bytes live at once, above the starting point, while
+    `respond` answers `ticks` tick messages; 0 means nothing was allocated"""
+    shm = Shm.from_buffer(chan.mmap, 0)
+    protocol = shm.protocol
+    # Made up front; yields None, so the loop itself allocates nothing
+    loop = itertools.repeat(None, ticks)
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in loop:
+        protocol.type = ProtocolId.TickMsg
+        shm.sync = EngineStatus.Ready
+        chan.respond(strategy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del protocol, shm
+    return peak - base
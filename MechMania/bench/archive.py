@@ -0,0 +1,78 @@
+"""Size and decode speed of replay.archive.
+
+Packs replays (the given ones, or a synthetic one made of up to N consecutive
+ticks of a simulated game) and reports the compression ratio, the largest
+error per quantized field, and how fast blocks decode forwards and
+backwards.
+
+Run from the MechMania directory:  python -m bench.archive [ticks | REPLAY ...]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from core.conf import default_config
+from core.replay import ReplayRecorder, ReplayHeader, RecordKind, HEADER_SIZE
+from replay.reader import Replay
+from replay.archive import Archive, pack, errors, ARCHIVE_SUFFIX
+from bench.states import played_states
+
+
+def write_game(path: str, n: int):
+    """A replay of N consecutive ticks team A saw in one simulated game"""
+    recorder = ReplayRecorder(path, capacity=HEADER_SIZE + (1 << 20))
+    recorder.close()
+    with Replay(path, build_index=False) as empty:
+        dtype = empty.dtype
+    states = played_states(n, default_config(), games=1, every=1)
+    records = np.zeros(len(states), dtype=dtype)
+    records["kind"] = RecordKind.Tick
+    records["data"]["tick"]["state"] = np.frombuffer(b"".join(bytes(g) for g in states), dtype=dtype["data"]["tick"]["state"])
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE)
+        f.write(records.tobytes())
+        f.seek(ReplayHeader.records.offset)
+        f.write(len(records).to_bytes(8, "little"))
+
+
+def report(path: str):
+    target = path + ARCHIVE_SUFFIX
+    with Replay(path, build_index=False) as replay:
+        start = time.perf_counter()
+        with open(target, "wb") as f:
+            pack(replay, f)
+        packed = time.perf_counter() - start
+        raw = replay.records.nbytes
+        size = os.path.getsize(target)
+        print(f"{path}: {len(replay.records)} records, {raw / 1e6:.1f} MB -> {size / 1e6:.2f} MB "
+              f"({raw / size:.1f}x), packed at {raw / packed / 1e6:.0f} MB/s")
+
+        with Archive(target) as archive:
+            for label, reverse in (("forwards", False), ("backwards", True)):
+                start = time.perf_counter()
+                blocks = list(archive.blocks(reverse))
+                seconds = time.perf_counter() - start
+                print(f"  decode {label:<10} {len(replay.records) / seconds / 1e6:.2f}M records/s "
+                      f"({raw / seconds / 1e6:.0f} MB/s of raw records)")
+            decoded = np.frombuffer(b"".join(block.tobytes() for block in reversed(blocks)), dtype=archive.dtype)
+        for name, error in errors(replay.records, decoded).items():
+            print(f"  {name:<32} max error {error:.6f}")
+    os.remove(target)
+
+
+def main():
+    args = sys.argv[1:]
+    if args and not args[0].isdigit():
+        for path in args:
+            report(path)
+        return
+    n = int(args[0]) if args else 50_000
+    path = os.path.join(tempfile.gettempdir(), "bench-archive.mmr")
+    write_game(path, n)
+    report(path)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Game-ticks per second of the batched simulator.
+
+Runs N games in lock-step for a fixed number of ticks, first with the native
+batched chase policy on both sides, then with the real strategy driven
+through StrategyPolicy (one on_tick call per game per tick).
+
+Run from the MechMania directory:  python -m bench.batch [games] [ticks]
+"""
+import sys
+import time
+import numpy as np
+from core.conf import default_config
+from core.ipc import set_config, get_geometry
+from sim.batch import BatchMatch, StrategyPolicy, chase_policy, play
+from strategy.main import cheese_formation, modified_strategy, CHEESE_SLOTS
+from core.ipc import Strategy
+
+
+def run(name: str, n: int, ticks: int, make_policies):
+    config = default_config()
+    match = BatchMatch(config, n, seed=0)
+    policies = make_policies(config, n)
+    start = time.perf_counter()
+    result = play(match, policies, ticks)
+    elapsed = time.perf_counter() - start
+    goals = result.score.sum()
+    print(f"{name:<22} {n:>6} games {result.ticks:>6} ticks  "
+          f"{n * result.ticks / elapsed:>10.0f} game-ticks/s  {goals:>5} goals")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    set_config(default_config())
+    slots = np.array([(fx * get_geometry().field.x, fy * get_geometry().field.y) for fx, fy in CHEESE_SLOTS])
+
+    def chase(config, n):
+        policy = chase_policy(config, slots)
+        return policy, policy
+
+    def strategy(config, n):
+        return tuple(StrategyPolicy(Strategy(cheese_formation, modified_strategy), config, n, team).policy()
+                     for team in (0, 1))
+
+    run("chase (native)", n, ticks, chase)
+    run("modified_strategy", max(n // 64, 1), ticks, strategy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Mirror-image shot planner vs the old four-wall search.
+
+For every random state the striker aims at one of the enemy goal posts. Each
+method's shot is then played out tick by tick: pass speed, per-tick friction
+and elastic wall bounces, with opponents standing still. A shot counts as on
+target when the ball passes within `TOLERANCE` of the post before it stops,
+before it comes within the blocking radius of an opponent, and without
+crossing our own goal line.
+
+Run from the MechMania directory:  python -m bench.bounce [states]
+"""
+import sys
+import time
+import random
+from core.ipc import set_config, get_geometry
+from core.conf import default_config, NUM_PLAYERS
+from core.util import FastVec2
+from strategy.context import TickContext
+from strategy.main import calculate_wall_shot_to_corner
+from bench.states import random_states
+
+TOLERANCE = 10.0
+MAX_TICKS = 400
+
+
+def legacy_shot_blocked(start_pos, target_pos, ctx):
+    shot_vector = target_pos - start_pos
+    shot_distance = shot_vector.norm()
+    if shot_distance == 0:
+        return False
+    shot_direction = shot_vector.normalize()
+    for enemy in ctx.opponents:
+        to_enemy = enemy - start_pos
+        projection = to_enemy.dot(shot_direction)
+        if 0 < projection < shot_distance:
+            if abs(to_enemy.x * shot_direction.y - to_enemy.y * shot_direction.x) < ctx.block_radius:
+                return True
+    return False
+
+
+def legacy_wall_shot(player_pos, corner_pos, field, ctx):
+    # The old calculate_wall_shot_to_corner: first open wall in a fixed order,
+    # only the leg up to the wall is checked
+    if player_pos.y > field.y * 0.3 and corner_pos.y != 0:
+        wall_hit_x = (corner_pos.x * player_pos.y + player_pos.x * corner_pos.y) / (player_pos.y + corner_pos.y)
+        if 0 <= wall_hit_x <= field.x:
+            bounce_point = FastVec2(wall_hit_x, 0)
+            if not legacy_shot_blocked(player_pos, bounce_point, ctx):
+                return (bounce_point - player_pos).normalize()
+    if player_pos.y < field.y * 0.7 and corner_pos.y != field.y:
+        denominator = (field.y - player_pos.y) + (corner_pos.y - field.y)
+        if abs(denominator) > 0.001:
+            wall_hit_x = (corner_pos.x * (field.y - player_pos.y) + player_pos.x * (field.y - corner_pos.y)) / denominator
+            if 0 <= wall_hit_x <= field.x:
+                bounce_point = FastVec2(wall_hit_x, field.y)
+                if not legacy_shot_blocked(player_pos, bounce_point, ctx):
+                    return (bounce_point - player_pos).normalize()
+    if player_pos.x > field.x * 0.3 and corner_pos.x != 0:
+        wall_hit_y = (corner_pos.y * player_pos.x + player_pos.y * corner_pos.x) / (player_pos.x + corner_pos.x)
+        if 0 <= wall_hit_y <= field.y:
+            bounce_point = FastVec2(0, wall_hit_y)
+            if not legacy_shot_blocked(player_pos, bounce_point, ctx):
+                return (bounce_point - player_pos).normalize()
+    if player_pos.x < field.x * 0.7 and corner_pos.x != field.x:
+        denominator = (field.x - player_pos.x) + (corner_pos.x - field.x)
+        if abs(denominator) > 0.001:
+            wall_hit_y = (corner_pos.y * (field.x - player_pos.x) + player_pos.y * (field.x - corner_pos.x)) / denominator
+            if 0 <= wall_hit_y <= field.y:
+                bounce_point = FastVec2(field.x, wall_hit_y)
+                if not legacy_shot_blocked(player_pos, bounce_point, ctx):
+                    return (bounce_point - player_pos).normalize()
+    if legacy_shot_blocked(player_pos, corner_pos, ctx):
+        return None
+    return (corner_pos - player_pos).normalize()
+
+
+def play_out(shooter, direction, target, ctx, config):
+    """Ticks until the ball reaches `target`, or None if it never does"""
+    geometry = get_geometry()
+    w, h = geometry.field.x, geometry.field.y
+    mouth = geometry.own_goal
+    x, y = shooter.x, shooter.y
+    vx, vy = direction.x * config.player.pass_speed, direction.y * config.player.pass_speed
+    k = 1.0 - config.ball.friction
+    substeps = 4
+    for tick in range(1, MAX_TICKS):
+        for _ in range(substeps):
+            x += vx / substeps
+            y += vy / substeps
+            if x < 0:
+                if mouth.top.y <= y <= mouth.bottom.y:
+                    return None  # own goal
+                x, vx = -x, -vx
+            elif x > w:
+                x, vx = 2 * w - x, -vx
+            if y < 0:
+                y, vy = -y, -vy
+            elif y > h:
+                y, vy = 2 * h - y, -vy
+            if (x - target.x) ** 2 + (y - target.y) ** 2 <= TOLERANCE ** 2:
+                return tick
+            for enemy in ctx.opponents:
+                if (x - enemy.x) ** 2 + (y - enemy.y) ** 2 < ctx.block_radius ** 2:
+                    return None
+        vx *= k
+        vy *= k
+        if vx * vx + vy * vy < 0.01:
+            return None
+    return None
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    config = default_config()
+    set_config(config)
+    geometry = get_geometry()
+    rng = random.Random(0)
+    cases = []
+    for game in random_states(n, config):
+        ctx = TickContext(game, config)
+        shooter = ctx.positions[rng.randrange(NUM_PLAYERS)]
+        target = rng.choice((geometry.enemy_goal.top, geometry.enemy_goal.bottom))
+        cases.append((ctx, shooter, target))
+
+    methods = {
+        "first open wall": lambda ctx, p, t: legacy_wall_shot(p, t, ctx.field, ctx),
+        "mirror planner": lambda ctx, p, t: calculate_wall_shot_to_corner(p, t, ctx.field, ctx),
+    }
+
+    print(f"{'method':<16} {'us/call':>8} {'shot found':>11} {'on target':>10} {'ticks (mean)':>13}")
+    for name, fn in methods.items():
+        start = time.perf_counter()
+        shots = [fn(ctx, p, t) for ctx, p, t in cases]
+        per_call = (time.perf_counter() - start) / n
+
+        found = [(case, shot) for case, shot in zip(cases, shots) if shot is not None]
+        ticks = [play_out(p, shot, t, ctx, config) for (ctx, p, t), shot in found]
+        hits = [t for t in ticks if t is not None]
+        print(f"{name:<16} {per_call * 1e6:>8.1f} {len(found) / n:>10.1%} {len(hits) / n:>9.1%} "
+              f"{sum(hits) / max(len(hits), 1):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Intercept solver vs the two sampled searches it replaced.
+
+Accuracy is measured on the reference ball model (per-tick friction decay):
+each method picks a target, a player runs straight at it, and we count how
+many ticks later than the best possible tick the ball is actually touched.
+
+Run from the MechMania directory:  python -m bench.intercept [cases]
+"""
+import sys
+import math
+import time
+import random
+import numpy as np
+from core.conf import default_config
+from core.util import FastVec2
+from strategy.intercept import intercept_point, intercept_times
+
+HORIZON = 1500
+
+
+def sampled_intercept(player_pos, ball_pos, ball_velocity, ball_friction, player_speed):
+    # The old calculate_intercept_point: 9 fixed time samples
+    if ball_velocity.norm() < 0.001:
+        return ball_pos
+    best_intercept = ball_pos
+    best_ratio = float('inf')
+    for t in [0.1, 0.2, 0.3, 0.5, 0.8, 1.0, 1.5, 2.0, 3.0]:
+        ball_direction = ball_velocity.normalize()
+        if max(0, ball_velocity.norm() - ball_friction * t) <= 0 and t >= ball_velocity.norm() / ball_friction:
+            distance_traveled = (ball_velocity.norm() ** 2) / (2 * ball_friction)
+        else:
+            distance_traveled = ball_velocity.norm() * t - 0.5 * ball_friction * t * t
+        predicted_ball_pos = ball_pos + ball_direction * max(0, distance_traveled)
+        player_time = (predicted_ball_pos - player_pos).norm() / player_speed
+        time_ratio = abs(player_time - t) / max(t, 0.1)
+        if time_ratio < best_ratio:
+            best_ratio = time_ratio
+            best_intercept = predicted_ball_pos
+    if best_ratio > 2.0:
+        ball_direction = ball_velocity.normalize()
+        future_distance = ball_velocity.norm() * 0.5 - 0.5 * ball_friction * 0.25
+        best_intercept = ball_pos + ball_direction * max(0, future_distance)
+    return best_intercept
+
+
+def stepped_intercept(player_pos, ball_pos, ball_velocity, ball_friction, player_speed):
+    # The old new_strategy rusher search: range(0, 1201, 75) with a quadratic per step
+    ball_speed = ball_velocity.norm()
+    ball_direction = ball_velocity.normalize()
+    best_distance = 800.0
+    best_time_diff = float('inf')
+    for test_distance in range(0, 1201, 75):
+        a = -0.5 * ball_friction
+        b = ball_speed
+        c = -test_distance
+        discriminant = b * b - 4 * a * c
+        if discriminant >= 0:
+            t1 = (-b + (discriminant**0.5)) / (2 * a)
+            t2 = (-b - (discriminant**0.5)) / (2 * a)
+            ball_time = min([t for t in [t1, t2] if t > 0], default=test_distance / ball_speed)
+        else:
+            ball_time = test_distance / ball_speed
+        predicted_pos = ball_pos + ball_direction * test_distance
+        player_time = (predicted_pos - player_pos).norm() / player_speed
+        adjusted_time_diff = abs(player_time - ball_time) - test_distance / 10000.0
+        if adjusted_time_diff < best_time_diff:
+            best_time_diff = adjusted_time_diff
+            best_distance = test_distance
+    return ball_pos + ball_direction * best_distance
+
+
+def catch_tick(player_pos, target, ball_pos, ball_vel, friction, speed, reach) -> int:
+    # Reference trajectory: player runs straight at `target` and stops there
+    px, py = player_pos.x, player_pos.y
+    bx, by, vx, vy = ball_pos.x, ball_pos.y, ball_vel.x, ball_vel.y
+    for n in range(HORIZON):
+        if (bx - px) ** 2 + (by - py) ** 2 <= reach * reach:
+            return n
+        dx, dy = target.x - px, target.y - py
+        d = math.hypot(dx, dy)
+        if d > speed:
+            px += dx / d * speed
+            py += dy / d * speed
+        else:
+            px, py = target.x, target.y
+        bx += vx
+        by += vy
+        vx *= 1 - friction
+        vy *= 1 - friction
+    return HORIZON
+
+
+def best_tick(player_pos, ball_pos, ball_vel, friction, speed, reach) -> int:
+    bx, by, vx, vy = ball_pos.x, ball_pos.y, ball_vel.x, ball_vel.y
+    for n in range(HORIZON):
+        if math.hypot(bx - player_pos.x, by - player_pos.y) <= speed * n + reach:
+            return n
+        bx += vx
+        by += vy
+        vx *= 1 - friction
+        vy *= 1 - friction
+    return HORIZON
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    config = default_config()
+    friction, speed, reach = config.ball.friction, config.player.speed, config.player.pickup_radius
+    w, h = config.field.width, config.field.height
+    rng = random.Random(0)
+    cases = []
+    for _ in range(n):
+        cases.append((
+            FastVec2(rng.uniform(0, w), rng.uniform(0, h)),
+            FastVec2(rng.uniform(0, w), rng.uniform(0, h)),
+            FastVec2(rng.uniform(-1, 1), rng.uniform(-1, 1)).normalize() * rng.uniform(1, config.player.pass_speed),
+        ))
+
+    methods = {
+        "sampled (9 t)": lambda p, b, v: sampled_intercept(p, b, v, friction, speed),
+        "stepped (75u)": lambda p, b, v: stepped_intercept(p, b, v, friction, speed),
+        "solver": lambda p, b, v: intercept_point(p, b, v, friction, speed, reach),
+    }
+
+    print(f"{'method':<16} {'us/call':>8} {'late ticks (mean)':>18} {'late ticks (p90)':>17} {'missed':>7}")
+    for name, fn in methods.items():
+        start = time.perf_counter()
+        targets = [fn(p, b, v) for p, b, v in cases]
+        per_call = (time.perf_counter() - start) / n
+
+        late = []
+        missed = 0
+        for (p, b, v), target in zip(cases, targets):
+            got = catch_tick(p, target, b, v, friction, speed, reach)
+            if got >= HORIZON:
+                missed += 1
+                continue
+            late.append(got - best_tick(p, b, v, friction, speed, reach))
+        late.sort()
+        print(f"{name:<16} {per_call * 1e6:>8.1f} {sum(late) / max(len(late), 1):>18.2f} "
+              f"{late[int(len(late) * 0.9)] if late else 0:>17} {missed:>7}")
+
+    # Many players against one ball in a single call vs one scalar call each
+    print()
+    ball_pos, ball_vel = cases[0][1], cases[0][2]
+    for count in (8, 1024):
+        players = np.array([[rng.uniform(0, w), rng.uniform(0, h)] for _ in range(count)])
+        reps = max(20000 // count, 5)
+        start = time.perf_counter()
+        for _ in range(reps):
+            intercept_times(players, (ball_pos.x, ball_pos.y), (ball_vel.x, ball_vel.y), friction, speed, reach)
+        vectorized = (time.perf_counter() - start) / reps
+        start = time.perf_counter()
+        for _ in range(max(reps // 10, 1)):
+            for x, y in players:
+                intercept_point(FastVec2(x, y), ball_pos, ball_vel, friction, speed, reach)
+        scalar = (time.perf_counter() - start) / max(reps // 10, 1)
+        print(f"{count:>5} players: vectorized {vectorized * 1e6:>9.1f} us, scalar calls {scalar * 1e6:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Batched lane clearance vs the per-lane Python loop it replaced.
+
+Every tick a strategy may look at 4x4 passing lanes plus 4 shots at the goal
+and a handful of wall-bounce shots. The loop checks one lane against one
+opponent at a time; `lane_clearance` does all of them in one NumPy pass.
+
+Run from the MechMania directory:  python -m bench.lanes [states]
+"""
+import sys
+import time
+import numpy as np
+from core.ipc import set_config
+from core.conf import default_config, NUM_PLAYERS
+from strategy.context import TickContext
+from strategy.lanes import lane_clearance
+from bench.states import random_states
+
+
+def loop_clear(passer_pos, receiver_pos, opponents, radius):
+    # The old is_passing_lane_clear
+    pass_vector = receiver_pos - passer_pos
+    pass_distance = pass_vector.norm()
+    if pass_distance < 1.0:
+        return True
+    pass_direction = pass_vector.normalize()
+    for opp_pos in opponents:
+        projection_length = (opp_pos - passer_pos).dot(pass_direction)
+        if 0 <= projection_length <= pass_distance:
+            projection_point = passer_pos + pass_direction * projection_length
+            if (opp_pos - projection_point).norm() < radius:
+                return False
+    return True
+
+
+def timed(fn, reps):
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - start) / reps * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    config = default_config()
+    set_config(config)
+    contexts = [TickContext(game, config) for game in random_states(n, config)]
+    radius = contexts[0].block_radius
+
+    def loop_all(ctx):
+        targets = ctx.teammates + [ctx.enemy_goal]
+        return [[loop_clear(p, t, ctx.opponents, radius) for t in targets] for p in ctx.teammates]
+
+    def batched_all(ctx):
+        targets = np.append(ctx.points[:NUM_PLAYERS], complex(ctx.enemy_goal.x, ctx.enemy_goal.y))
+        return lane_clearance(ctx.points[:NUM_PLAYERS], targets, ctx.points[NUM_PLAYERS:], radius)[0].tolist()
+
+    mismatches = sum(loop_all(ctx) != batched_all(ctx) for ctx in contexts)
+
+    print(f"{'lanes':<22} {'loop us':>8} {'batched us':>11}")
+    loop_us = sum(timed(lambda: loop_all(ctx), 20) for ctx in contexts) / n
+    batched_us = sum(timed(lambda: batched_all(ctx), 20) for ctx in contexts) / n
+    print(f"{'4 x (4 + goal)':<22} {loop_us:>8.1f} {batched_us:>11.1f}")
+
+    # Larger batches, e.g. a planner scoring many bounce points
+    rng = np.random.default_rng(0)
+    for origins, targets in ((4, 64), (4, 512)):
+        o = rng.uniform(0, 600, (origins, 2))
+        t = rng.uniform(0, 600, (targets, 2))
+        b = rng.uniform(0, 600, (NUM_PLAYERS, 2))
+        batched_us = timed(lambda: lane_clearance(o, t, b, radius), 200)
+        print(f"{f'{origins} x {targets}':<22} {'':>8} {batched_us:>11.1f}")
+
+    print(f"\nmismatched states: {mismatches} / {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-tick latency of the NumPy MLP next to the hand-written strategies.
+
+Every strategy runs on the same random states. For the MLP the tick is also
+split into encoding the input, the forward pass and decoding the actions.
+
+Run from the MechMania directory:  python -m bench.mlp [states] [weights.npz]
+"""
+import sys
+import time
+import numpy as np
+import strategy.main as strategies
+from core.ipc import set_config, get_config
+from core.conf import default_config, NUM_PLAYERS
+from strategy.mlp import MLP, MLPPolicy, DEFAULT_WEIGHTS, encode, decode
+from bench.states import random_states
+
+STRATEGIES = ["modified_strategy", "new_strategy", "ball_chase", "goaliestuff"]
+
+
+def latencies(fn, states) -> np.ndarray:
+    out = np.empty(len(states))
+    for i, game in enumerate(states):
+        start = time.perf_counter()
+        fn(game)
+        out[i] = time.perf_counter() - start
+    return out
+
+
+def report(name: str, seconds: np.ndarray):
+    us = seconds * 1e6
+    print(f"{name:<20} {np.median(us):>8.1f} {np.percentile(us, 99):>8.1f} {us.max():>8.1f}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEIGHTS
+    config = default_config()
+    set_config(config)
+    states = random_states(n, config)
+
+    start = time.perf_counter()
+    model = MLP.from_npz(path)
+    print(f"loaded {path} in {(time.perf_counter() - start) * 1e3:.2f}ms: "
+          f"{' -> '.join(str(w.shape[0]) for w in model.weights)} -> {model.outputs}\n")
+    policy = MLPPolicy(model)
+    x = np.zeros((NUM_PLAYERS, model.inputs), dtype=np.float32)
+
+    print(f"{'per tick':<20} {'median':>8} {'p99':>8} {'max':>8}  (us)")
+    for name in STRATEGIES:
+        report(name, latencies(getattr(strategies, name), states))
+    report("mlp_strategy", latencies(policy, states))
+    report("  encode", latencies(lambda game: encode(game, get_config(), x), states))
+    report("  forward", latencies(lambda game: model.forward(x), states))
+    out = model.forward(x)
+    report("  decode", latencies(lambda game: decode(out, 0), states))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""float16 and int8 versions of the exported MLP against the float32 original.
+
+Converts the weights to `<name>_float16.npz` and `<name>_int8.npz` (per-column
+scales for int8) in OUT_DIR, a temporary directory by default. Then, on
+states from simulated games, reports how far each version's outputs and
+actions are from float32, the memory the weights take and the per-tick
+latency, both computing from the stored weights and dequantized to float32
+on load.
+
+Run from the MechMania directory:  python -m bench.quant [states] [weights.npz] [OUT_DIR]
+"""
+import sys
+import time
+import tempfile
+import numpy as np
+from pathlib import Path
+from core.ipc import set_config, get_config
+from core.conf import default_config, NUM_PLAYERS
+from strategy.mlp import MLP, MLPPolicy, DEFAULT_WEIGHTS, encode, save_quantized
+from bench.states import played_states
+
+PRECISIONS = ("float16", "int8")
+
+# Rows whose move vector is shorter than this have no meaningful direction
+MIN_MOVE = 0.05
+
+
+def median_us(fn, states) -> float:
+    out = np.empty(len(states))
+    for i, game in enumerate(states):
+        start = time.perf_counter()
+        fn(game)
+        out[i] = time.perf_counter() - start
+    return float(np.median(out)) * 1e6
+
+
+def accuracy(reference: np.ndarray, outputs: np.ndarray, holders: np.ndarray) -> str:
+    error = np.abs(outputs - reference)
+    moving = np.linalg.norm(reference[:, 0:2], axis=1) > MIN_MOVE
+    angle = np.arctan2(outputs[moving, 1], outputs[moving, 0]) - np.arctan2(reference[moving, 1], reference[moving, 0])
+    degrees = np.abs(np.degrees((angle + np.pi) % (2 * np.pi) - np.pi))
+    passes = np.mean((outputs[holders, 4] > 0) == (reference[holders, 4] > 0)) if holders.any() else 1.0
+    return (f"output err mean {error.mean():.5f} max {error.max():.5f}  "
+            f"move angle p99 {np.percentile(degrees, 99):.3f} max {degrees.max():.3f} deg  "
+            f"throttle max {error[:, 5].max():.5f}  pass decisions agree {passes:.2%}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = Path(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_WEIGHTS)
+    if len(sys.argv) > 3:
+        out_dir = Path(sys.argv[3])
+        out_dir.mkdir(parents=True, exist_ok=True)
+        run(n, source, out_dir)
+    else:
+        # Keeps the converted files out of the repo, next to the tracked weights
+        with tempfile.TemporaryDirectory() as tmp:
+            run(n, source, Path(tmp))
+
+
+def run(n: int, source: Path, out_dir: Path):
+    config = default_config()
+    set_config(config)
+    states = played_states(n, config)
+
+    x = np.concatenate([encode(game, get_config()) for game in states])
+    holders = np.zeros(len(x), dtype=bool)
+    for i, game in enumerate(states):
+        owner = game.ball_owner
+        if owner is not None and owner < NUM_PLAYERS:
+            holders[i * NUM_PLAYERS + owner] = True
+
+    reference = MLP.from_npz(source)
+    expected = reference.forward(x)
+    models = {"float32": (source, reference)}
+    for precision in PRECISIONS:
+        path = out_dir / f"{source.stem}_{precision}.npz"
+        save_quantized(path, source, precision)
+        models[precision] = (path, MLP.from_npz(path))
+    print(f"{len(states)} states from simulated games, {len(x)} player rows\n")
+
+    for name, (path, model) in models.items():
+        if name != "float32":
+            print(f"{name:<8} {accuracy(expected, model.forward(x), holders)}")
+    print(f"\n{'':<8} {'file KB':>8} {'weights KB':>10} {'tick us':>8} {'forward us':>10}"
+          f" {'dequantized tick us':>20}")
+    for name, (path, model) in models.items():
+        policy = MLPPolicy(model)
+        row = x[:NUM_PLAYERS].copy()
+        tick = median_us(policy, states)
+        forward = median_us(lambda game: model.forward(row), states)
+        dequantized = median_us(MLPPolicy(model.dequantized()), states)
+        print(f"{name:<8} {path.stat().st_size / 1024:>8.1f} {model.nbytes / 1024:>10.1f} {tick:>8.1f}"
+              f" {forward:>10.1f} {dequantized:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Cost of recording a tick with core.replay.ReplayRecorder.
+
+Times `tick()` on a real GameState and TickResponse, the way handle_msg
+calls it, over enough ticks to cross many fresh pages of the file.
+
+Run from the MechMania directory:  python -m bench.recorder [ticks] [replay path]
+"""
+import os
+import sys
+import time
+import ctypes
+import tempfile
+import numpy as np
+from core.conf import default_config
+from core.ipc import TickResponse
+from core.replay import ReplayRecorder
+from bench.states import random_states
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), "bench-recorder.mmr")
+    states = [memoryview(game).cast("B") for game in random_states(64, default_config())]
+    response = memoryview(TickResponse()).cast("B")
+
+    recorder = ReplayRecorder(path)
+    seconds = np.empty(n)
+    clock = time.perf_counter_ns
+    for i in range(n):
+        state = states[i % len(states)]
+        start = time.perf_counter()
+        elapsed = clock()
+        recorder.tick(state, response, clock() - elapsed)
+        seconds[i] = time.perf_counter() - start
+        if i % 50 == 0:
+            # Still ~50x the engine's tick rate, but lets the background thread run
+            time.sleep(0.001)
+    recorder.close()
+
+    us = seconds * 1e6
+    print(f"{n} ticks of {ctypes.sizeof(TickResponse) + len(states[0])} bytes to {path} "
+          f"({os.path.getsize(path) / 1e6:.1f} MB, {recorder.dropped} dropped)")
+    print(f"per tick: median {np.median(us):.2f}us  p99 {np.percentile(us, 99):.2f}us  "
+          f"p99.9 {np.percentile(us, 99.9):.2f}us  max {us.max():.1f}us")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
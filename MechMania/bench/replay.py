@@ -0,0 +1,100 @@
+"""Reading a large replay with replay.reader.
+
+Writes a synthetic replay of N ticks (states from simulated games, a reset
+every few thousand ticks), then times opening it with and without a saved
+tick index, random access to single ticks, exporting columns, and one
+vectorized pass over every tick.
+
+Run from the MechMania directory:  python -m bench.replay [ticks] [replay path]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from core.conf import default_config
+from core.replay import ReplayRecorder, ReplayHeader, RecordKind, HEADER_SIZE
+from replay.reader import Replay, INDEX_SUFFIX
+from bench.states import played_states
+
+RESET_EVERY = 4000
+CHUNK = 1 << 16
+
+
+def write_replay(path: str, n: int):
+    """A recorder-made header followed by N ticks written in bulk"""
+    recorder = ReplayRecorder(path, capacity=HEADER_SIZE + (1 << 20))
+    recorder.close()
+    with Replay(path, build_index=False) as empty:
+        dtype = empty.dtype
+    pool = np.frombuffer(b"".join(bytes(g) for g in played_states(512, default_config())), dtype=dtype["data"]["tick"]["state"])
+
+    written = 0
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE)
+        while written < n:
+            records = np.zeros(min(CHUNK, n - written), dtype=dtype)
+            numbers = written + np.arange(len(records))
+            records["kind"] = np.where(numbers % RESET_EVERY == 0, RecordKind.Reset, RecordKind.Tick)
+            state = records["data"]["tick"]["state"]
+            state[:] = pool[numbers % len(pool)]
+            state["tick"] = numbers
+            f.write(records.tobytes())
+            written += len(records)
+        f.seek(ReplayHeader.records.offset)
+        f.write(int(n).to_bytes(8, "little"))
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<36} {(time.perf_counter() - start) * 1e3:>10.1f} ms")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), "bench-replay.mmr")
+    for stale in (path, path + INDEX_SUFFIX):
+        if os.path.exists(stale):
+            os.remove(stale)
+    timed(f"write {n} records", lambda: write_replay(path, n))
+    print(f"{os.path.getsize(path) / 1e9:.2f} GB\n")
+
+    replay = timed("open, build index", lambda: Replay(path))
+    replay.close()
+    replay = timed("open, load index", lambda: Replay(path))
+    print(f"{len(replay)} ticks in {len(replay.runs())} runs")
+
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, len(replay), 100_000)
+    start = time.perf_counter()
+    for i in picks.tolist():
+        replay.record(i)
+    print(f"{'random record access':<36} {(time.perf_counter() - start) / len(picks) * 1e6:>10.2f} us")
+    start = time.perf_counter()
+    for i in picks[:10_000].tolist():
+        replay.state(i)
+    print(f"{'random GameState copy':<36} {(time.perf_counter() - start) / 10_000 * 1e6:>10.2f} us\n")
+
+    timed("column views (pos, ball, possession)", lambda: (replay.pos, replay.ball_pos, replay.possession))
+
+    def ball_x():
+        total = 0.0
+        ticks = 0
+        for block in replay.blocks():
+            total += float(block["data"]["tick"]["state"]["ball"]["pos"][:, 0].sum())
+            ticks += len(block)
+        return total / ticks
+
+    start = time.perf_counter()
+    ball_x()
+    seconds = time.perf_counter() - start
+    print(f"{'pass over every tick (ball x mean)':<36} {seconds * 1e3:>10.1f} ms  ({len(replay) / seconds / 1e6:.1f}M ticks/s)")
+    replay.close()
+    os.remove(path)
+    os.remove(path + INDEX_SUFFIX)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import random
+from typing import List, Optional
+from core.conf import GameConfig, NUM_PLAYERS
+from core.state import GameState, BallPossessionType
+
+
+def random_states(n: int, config: GameConfig, seed: int = 0, possessed: float = 0.4) -> List[GameState]:
+    """Random but plausible game states: players anywhere on the field, a
+    moving ball, and an owner for about `possessed` of them"""
+    rng = random.Random(seed)
+    w, h = config.field.width, config.field.height
+    states = []
+    for t in range(n):
+        game = GameState()
+        game.tick = t
+        for i in range(2 * NUM_PLAYERS):
+            p = game.players[i]
+            p.id = i
+            p.pos.x = rng.uniform(0, w)
+            p.pos.y = rng.uniform(0, h)
+            p.dir.x = rng.uniform(-1, 1)
+            p.dir.y = rng.uniform(-1, 1)
+            p.speed = config.player.speed
+            p.radius = config.player.radius
+            p.pickup_radius = config.player.pickup_radius
+
+        owner: Optional[int] = rng.randrange(2 * NUM_PLAYERS) if rng.random() < possessed else None
+        if owner is not None:
+            game.ball.pos = game.players[owner].pos
+            game._ball_possession.type = BallPossessionType.Possessed
+            game._ball_possession.data.possessed.owner = owner
+            game._ball_possession.data.possessed.team = 0 if owner < NUM_PLAYERS else 1
+        else:
+            game.ball.pos.x = rng.uniform(0, w)
+            game.ball.pos.y = rng.uniform(0, h)
+            game.ball.vel.x = rng.uniform(-config.player.pass_speed, config.player.pass_speed)
+            game.ball.vel.y = rng.uniform(-config.player.pass_speed, config.player.pass_speed)
+            game._ball_possession.type = BallPossessionType.Free
+        game.ball.radius = config.ball.radius
+        states.append(game)
+    return states
+
+
+def played_states(n: int, config: GameConfig, seed: int = 0, games: int = 8, every: int = 5,
+                  entry: str = "modified_strategy:cheese_formation") -> List[GameState]:
+    """States team A saw in simulated games of `entry` against itself, one
+    every `every` ticks from each of `games` games played side by side"""
+    from core.arrays import GAME_STATE_DTYPE
+    from sim.batch import BatchMatch, BatchPolicy, StrategyPolicy, play, _write_states
+    from sim.tournament import load_strategy
+    random.seed(seed)
+    match = BatchMatch(config, games, seed)
+    team_a = StrategyPolicy(load_strategy(entry), config, games, 0)
+    team_b = StrategyPolicy(load_strategy(entry), config, games, 1)
+    recorded = []
+
+    def on_tick(view):
+        if view.tick % every == 0:
+            # A copy keeps the ids and radii StrategyPolicy filled in
+            raw = team_a.raw.copy()
+            _write_states(raw, view, config)
+            recorded.append(raw)
+        return team_a.on_tick(view)
+
+    ticks = -(-n // games) * every
+    play(match, (BatchPolicy(team_a.on_reset, on_tick), team_b.policy()), ticks)
+    size = GAME_STATE_DTYPE.itemsize
+    data = b"".join(raw.tobytes() for raw in recorded)
+    return [GameState.from_buffer_copy(data, i * size) for i in range(min(n, len(data) // size))]
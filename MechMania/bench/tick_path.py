@@ -0,0 +1,98 @@
+"""Per-tick cost of EngineChannel.handle_msg, legacy path vs persistent views.
+
+Drives the channel in-process: the "engine" just flips the sync byte, so the
+numbers are the bot-side overhead of one tick with a trivial strategy.
+
+Run from the MechMania directory:  python -m bench.tick_path [ticks]
+"""
+import sys
+import time
+import ctypes
+import asyncio
+import tempfile
+import tracemalloc
+from pathlib import Path
+from core.ipc import EngineChannel, EngineStatus, ProtocolId, Shm, Strategy
+from core.state import PlayerAction
+from core.util import Vec2
+from core.conf import NUM_PLAYERS
+from bench.alloc import respond_peak
+
+
+def _list_tick(game):
+    return [PlayerAction(Vec2(1, 0), None) for _ in range(NUM_PLAYERS)]
+
+
+def _in_place_tick(game, actions):
+    # Unrolled: a loop over the slots would allocate a list iterator per tick
+    actions[0].set_dir(1.0, 0.0)
+    actions[1].set_dir(1.0, 0.0)
+    actions[2].set_dir(1.0, 0.0)
+    actions[3].set_dir(1.0, 0.0)
+
+
+def _reset(score):
+    return []
+
+
+async def _legacy_handle_msg(chan: EngineChannel, strategy: Strategy):
+    # Baseline tick path: fresh views and a fresh response array every tick
+    shm = Shm.from_buffer(chan.mmap, 0)
+    msg = shm.protocol.data.tick_msg
+    response = strategy.on_tick(msg)
+    shm.protocol.data.tick_response = (PlayerAction * NUM_PLAYERS)()
+    for i in range(min(len(response), NUM_PLAYERS)):
+        shm.protocol.data.tick_response[i] = response[i]
+    shm.protocol.type += 1
+    shm.sync = EngineStatus.Busy
+
+
+async def _drive(chan: EngineChannel, strategy: Strategy, ticks: int, legacy: bool) -> float:
+    shm = Shm.from_buffer(chan.mmap, 0)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        shm.protocol.type = ProtocolId.TickMsg
+        shm.sync = EngineStatus.Ready
+        if legacy:
+            await _legacy_handle_msg(chan, strategy)
+        else:
+            await chan.handle_msg(strategy)
+    elapsed = time.perf_counter() - start
+    del shm
+    return elapsed / ticks
+
+
+def run(name: str, strategy: Strategy, ticks: int, legacy: bool = False):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "shm"
+        path.write_bytes(bytes(ctypes.sizeof(Shm)))
+        with EngineChannel(path, adaptive=False) as chan:
+            # Warm up so the views are bound before measuring
+            asyncio.run(_drive(chan, strategy, 100, legacy))
+
+            per_tick = asyncio.run(_drive(chan, strategy, ticks, legacy))
+
+            tracemalloc.start()
+            asyncio.run(_drive(chan, strategy, 1000, legacy))
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            asyncio.run(_drive(chan, strategy, 1000, legacy))
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            line = (f"{name:<10} {per_tick * 1e6:>8.2f} us/tick"
+                    f"  retained bytes: {current - base}  transient peak bytes: {peak - base}")
+            if not legacy:
+                line += f"  respond() peak bytes: {respond_peak(chan, strategy, 1000)}"
+            print(line)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    run("legacy", Strategy(_reset, _list_tick), ticks, legacy=True)
+    run("list", Strategy(_reset, _list_tick), ticks)
+    run("in-place", Strategy(_reset, _in_place_tick, in_place=True), ticks)
+
+
+if __name__ == "__main__":
+    main()
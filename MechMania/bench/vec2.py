@@ -0,0 +1,95 @@
+"""Vector math cost: ctypes Vec2 vs FastVec2, per operation and per strategy tick.
+
+The "ctypes" rows temporarily restore the old behaviour (arithmetic returning
+ctypes Vec2, strategies constructing ctypes Vec2) to get a before/after number
+from the same tree.
+
+Run from the MechMania directory:  python -m bench.vec2 [states]
+"""
+import sys
+import time
+import timeit
+from contextlib import contextmanager
+import strategy.main as strategies
+from core.ipc import set_config
+from core.conf import default_config
+from core.util import Vec2, FastVec2
+from bench.states import random_states
+
+STRATEGIES = ["modified_strategy", "new_strategy", "ball_chase", "goaliestuff"]
+
+
+@contextmanager
+def ctypes_math():
+    saved = {name: Vec2.__dict__[name] for name in ("__add__", "__sub__", "__mul__", "__rmul__", "normalize")}
+    fast = strategies.FastVec2
+
+    def normalize(self):
+        magnitude = (self.x**2 + self.y**2) ** 0.5
+        if magnitude == 0:
+            return Vec2(0, 0)
+        return Vec2(self.x / magnitude, self.y / magnitude)
+
+    Vec2.__add__ = lambda self, other: Vec2(self.x + other.x, self.y + other.y)
+    Vec2.__sub__ = lambda self, other: Vec2(self.x - other.x, self.y - other.y)
+    Vec2.__mul__ = lambda self, scalar: Vec2(self.x * scalar, self.y * scalar)
+    Vec2.__rmul__ = lambda self, scalar: Vec2(self.x * scalar, self.y * scalar)
+    Vec2.normalize = normalize
+    strategies.FastVec2 = Vec2
+    try:
+        yield
+    finally:
+        for name, fn in saved.items():
+            setattr(Vec2, name, fn)
+        strategies.FastVec2 = fast
+
+
+def per_op(cls) -> dict:
+    a, b = cls(3.0, 4.0), cls(1.0, 2.0)
+    n = 200000
+    return {
+        "add": timeit.timeit(lambda: a + b, number=n) / n,
+        "mul": timeit.timeit(lambda: a * 2.0, number=n) / n,
+        "normalize": timeit.timeit(lambda: a.normalize(), number=n) / n,
+        "dist": timeit.timeit(lambda: a.dist(b), number=n) / n,
+    }
+
+
+def per_tick(states, repeat: int = 3) -> dict:
+    # Best of `repeat` runs, shared hosts are noisy
+    out = {}
+    for name in STRATEGIES:
+        fn = getattr(strategies, name)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for game in states:
+                fn(game)
+            best = min(best, time.perf_counter() - start)
+        out[name] = best / len(states)
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    config = default_config()
+    set_config(config)
+    states = random_states(n, config)
+
+    with ctypes_math():
+        ops_before = per_op(Vec2)
+        ticks_before = per_tick(states)
+    ops_after = per_op(FastVec2)
+    ticks_after = per_tick(states)
+
+    print(f"{'op':<20} {'ctypes us':>10} {'fast us':>10} {'speedup':>8}")
+    for k in ops_before:
+        print(f"{k:<20} {ops_before[k] * 1e6:>10.3f} {ops_after[k] * 1e6:>10.3f} {ops_before[k] / ops_after[k]:>7.2f}x")
+    print()
+    print(f"{'strategy':<20} {'ctypes us':>10} {'fast us':>10} {'speedup':>8}")
+    for k in ticks_before:
+        print(f"{k:<20} {ticks_before[k] * 1e6:>10.1f} {ticks_after[k] * 1e6:>10.1f} {ticks_before[k] / ticks_after[k]:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
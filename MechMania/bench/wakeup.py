@@ -0,0 +1,114 @@
+"""Wakeup latency of the bot side of the channel: fixed polling, the adaptive
+scheduler and the wakeup FIFO.
+
+Run from the MechMania directory:  python -m bench.wakeup [ticks]
+"""
+import os
+import sys
+import time
+import ctypes
+import mmap
+import random
+import asyncio
+import tempfile
+import statistics
+import multiprocessing
+from pathlib import Path
+from core.ipc import Shm, EngineStatus, poll
+from core.wake import WakeListener, WakeNotifier
+from core.sched import PollScheduler
+
+# Engine think times between ticks: mostly short, with the occasional long
+# pause standing in for a slow opponent or a reset
+FAST_TICK = 0.002
+SLOW_TICK = 0.25
+SLOW_EVERY = 25
+
+
+class _Bench(ctypes.Structure):
+    _fields_ = [
+        ("shm", Shm),
+        ("sent_at", ctypes.c_double),
+    ]
+
+
+def _engine(path: str, wake_path: str, ticks: int):
+    with open(path, "r+b") as f:
+        buf = mmap.mmap(f.fileno(), 0)
+        view = _Bench.from_buffer(buf)
+        notifier = WakeNotifier.from_fifo(wake_path)
+        rng = random.Random(0)
+        for i in range(ticks):
+            while view.shm.sync != EngineStatus.Busy:
+                time.sleep(0.0001)
+            time.sleep(SLOW_TICK if i % SLOW_EVERY == SLOW_EVERY - 1 else FAST_TICK * rng.uniform(0.5, 1.5))
+            view.sent_at = time.perf_counter()
+            view.shm.sync = EngineStatus.Ready
+            notifier.notify()
+        notifier.close()
+        del view
+        buf.close()
+
+
+async def _bot(view: _Bench, waker, scheduler, ticks: int) -> list:
+    latencies = []
+    for _ in range(ticks):
+        await poll(view.shm, EngineStatus.Ready, waker, scheduler)
+        latencies.append(time.perf_counter() - view.sent_at)
+        view.shm.sync = EngineStatus.Busy
+        if scheduler is not None:
+            scheduler.release()
+    return latencies
+
+
+def run(mode: str, ticks: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "shm"
+        wake_path = Path(tmp) / "shm.wake"
+        path.write_bytes(bytes(ctypes.sizeof(_Bench)))
+        os.mkfifo(wake_path)
+
+        with open(path, "r+b") as f:
+            buf = mmap.mmap(f.fileno(), 0)
+            view = _Bench.from_buffer(buf)
+            view.shm.sync = EngineStatus.Busy
+            waker = WakeListener.from_fifo(wake_path) if mode == "wake" else None
+            scheduler = PollScheduler() if mode == "adaptive" else None
+
+            engine = multiprocessing.Process(target=_engine, args=(str(path), str(wake_path), ticks))
+            engine.start()
+            cpu = time.process_time()
+            wall = time.perf_counter()
+            latencies = asyncio.run(_bot(view, waker, scheduler, ticks))
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            engine.join()
+
+            if waker is not None:
+                waker.close()
+            del view
+            buf.close()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "scheduler": scheduler.stats() if scheduler is not None else None,
+        "median_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        "max_us": latencies[-1] * 1e6,
+        "cpu_pct": 100.0 * cpu / wall,
+    }
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{'mode':<9} {'median us':>10} {'p99 us':>10} {'max us':>10} {'bot cpu %':>10}")
+    for mode in ("poll", "adaptive", "wake"):
+        r = run(mode, ticks)
+        print(f"{r['mode']:<9} {r['median_us']:>10.1f} {r['p99_us']:>10.1f} {r['max_us']:>10.1f} {r['cpu_pct']:>10.1f}")
+        if r["scheduler"] is not None:
+            print(f"          scheduler: {r['scheduler']}")
+
+
+if __name__ == "__main__":
+    main()
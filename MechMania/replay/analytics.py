@@ -0,0 +1,371 @@
+"""Statistics over many replays: per-replay reducers, merged per strategy.
+
+A reducer turns one replay (its ticks, as `Frames`) into a partial
+aggregate, a dict of NumPy arrays computed with whole-column operations.
+Partials of a group merge, by adding them unless the reducer says
+otherwise, and `finish` turns the total into the figures that get printed.
+Replays are reduced in a process pool. Each replay's partials are cached
+under the hash of the file, so a rerun over a growing corpus only reduces
+the new files (and reducers whose name or version is new).
+
+Replays are grouped by the directory they are in, one per strategy
+(--by dir), or reported per file or all together. The bot's frame is used
+throughout: players 0-3 and team 0 are the recorded bot's side.
+
+Run from the MechMania directory:
+    python -m replay.analytics REPLAY_OR_DIR [...] [--reducers NAME ...]
+                               [--by dir|file|all] [--cache DIR]
+                               [--workers W] [--out stats.npz]
+
+Reducers are the names in REDUCERS, or dotted `module.Class` names of
+Reducer subclasses. --out saves every total, heatmaps included, as
+`group/reducer/key` arrays.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from core.conf import NUM_PLAYERS, default_config
+from core.state import BallPossessionType, Team
+from core.replay import RecordKind
+from replay.reader import Columns, recorded_config
+from replay.archive import load_records, replay_files
+
+DEFAULT_CACHE = ".analytics-cache"
+GROUPINGS = ("dir", "file", "all")
+HEATMAP_BINS = (50, 30)
+
+Partial = Dict[str, np.ndarray]
+
+
+class Frames(Columns):
+    """The ticks of one replay. A run is a stretch of ticks between resets;
+    `starts` and `stops` delimit them"""
+
+    def __init__(self, path: str, records: np.ndarray):
+        self.path = path
+        ticks = np.flatnonzero(records["kind"] == RecordKind.Tick)
+        self.records = records[ticks]
+        config, self.team = recorded_config(records)
+        self.config = config or default_config()
+        self.starts = np.flatnonzero(np.diff(ticks, prepend=-2) != 1)
+        self.stops = np.r_[self.starts[1:], len(ticks)]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def run(self) -> np.ndarray:
+        """Run number of every tick"""
+        return np.repeat(np.arange(len(self.starts)), self.stops - self.starts)
+
+    def pass_starts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Ticks a pass leaves on, and the passing team"""
+        passing = self.possession == BallPossessionType.Passing
+        start = passing.copy()
+        start[1:] &= ~passing[:-1]
+        start[self.starts] = passing[self.starts]
+        index = np.flatnonzero(start)
+        return index, self.passing_team[index].astype(np.int64)
+
+
+class Reducer:
+    """Per-replay statistics. `reduce` must return a non-empty dict, and
+    bumping `version` invalidates cached partials"""
+    name = "reducer"
+    version = 1
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def reduce(self, frames: Frames) -> Partial:
+        raise NotImplementedError
+
+    def merge(self, total: Partial, partial: Partial) -> Partial:
+        return {k: total[k] + v for k, v in partial.items()} if total else dict(partial)
+
+    def finish(self, total: Partial) -> Dict[str, float]:
+        """Figures to print; arrays of more than one element are left out"""
+        return {k: float(v) for k, v in total.items() if np.size(v) == 1}
+
+
+def _ratio(a, b) -> float:
+    return float(a) / float(b) if b else float("nan")
+
+
+class Possession(Reducer):
+    name = "possession"
+
+    def reduce(self, frames: Frames) -> Partial:
+        kind = frames.possession
+        own = frames.owner < NUM_PLAYERS
+        ours = frames.passing_team == Team.Self
+        possessed = kind == BallPossessionType.Possessed
+        passing = kind == BallPossessionType.Passing
+        return dict(
+            ticks=np.array(len(frames)),
+            own=np.array(np.count_nonzero(possessed & own)),
+            other=np.array(np.count_nonzero(possessed & ~own)),
+            passing_own=np.array(np.count_nonzero(passing & ours)),
+            passing_other=np.array(np.count_nonzero(passing & ~ours)),
+        )
+
+    def finish(self, total: Partial) -> Dict[str, float]:
+        held = total["own"] + total["other"]
+        return dict(share=_ratio(total["own"], held),
+                    loose=_ratio(total["ticks"] - held - total["passing_own"] - total["passing_other"], total["ticks"]))
+
+
+class Passes(Reducer):
+    """A pass is complete if the passing side is the next to hold the ball
+    before a reset, intercepted if the other side is. Per team: own, other"""
+    name = "passes"
+
+    def reduce(self, frames: Frames) -> Partial:
+        n = len(frames)
+        index, team = frames.pass_starts()
+        possessed = frames.possession == BallPossessionType.Possessed
+        # Next tick anyone holds the ball, n if nobody does again
+        following = np.minimum.accumulate(np.where(possessed, np.arange(n), n)[::-1])[::-1]
+        caught = following[index]
+        caught_in_run = caught < frames.stops[frames.run[index]]
+        receiver = np.where(frames.owner[np.minimum(caught, n - 1)] < NUM_PLAYERS, Team.Self, Team.Other)
+        completed = caught_in_run & (receiver == team)
+        return dict(
+            attempts=np.bincount(team, minlength=2)[:2],
+            completed=np.bincount(team, weights=completed, minlength=2)[:2],
+            intercepted=np.bincount(team, weights=caught_in_run & ~completed, minlength=2)[:2],
+        )
+
+    def finish(self, total: Partial) -> Dict[str, float]:
+        return dict(attempts=float(total["attempts"][0]),
+                    completion=_ratio(total["completed"][0], total["attempts"][0]),
+                    completion_other=_ratio(total["completed"][1], total["attempts"][1]))
+
+
+class Shots(Reducer):
+    """Passes whose straight line crosses the goal mouth they head for
+    (bounces are not followed). Taken: at the enemy goal; conceded: at ours"""
+    name = "shots"
+
+    def reduce(self, frames: Frames) -> Partial:
+        config = frames.config
+        width, height = float(config.field.width), float(config.field.height)
+        index, team = frames.pass_starts()
+        pos, vel = frames.ball_pos[index].astype(np.float64), frames.ball_vel[index].astype(np.float64)
+        goal_x = np.where(team == Team.Self, width, 0.0)
+        heading = np.where(team == Team.Self, vel[:, 0] > 0, vel[:, 0] < 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = pos[:, 1] + vel[:, 1] * (goal_x - pos[:, 0]) / vel[:, 0]
+        # As in core.geometry: the goals span the whole side after max_ticks
+        half = np.where(frames.tick[index] <= config.max_ticks, config.goal.normal_height * 0.5, height * 0.5)
+        on_goal = heading & (np.abs(y - height * 0.5) <= half)
+        return dict(
+            replays=np.array(1),
+            taken=np.array(np.count_nonzero(on_goal & (team == Team.Self))),
+            conceded=np.array(np.count_nonzero(on_goal & (team == Team.Other))),
+        )
+
+    def finish(self, total: Partial) -> Dict[str, float]:
+        return dict(taken=_ratio(total["taken"], total["replays"]),
+                    conceded=_ratio(total["conceded"], total["replays"]))
+
+
+class Resets(Reducer):
+    """Why the field was reset, from the last tick before each reset: the
+    score changed, or the ball had stagnated (to within a tick or two)"""
+    name = "resets"
+
+    def reduce(self, frames: Frames) -> Partial:
+        last = frames.stops[:-1] - 1
+        first = frames.starts[1:]
+        score = frames.score
+        scored = score["self"][first].astype(np.int64) - score["self"][last]
+        conceded = score["other"][first].astype(np.int64) - score["other"][last]
+        goal = (scored > 0) | (conceded > 0)
+        still = frames.tick[last].astype(np.int64) - frames.states["ball_stagnation"]["tick"][last]
+        stagnated = ~goal & (still >= frames.config.ball.stagnation_ticks - 2)
+        return dict(
+            replays=np.array(1),
+            goals_for=np.array(np.count_nonzero(scored > 0)),
+            goals_against=np.array(np.count_nonzero(conceded > 0)),
+            stagnation=np.array(np.count_nonzero(stagnated)),
+            other=np.array(np.count_nonzero(~goal & ~stagnated)),
+        )
+
+    def finish(self, total: Partial) -> Dict[str, float]:
+        replays = total["replays"]
+        return {k: _ratio(total[k], replays) for k in ("goals_for", "goals_against", "stagnation", "other")}
+
+
+class Heatmap(Reducer):
+    """Tick counts over a HEATMAP_BINS grid of the field (in fractions of
+    its size, so configs mix) for our players, theirs, and the ball"""
+    name = "heatmap"
+
+    def reduce(self, frames: Frames) -> Partial:
+        size = np.array([frames.config.field.width, frames.config.field.height], dtype=np.float64)
+        bounds = [[0.0, 1.0], [0.0, 1.0]]
+
+        def histogram(points: np.ndarray) -> np.ndarray:
+            points = points.reshape(-1, 2) / size
+            return np.histogram2d(points[:, 0], points[:, 1], bins=HEATMAP_BINS, range=bounds)[0]
+
+        return dict(
+            ticks=np.array(len(frames)),
+            own=histogram(frames.pos[:, :NUM_PLAYERS]),
+            other=histogram(frames.pos[:, NUM_PLAYERS:]),
+            ball=histogram(frames.ball_pos),
+        )
+
+
+REDUCERS = {r.name: r for r in (Possession, Passes, Shots, Resets, Heatmap)}
+
+
+def load_reducer(name: str) -> Reducer:
+    if name in REDUCERS:
+        return REDUCERS[name]()
+    module, _, attr = name.rpartition(".")
+    return getattr(importlib.import_module(module), attr)()
+
+
+def reduce_file(path: str, reducers: Sequence[Reducer]) -> Dict[str, Partial]:
+    """Runs in the workers"""
+    frames = Frames(path, load_records(path))
+    return {reducer.key: reducer.reduce(frames) for reducer in reducers}
+
+
+class Cache:
+    """Per-replay partials in `<directory>/<file hash>.npz`, as
+    `reducer@version/key` arrays. Hashes are remembered per path, size and
+    mtime, so unchanged files are not read again just to hash them"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        directory.mkdir(parents=True, exist_ok=True)
+        self.hashes_path = directory / "files.json"
+        self.hashes: Dict[str, list] = json.loads(self.hashes_path.read_text()) if self.hashes_path.exists() else {}
+
+    def file_hash(self, path: str) -> str:
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        known = self.hashes.get(key)
+        if known is not None and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return known[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        self.hashes[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def load(self, file_hash: str) -> Dict[str, Partial]:
+        path = self.directory / f"{file_hash}.npz"
+        if not path.exists():
+            return {}
+        partials: Dict[str, Partial] = {}
+        with np.load(path) as data:
+            for name in data.files:
+                reducer, _, key = name.partition("/")
+                partials.setdefault(reducer, {})[key] = data[name]
+        return partials
+
+    def store(self, file_hash: str, partials: Dict[str, Partial]):
+        path = self.directory / f"{file_hash}.npz"
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **{f"{reducer}/{key}": value for reducer, partial in partials.items() for key, value in partial.items()})
+        os.replace(tmp, path)
+
+    def save_hashes(self):
+        tmp = self.hashes_path.with_name(self.hashes_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.hashes))
+        os.replace(tmp, self.hashes_path)
+
+
+class Job(NamedTuple):
+    path: str
+    file_hash: str
+    cached: Dict[str, Partial]
+    missing: List[Reducer]
+
+
+def group_of(path: str, by: str) -> str:
+    if by == "dir":
+        return Path(path).parent.name
+    return path if by == "file" else "all"
+
+
+def run_analytics(jobs: Sequence[Job], workers: Optional[int] = None) -> Iterator[Tuple[Job, Dict[str, Partial]]]:
+    """Yields every job with its partials, cached ones first, then the
+    others as workers finish them"""
+    pending = [job for job in jobs if job.missing]
+    for job in jobs:
+        if not job.missing:
+            yield job, job.cached
+    if not pending:
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(reduce_file, job.path, job.missing): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                yield job, {**job.cached, **future.result()}
+            except Exception as e:
+                print(f"{job.path} failed: {e!r}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistics over many replays")
+    parser.add_argument("replays", nargs="+", help="replay files or directories of them")
+    parser.add_argument("--reducers", nargs="+", default=list(REDUCERS))
+    parser.add_argument("--by", choices=GROUPINGS, default="dir", help="group per directory, per file, or not at all")
+    parser.add_argument("--cache", type=Path, default=Path(DEFAULT_CACHE))
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--out", type=Path, default=None, help="save the totals here")
+    args = parser.parse_args()
+
+    reducers = [load_reducer(name) for name in args.reducers]
+    cache = Cache(args.cache)
+    start = time.perf_counter()
+    jobs = []
+    for path in replay_files(args.replays):
+        file_hash = cache.file_hash(path)
+        cached = cache.load(file_hash)
+        jobs.append(Job(path, file_hash, cached, [r for r in reducers if r.key not in cached]))
+    cache.save_hashes()
+    fresh = sum(1 for job in jobs if job.missing)
+    print(f"{len(jobs)} replays, {fresh} to reduce, {len(jobs) - fresh} cached, {args.workers or os.cpu_count()} workers")
+
+    totals: Dict[str, Dict[str, Partial]] = {}
+    for i, (job, partials) in enumerate(run_analytics(jobs, args.workers), 1):
+        if job.missing:
+            cache.store(job.file_hash, partials)
+        group = totals.setdefault(group_of(job.path, args.by), {})
+        for reducer in reducers:
+            group[reducer.key] = reducer.merge(group.get(reducer.key, {}), partials[reducer.key])
+        if i % 100 == 0:
+            print(f"[{i}/{len(jobs)}] {time.perf_counter() - start:.1f}s")
+
+    print(f"{time.perf_counter() - start:.1f}s wall\n")
+    for name, group in sorted(totals.items()):
+        print(name)
+        for reducer in reducers:
+            figures = reducer.finish(group[reducer.key])
+            if figures:
+                print(f"  {reducer.name:<12} " + "  ".join(f"{k} {v:.3g}" for k, v in figures.items()))
+    if args.out is not None:
+        np.savez(args.out, **{f"{name}/{reducer.name}/{key}": value for name, group in totals.items()
+                              for reducer in reducers for key, value in group[reducer.key].items()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Compressed archival replays: keyframes plus quantized deltas.
+
+A raw replay (core.replay) is cut into blocks of BLOCK_RECORDS records and
+every block is coded on its own:
+
+  - The float fields that move from tick to tick (QUANTIZED: positions,
+    directions, ball, actions) are rounded to a fixed step per field, so
+    reconstruction is off by at most step / 2 and never drifts. The first
+    record of a block is the keyframe (absolute values); the rest are
+    integer deltas, stored as int16 or int32 byte planes.
+  - Everything else (tick, possession, score, resets, the config, and any
+    record with non-finite or out-of-range floats) is kept exactly: the
+    record bytes, differenced byte-wise against the previous record and
+    transposed so each byte position is one run for zlib.
+
+Blocks carry their length before and after them, so a file can be walked
+forwards or backwards without the footer; the footer also indexes every
+block for random access. Decoding a block is a handful of whole-array
+operations: inflate, cumsum, scale, scatter.
+
+The raw replay header is stored verbatim, so `unpack` gives back a raw
+replay that replay.reader opens like the original.
+
+Run from the MechMania directory:
+    python -m replay.archive pack REPLAY [ARCHIVE]
+    python -m replay.archive unpack ARCHIVE [REPLAY]
+    python -m replay.archive check REPLAY      (size, ratio and largest errors)
+"""
+import io
+import sys
+import zlib
+import json
+import ctypes
+import mmap
+import struct
+import numpy as np
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Sequence, Tuple, Union
+from core.replay import RecordKind, ReplayHeader
+from replay.reader import Replay, layout_dtype
+
+ARCHIVE_MAGIC = b"MMARCHIV"
+ARCHIVE_VERSION = 1
+ARCHIVE_SUFFIX = ".mma"
+REPLAY_SUFFIXES = (".mmr", ARCHIVE_SUFFIX)
+
+BLOCK_RECORDS = 4096
+ZLIB_LEVEL = 6
+
+# Quantized fields of a tick record and their steps, in the units of the
+# game. Reconstruction error is at most half a step.
+QUANTIZED: Tuple[Tuple[Tuple[str, ...], float], ...] = (
+    (("state", "players", "pos"), 1 / 64),
+    (("state", "players", "dir"), 1 / 4096),
+    (("state", "ball", "pos"), 1 / 64),
+    (("state", "ball", "vel"), 1 / 1024),
+    (("state", "ball_stagnation", "center"), 1 / 64),
+    (("response", "dir"), 1 / 1024),
+    (("response", "ball_pass"), 1 / 1024),
+)
+
+# Quantized values have to fit an int32
+_LIMIT = float(1 << 30)
+
+_ARCHIVE_HEADER = struct.Struct("<8sIIII")      # magic, version, block records, raw header size, settings size
+_BLOCK_HEADER = struct.Struct("<IIBxxxIII")     # records, columns, delta width, exact, rest, deltas (compressed sizes)
+_LENGTH = struct.Struct("<I")
+_FOOTER = struct.Struct("<QQ8s")                # blocks, index offset, magic
+
+
+def _field(tick: np.ndarray, path: Tuple[str, ...]) -> np.ndarray:
+    for name in path:
+        tick = tick[name]
+    return tick
+
+
+def _columns(tick: np.ndarray, quantized) -> List[np.ndarray]:
+    """Views of every quantized field; (B, 8, 2) for players, so not
+    reshapeable without a copy"""
+    return [_field(tick, path) for path, _ in quantized]
+
+
+def _width(column: np.ndarray) -> int:
+    return int(np.prod(column.shape[1:]))
+
+
+def _planes(values: np.ndarray, width: int) -> bytes:
+    """Little-endian ints of `width` bytes, low bytes of every value first"""
+    return values.astype(f"<i{width}").view(np.uint8).reshape(-1, width).T.tobytes()
+
+
+def _from_planes(data: bytes, width: int, shape) -> np.ndarray:
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(width, -1)
+    return np.ascontiguousarray(planes.T).view(f"<i{width}").reshape(shape)
+
+
+def encode_block(records: np.ndarray, quantized=QUANTIZED) -> bytes:
+    """One block, `records` in the raw replay dtype"""
+    n = len(records)
+    tick = records["data"]["tick"]
+    columns = _columns(tick, quantized)
+    values = np.concatenate([c.reshape(n, -1).astype(np.float64) for c in columns], axis=1)
+    steps = np.concatenate([np.full(_width(c), step) for c, (_, step) in zip(columns, quantized)])
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values / steps
+        exact = (records["kind"] != RecordKind.Tick) | ~np.all(np.abs(scaled) < _LIMIT, axis=1)
+    q = np.rint(np.where(exact[:, None], 0.0, scaled)).astype(np.int64)
+    # Exact rows repeat their predecessor so they cost no delta
+    if exact.any():
+        rows = np.arange(n)
+        last = np.maximum.accumulate(np.where(exact, -1, rows))
+        q = np.where(exact[:, None], q[np.maximum(last, 0)], q)
+    deltas = np.diff(q, axis=0, prepend=np.zeros((1, q.shape[1]), dtype=np.int64))
+    width = 2 if n < 2 or np.abs(deltas[1:]).max() < 1 << 15 else 4
+    delta_bytes = zlib.compress(_planes(deltas[:1], 4) + _planes(deltas[1:], width), ZLIB_LEVEL)
+
+    # Everything not quantized, exactly: the record bytes with the quantized
+    # floats zeroed on quantized rows. Copied as bytes, since copying a
+    # structured array does not keep the padding between fields
+    rest = np.frombuffer(bytearray(records.tobytes()), dtype=records.dtype)
+    rest_tick = rest["data"]["tick"]
+    for column in _columns(rest_tick, quantized):
+        column[~exact] = 0.0
+    raw = rest.view(np.uint8).reshape(n, -1)
+    diff = np.diff(raw, axis=0, prepend=np.zeros((1, raw.shape[1]), dtype=np.uint8))
+    rest_bytes = zlib.compress(np.ascontiguousarray(diff.T).tobytes(), ZLIB_LEVEL)
+    exact_bytes = zlib.compress(np.packbits(exact).tobytes(), ZLIB_LEVEL)
+
+    header = _BLOCK_HEADER.pack(n, q.shape[1], width, len(exact_bytes), len(rest_bytes), len(delta_bytes))
+    return header + exact_bytes + rest_bytes + delta_bytes
+
+
+def decode_block(data, dtype: np.dtype, quantized=QUANTIZED) -> np.ndarray:
+    """Records of one block, in the raw replay dtype"""
+    n, k, width, exact_size, rest_size, delta_size = _BLOCK_HEADER.unpack_from(data, 0)
+    start = _BLOCK_HEADER.size
+    exact = np.unpackbits(np.frombuffer(zlib.decompress(data[start:start + exact_size]), dtype=np.uint8))[:n].astype(bool)
+    start += exact_size
+    diff = np.frombuffer(zlib.decompress(data[start:start + rest_size]), dtype=np.uint8).reshape(dtype.itemsize, n)
+    start += rest_size
+    raw = np.cumsum(diff, axis=1, dtype=np.uint8)
+    records = np.ascontiguousarray(raw.T).reshape(-1).view(dtype)
+
+    delta_data = zlib.decompress(data[start:start + delta_size])
+    keyframe = _from_planes(delta_data[:4 * k], 4, (1, k))
+    deltas = _from_planes(delta_data[4 * k:], width, (n - 1, k))
+    # Every quantized value fits an int32, so the running sums do too
+    q = np.cumsum(np.concatenate([keyframe, deltas.astype(np.int32)]), axis=0, dtype=np.int32)
+
+    tick = records["data"]["tick"]
+    offset = 0
+    for column, (_, step) in zip(_columns(tick, quantized), quantized):
+        k = _width(column)
+        # Exact rows are few (resets, the config): fill every row, then put them back
+        kept = column[exact]
+        column[...] = (q[:, offset:offset + k] * step).reshape(column.shape)
+        column[exact] = kept
+        offset += k
+    return records
+
+
+class ArchiveWriter:
+    def __init__(self, f: BinaryIO, raw_header: bytes, quantized=QUANTIZED, block_records: int = BLOCK_RECORDS):
+        self.f = f
+        self.quantized = quantized
+        settings = json.dumps({"quantized": [[list(path), step] for path, step in quantized]}).encode()
+        f.write(_ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, block_records, len(raw_header), len(settings)))
+        f.write(raw_header)
+        f.write(settings)
+        self.offsets: List[int] = []
+        self.first: List[int] = []
+        self.records = 0
+
+    def add(self, records: np.ndarray):
+        block = encode_block(records, self.quantized)
+        self.offsets.append(self.f.tell())
+        self.first.append(self.records)
+        self.f.write(_LENGTH.pack(len(block)) + block + _LENGTH.pack(len(block)))
+        self.records += len(records)
+
+    def close(self):
+        index = self.f.tell()
+        self.f.write(np.array(self.offsets, dtype="<u8").tobytes())
+        self.f.write(np.array(self.first, dtype="<u8").tobytes())
+        self.f.write(_FOOTER.pack(len(self.offsets), index, ARCHIVE_MAGIC))
+
+
+def pack(replay: Replay, f: BinaryIO, block_records: int = BLOCK_RECORDS):
+    """Archives every record of `replay`"""
+    raw_header = bytes(replay.mmap[:replay.header.header_size])
+    writer = ArchiveWriter(f, raw_header, block_records=block_records)
+    for start in range(0, len(replay.records), block_records):
+        writer.add(replay.records[start:start + block_records])
+    writer.close()
+
+
+class Archive:
+    """An archive opened for block-wise decoding in either direction"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.block_records, raw_size, settings_size = _ARCHIVE_HEADER.unpack_from(self.data, 0)
+        assert magic == ARCHIVE_MAGIC, f"{path} is not a replay archive"
+        assert version <= ARCHIVE_VERSION, f"{path} is archive version {version}"
+        start = _ARCHIVE_HEADER.size
+        self.raw_header = bytes(self.data[start:start + raw_size])
+        settings = json.loads(self.data[start + raw_size:start + raw_size + settings_size])
+        self.quantized = tuple((tuple(path), step) for path, step in settings["quantized"])
+        self.blocks_start = start + raw_size + settings_size
+
+        header = ReplayHeader.from_buffer_copy(self.raw_header)
+        layout = ctypes.sizeof(ReplayHeader)
+        self.dtype = layout_dtype(json.loads(self.raw_header[layout:layout + header.layout_size]))
+
+        count, index, magic = _FOOTER.unpack_from(self.data, len(self.data) - _FOOTER.size)
+        assert magic == ARCHIVE_MAGIC, f"{path} has no footer; walk it with blocks()"
+        self.offsets = np.frombuffer(self.data, dtype="<u8", count=count, offset=index).copy()
+        self.first = np.frombuffer(self.data, dtype="<u8", count=count, offset=index + 8 * count).copy()
+        self.blocks_end = index
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def block(self, i: int) -> np.ndarray:
+        """Records of block `i`"""
+        offset = int(self.offsets[i])
+        size, = _LENGTH.unpack_from(self.data, offset)
+        return decode_block(self.data[offset + 4:offset + 4 + size], self.dtype, self.quantized)
+
+    def blocks(self, reverse: bool = False) -> Iterator[np.ndarray]:
+        """Every block in order (or last to first), following the length
+        fields rather than the footer"""
+        if not reverse:
+            offset = self.blocks_start
+            while offset < self.blocks_end:
+                size, = _LENGTH.unpack_from(self.data, offset)
+                yield decode_block(self.data[offset + 4:offset + 4 + size], self.dtype, self.quantized)
+                offset += size + 8
+        else:
+            end = self.blocks_end
+            while end > self.blocks_start:
+                size, = _LENGTH.unpack_from(self.data, end - 4)
+                yield decode_block(self.data[end - 4 - size:end - 4], self.dtype, self.quantized)
+                end -= size + 8
+
+    def unpack(self, f: BinaryIO):
+        """Writes the records back out as a raw replay"""
+        records = 0
+        f.write(self.raw_header)
+        for block in self.blocks():
+            f.write(block.tobytes())
+            records += len(block)
+        f.seek(ReplayHeader.records.offset)
+        f.write(struct.pack("<Q", records))
+
+
+def load_records(path: Union[str, Path]) -> np.ndarray:
+    """Every record of a raw or archived replay, in memory"""
+    path = Path(path)
+    if path.suffix == ARCHIVE_SUFFIX:
+        with Archive(path) as archive:
+            return np.frombuffer(b"".join(block.tobytes() for block in archive.blocks()), dtype=archive.dtype)
+    with Replay(path, build_index=False) as replay:
+        return np.frombuffer(replay.records.tobytes(), dtype=replay.dtype)
+
+
+def replay_files(paths: Sequence[str]) -> List[str]:
+    """The given files, and the replays anywhere under the given directories"""
+    files = []
+    for name in paths:
+        path = Path(name)
+        if path.is_dir():
+            files += sorted(str(p) for p in path.rglob("*") if p.suffix in REPLAY_SUFFIXES)
+        else:
+            files.append(str(path))
+    return files
+
+
+def errors(original: np.ndarray, decoded: np.ndarray, quantized=QUANTIZED) -> Dict[str, float]:
+    """Largest absolute error per quantized field, over tick records"""
+    ticks = original["kind"] == RecordKind.Tick
+    out = {}
+    for (path, _), a, b in zip(quantized, _columns(original["data"]["tick"], quantized), _columns(decoded["data"]["tick"], quantized)):
+        with np.errstate(invalid="ignore"):
+            diff = np.abs(a[ticks].astype(np.float64) - b[ticks]).reshape(-1)
+        out[".".join(path)] = float(np.nanmax(diff)) if diff.size else 0.0
+    return out
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("pack", "unpack", "check"):
+        print(__doc__)
+        return
+    command, source = sys.argv[1], Path(sys.argv[2])
+    if command == "pack":
+        target = Path(sys.argv[3]) if len(sys.argv) > 3 else source.with_suffix(ARCHIVE_SUFFIX)
+        with Replay(source, build_index=False) as replay, open(target, "wb") as f:
+            pack(replay, f)
+        print(f"{source} ({source.stat().st_size / 1e6:.2f} MB) -> {target} ({target.stat().st_size / 1e6:.2f} MB)")
+    elif command == "unpack":
+        target = Path(sys.argv[3]) if len(sys.argv) > 3 else source.with_suffix(".mmr")
+        with Archive(source) as archive, open(target, "wb") as f:
+            archive.unpack(f)
+        print(f"{source} -> {target}")
+    else:
+        buffer = io.BytesIO()
+        with Replay(source, build_index=False) as replay:
+            pack(replay, buffer)
+            size = buffer.tell()
+            tmp = source.with_name(source.name + ".check" + ARCHIVE_SUFFIX)
+            tmp.write_bytes(buffer.getvalue())
+            try:
+                with Archive(tmp) as archive:
+                    decoded = np.frombuffer(b"".join(block.tobytes() for block in archive.blocks()), dtype=archive.dtype)
+            finally:
+                tmp.unlink()
+            exact = decoded.tobytes() == replay.records.tobytes()
+            print(f"{len(replay.records)} records: {replay.records.nbytes / 1e6:.2f} MB raw, {size / 1e6:.3f} MB archived "
+                  f"({replay.records.nbytes / size:.1f}x){', bit-exact' if exact else ''}")
+            for name, error in errors(replay.records, decoded).items():
+                print(f"  {name:<32} max error {error:.6f}")
+
+
+if __name__ == "__main__":
+    main()
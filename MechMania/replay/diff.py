@@ -0,0 +1,310 @@
+"""Replays recorded games through two versions of a strategy and diffs them.
+
+Every GameState in the given replays (raw .mmr or archived .mma; see
+core.replay and replay.archive) is fed to the candidate's on_tick and to
+the baseline's, with the config and team the bot was given and the same
+`random` seed for both. By default the candidate is `modified_strategy` in
+the working tree and the baseline is the same entry at git HEAD: the
+strategy package is extracted from that revision and imported under another
+name, so both versions run side by side in one process.
+
+Replay files are spread over a process pool and results stream back per
+file: ticks where any player's move or pass differs (beyond --angle
+degrees), examples of them, and each side's per-tick latency. The summary
+compares the latency distributions.
+
+Run from the MechMania directory:
+    python -m replay.diff REPLAY_OR_DIR [...] [--entry E] [--baseline-entry E]
+                          [--rev REV] [--angle DEG] [--examples N]
+                          [--workers W] [--out diffs.jsonl]
+
+Entries are named as in sim.tournament; only the tick function is used.
+`--rev worktree` takes the baseline from the working tree too, to compare
+two entries.
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import ctypes
+import shutil
+import tarfile
+import argparse
+import tempfile
+import importlib
+import subprocess
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from core.conf import NUM_PLAYERS, default_config
+from core.state import GameState
+from core.replay import RecordKind
+from replay.reader import recorded_config
+from replay.archive import load_records, replay_files
+
+DEFAULT_ENTRY = "modified_strategy"
+WORKTREE = "worktree"
+
+# Columns of an action row
+_DIR = slice(0, 2)
+_HAS_PASS = 2
+_PASS = slice(3, 5)
+
+
+class Example(NamedTuple):
+    record: int
+    tick: int
+    player: int
+    what: str                       # "move", "pass" or "error"
+    baseline: Optional[list]        # [dir x, dir y, has_pass, pass x, pass y]
+    candidate: Optional[list]
+
+
+class FileDiff(NamedTuple):
+    path: str
+    ticks: int
+    differing: int                  # ticks where any player differs
+    moves: List[int]                # per player
+    passes: List[int]
+    errors: Tuple[int, int]         # ticks where on_tick raised, baseline and candidate
+    examples: List[Example]
+    baseline_us: np.ndarray         # per tick
+    candidate_us: np.ndarray
+    wall_seconds: float
+
+
+def checkout(rev: str, directory: Path) -> str:
+    """Extracts the strategy package as of `rev` into `directory` under a
+    new name, and returns that name. Data files next to the package (the
+    MLP weights) come along"""
+    import strategy
+    package = Path(strategy.__file__).resolve().parent
+    top = Path(subprocess.run(["git", "-C", str(package), "rev-parse", "--show-toplevel"],
+                              check=True, capture_output=True, text=True).stdout.strip())
+    sha = subprocess.run(["git", "-C", str(top), "rev-parse", "--short", rev],
+                         check=True, capture_output=True, text=True).stdout.strip()
+    relative = package.relative_to(top)
+    listed = subprocess.run(["git", "-C", str(top), "ls-tree", "--name-only", sha, "--", f"{relative.parent.as_posix()}/"],
+                            check=True, capture_output=True, text=True).stdout.split()
+    data = [name for name in listed if name.endswith(".npz")]
+    archive = subprocess.run(["git", "-C", str(top), "archive", sha, relative.as_posix(), *data],
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory, filter="data")
+    name = f"strategy_{sha}"
+    os.rename(directory / relative, directory / relative.parent / name)
+    sys.path.insert(0, str(directory / relative.parent))
+    return name
+
+
+def tick_function(entry: str, package: str = "strategy"):
+    """The on_tick of an entry, from `package` in place of `strategy`"""
+    module, _, attr = entry.partition(":")[0].rpartition(".")
+    module = module or "strategy.main"
+    if module == "strategy" or module.startswith("strategy."):
+        module = package + module[len("strategy"):]
+    return getattr(importlib.import_module(module), attr)
+
+
+def action_rows(actions) -> np.ndarray:
+    rows = np.zeros((NUM_PLAYERS, 5))
+    for i, action in enumerate(actions[:NUM_PLAYERS]):
+        rows[i] = (action.dir.x, action.dir.y, action.has_pass, action.ball_pass.x, action.ball_pass.y)
+    return rows
+
+
+def _turned(a: np.ndarray, b: np.ndarray, cos_limit: float) -> np.ndarray:
+    """Per row: the vectors point more than the angle apart, or only one is zero"""
+    na, nb = np.linalg.norm(a, axis=-1), np.linalg.norm(b, axis=-1)
+    zero_a, zero_b = na < 1e-6, nb < 1e-6
+    cos = (a * b).sum(axis=-1) / np.maximum(na * nb, 1e-12)
+    return (zero_a != zero_b) | (~zero_a & ~zero_b & (cos < cos_limit))
+
+
+def compare(baseline: np.ndarray, candidate: np.ndarray, cos_limit: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(players whose move differs, players whose pass differs)"""
+    moves = _turned(baseline[:, _DIR], candidate[:, _DIR], cos_limit)
+    has = baseline[:, _HAS_PASS] > 0, candidate[:, _HAS_PASS] > 0
+    passes = (has[0] != has[1]) | (has[0] & has[1] & _turned(baseline[:, _PASS], candidate[:, _PASS], cos_limit))
+    return moves, passes
+
+
+_baseline = None
+_candidate = None
+
+
+def _init_worker(path: Optional[str], baseline: str, candidate: str, package: str):
+    global _baseline, _candidate
+    if path is not None:
+        sys.path.insert(0, path)
+    _baseline = tick_function(baseline, package)
+    _candidate = tick_function(candidate)
+
+
+def _run(fn, data: bytes, offset: int, seed: int) -> Tuple[Optional[np.ndarray], int]:
+    game = GameState.from_buffer_copy(data, offset)
+    random.seed(seed)
+    start = time.perf_counter_ns()
+    try:
+        actions = fn(game)
+    except Exception:
+        return None, time.perf_counter_ns() - start
+    elapsed = time.perf_counter_ns() - start
+    return action_rows(actions), elapsed
+
+
+def diff_file(path: str, angle: float, examples: int) -> FileDiff:
+    """Runs in the workers"""
+    from core.ipc import set_config
+    start = time.perf_counter()
+    records = load_records(path)
+    data = records.tobytes()
+    size = records.dtype.itemsize
+    data_offset = records.dtype.fields["data"][1]
+    state_offset = data_offset + records.dtype["data"]["tick"].fields["state"][1]
+    assert records.dtype["data"]["tick"]["state"].itemsize == ctypes.sizeof(GameState), f"{path}: GameState layout changed"
+
+    config, team = recorded_config(records)
+    set_config(config or default_config(), team or 0)
+
+    ticks = np.flatnonzero(records["kind"] == RecordKind.Tick)
+    game_ticks = records["data"]["tick"]["state"]["tick"]
+    cos_limit = float(np.cos(np.radians(angle)))
+    moves = np.zeros(NUM_PLAYERS, dtype=np.int64)
+    passes = np.zeros(NUM_PLAYERS, dtype=np.int64)
+    errors = [0, 0]
+    found: List[Example] = []
+    differing = 0
+    times = np.zeros((2, len(ticks)), dtype=np.float32)
+
+    for n, record in enumerate(ticks.tolist()):
+        offset = record * size + state_offset
+        # Alternate which side runs first, so neither always gets the warm caches
+        order = ((0, _baseline), (1, _candidate)) if n % 2 == 0 else ((1, _candidate), (0, _baseline))
+        rows: List[Optional[np.ndarray]] = [None, None]
+        for side, fn in order:
+            rows[side], elapsed = _run(fn, data, offset, record)
+            times[side, n] = elapsed / 1e3
+        tick = int(game_ticks[record])
+        if rows[0] is None or rows[1] is None:
+            for side in (0, 1):
+                errors[side] += rows[side] is None
+            differing += 1
+            if len(found) < examples:
+                found.append(Example(record, tick, -1, "error",
+                                     None if rows[0] is None else rows[0].tolist(),
+                                     None if rows[1] is None else rows[1].tolist()))
+            continue
+        moved, passed = compare(rows[0], rows[1], cos_limit)
+        if not (moved.any() or passed.any()):
+            continue
+        differing += 1
+        moves += moved
+        passes += passed
+        for player in np.flatnonzero(moved | passed).tolist():
+            if len(found) < examples:
+                found.append(Example(record, tick, player, "move" if moved[player] else "pass",
+                                     rows[0][player].tolist(), rows[1][player].tolist()))
+
+    return FileDiff(path, len(ticks), differing, moves.tolist(), passes.tolist(), tuple(errors), found,
+                    times[0], times[1], time.perf_counter() - start)
+
+
+def run_diff(files: Sequence[str], baseline: str, candidate: str, path: Optional[str], package: str,
+             angle: float, examples: int, workers: Optional[int] = None) -> Iterator[FileDiff]:
+    """Yields a FileDiff per file as workers finish them"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(path, baseline, candidate, package)) as pool:
+        futures = {pool.submit(diff_file, f, angle, examples): f for f in files}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"{futures[future]} failed: {e!r}", file=sys.stderr)
+
+
+def latency_table(baseline: np.ndarray, candidate: np.ndarray) -> str:
+    lines = [f"{'us/tick':<10} {'mean':>8} {'median':>8} {'p90':>8} {'p99':>8} {'p99.9':>8} {'max':>9}"]
+    for label, us in (("baseline", baseline), ("candidate", candidate)):
+        if not len(us):
+            continue
+        p50, p90, p99, p999 = np.percentile(us, [50, 90, 99, 99.9])
+        lines.append(f"{label:<10} {us.mean():>8.1f} {p50:>8.1f} {p90:>8.1f} {p99:>8.1f} {p999:>8.1f} {us.max():>9.1f}")
+    if len(baseline):
+        ratio = candidate / np.maximum(baseline, 1e-3)
+        lines.append(f"candidate/baseline per tick: median {np.median(ratio):.2f}x, "
+                     f"p10 {np.percentile(ratio, 10):.2f}x, p90 {np.percentile(ratio, 90):.2f}x")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two versions of a strategy over recorded games")
+    parser.add_argument("replays", nargs="+", help="replay files or directories of them")
+    parser.add_argument("--entry", default=DEFAULT_ENTRY, help="candidate, from the working tree")
+    parser.add_argument("--baseline-entry", default=None, help="default: the candidate's entry")
+    parser.add_argument("--rev", default="HEAD", help=f"git revision of the baseline, or '{WORKTREE}'")
+    parser.add_argument("--angle", type=float, default=1.0, help="degrees two directions may differ by")
+    parser.add_argument("--examples", type=int, default=20, help="differences kept per file")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--out", type=Path, default=None, help="write every kept difference here as JSON lines")
+    args = parser.parse_args()
+
+    files = replay_files(args.replays)
+    baseline = args.baseline_entry or args.entry
+    directory = Path(tempfile.mkdtemp(prefix="replay-diff-"))
+    try:
+        if args.rev == WORKTREE:
+            path, package = None, "strategy"
+        else:
+            package = checkout(args.rev, directory)
+            path = sys.path[0]
+        print(f"{len(files)} replays: {args.entry} (working tree) against {baseline} "
+              f"({args.rev if package == 'strategy' else package}), {args.workers or os.cpu_count()} workers")
+
+        out = open(args.out, "w") if args.out is not None else None
+        totals: Dict[str, int] = dict(ticks=0, differing=0, baseline_errors=0, candidate_errors=0)
+        moves = np.zeros(NUM_PLAYERS, dtype=np.int64)
+        passes = np.zeros(NUM_PLAYERS, dtype=np.int64)
+        baseline_us: List[np.ndarray] = []
+        candidate_us: List[np.ndarray] = []
+        start = time.perf_counter()
+        try:
+            for i, result in enumerate(run_diff(files, baseline, args.entry, path, package, args.angle,
+                                                args.examples, args.workers), 1):
+                totals["ticks"] += result.ticks
+                totals["differing"] += result.differing
+                totals["baseline_errors"] += result.errors[0]
+                totals["candidate_errors"] += result.errors[1]
+                moves += result.moves
+                passes += result.passes
+                baseline_us.append(result.baseline_us)
+                candidate_us.append(result.candidate_us)
+                if out is not None:
+                    for example in result.examples:
+                        out.write(json.dumps({"path": result.path, **example._asdict()}) + "\n")
+                    out.flush()
+                print(f"[{i}/{len(files)}] {result.path}: {result.differing}/{result.ticks} ticks differ"
+                      f"{f', errors {result.errors}' if any(result.errors) else ''} ({result.wall_seconds:.1f}s)")
+                for example in result.examples[:3]:
+                    print(f"    tick {example.tick} player {example.player} {example.what}: "
+                          f"{example.baseline} -> {example.candidate}")
+        finally:
+            if out is not None:
+                out.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    ticks = max(totals["ticks"], 1)
+    print(f"\n{time.perf_counter() - start:.1f}s wall, {totals['ticks']} ticks")
+    print(f"ticks that differ: {totals['differing']} ({totals['differing'] / ticks:.2%}), "
+          f"on_tick errors: baseline {totals['baseline_errors']}, candidate {totals['candidate_errors']}")
+    print(f"players differing, moves: {moves.tolist()}  passes: {passes.tolist()}")
+    print(latency_table(np.concatenate(baseline_us) if baseline_us else np.empty(0),
+                        np.concatenate(candidate_us) if candidate_us else np.empty(0)))
+
+
+if __name__ == "__main__":
+    main()
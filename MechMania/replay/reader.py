@@ -0,0 +1,250 @@
+"""Random access to replays written by core.replay.ReplayRecorder.
+
+The file is mapped read-only and viewed as one NumPy record array, so every
+column (positions, ball, possession, actions, strategy time) is a strided
+view of the mapping with nothing copied. A tick index (the record number of
+every tick) makes tick i an O(1) lookup; it is built with one vectorized
+pass over the record kinds and saved next to the replay as `<replay>.idx`,
+then mapped on later opens.
+
+Replays from older struct layouts are decoded through the layout stored in
+their header; only `state()` and `response()`, which hand back ctypes
+structs, need the current layout.
+
+Run from the MechMania directory:  python -m replay.reader REPLAY [REPLAY ...]
+"""
+import sys
+import json
+import ctypes
+import mmap
+import numpy as np
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+from core.conf import GameConfig
+from core.state import GameState
+from core.ipc import TickResponse
+from core.arrays import VEC2_DTYPE
+from core.replay import (
+    ReplayHeader, RecordKind, REPLAY_MAGIC, REPLAY_VERSION, LAYOUT_HASH, layout_hash,
+)
+
+INDEX_SUFFIX = ".idx"
+
+_VEC2_FIELDS = [["x", 0, {"scalar": "<f4", "size": 4}], ["y", 4, {"scalar": "<f4", "size": 4}]]
+
+
+def layout_dtype(layout: dict) -> np.dtype:
+    """NumPy dtype of a layout from core.replay.describe"""
+    if "scalar" in layout:
+        return np.dtype(layout["scalar"])
+    if "array" in layout:
+        return np.dtype((layout_dtype(layout["array"]), (layout["length"],)))
+    if layout["name"] == "Vec2" and layout["fields"] == _VEC2_FIELDS:
+        # As in core.arrays: a float32 pair, so positions come out as (..., 2)
+        return VEC2_DTYPE
+    return np.dtype({
+        "names": [name for name, _, _ in layout["fields"]],
+        "formats": [layout_dtype(field) for _, _, field in layout["fields"]],
+        "offsets": [offset for _, offset, _ in layout["fields"]],
+        "itemsize": layout["size"],
+    })
+
+
+def recorded_config(records: np.ndarray) -> Tuple[Optional[GameConfig], Optional[int]]:
+    """Config and team of the first config record, in the current layout"""
+    configs = np.flatnonzero(records["kind"] == RecordKind.Config)
+    if not len(configs):
+        return None, None
+    record = records[configs[0]]
+    return GameConfig.from_buffer_copy(record["data"]["config"]["config"].tobytes()), int(record["team"])
+
+
+class Columns:
+    """Named views of the fields of `records`, an array of replay records"""
+
+    records: np.ndarray
+
+    @property
+    def states(self) -> np.ndarray:
+        return self.records["data"]["tick"]["state"]
+
+    @property
+    def responses(self) -> np.ndarray:
+        return self.records["data"]["tick"]["response"]
+
+    @property
+    def tick(self) -> np.ndarray:
+        return self.states["tick"]
+
+    @property
+    def pos(self) -> np.ndarray:
+        """(R, 8, 2) player positions"""
+        return self.states["players"]["pos"]
+
+    @property
+    def dir(self) -> np.ndarray:
+        return self.states["players"]["dir"]
+
+    @property
+    def ball_pos(self) -> np.ndarray:
+        return self.states["ball"]["pos"]
+
+    @property
+    def ball_vel(self) -> np.ndarray:
+        return self.states["ball"]["vel"]
+
+    @property
+    def possession(self) -> np.ndarray:
+        """(R,) BallPossessionType"""
+        return self.states["_ball_possession"]["type"]
+
+    @property
+    def owner(self) -> np.ndarray:
+        return self.states["_ball_possession"]["data"]["possessed"]["owner"]
+
+    @property
+    def score(self) -> np.ndarray:
+        return self.states["score"]
+
+    @property
+    def elapsed_ns(self) -> np.ndarray:
+        return self.records["elapsed_ns"]
+
+    @property
+    def passing_team(self) -> np.ndarray:
+        """Team of a ball in flight; shares its byte with `owner`"""
+        return self.states["_ball_possession"]["data"]["passing"]["team"]
+
+
+class Replay(Columns):
+    """One replay file. Columns are views over every record, zero-copy; `kind`
+    tells ticks from resets and the config, and `index` or `runs` pick ticks"""
+
+    def __init__(self, path: Union[str, Path], build_index: bool = True):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header = ReplayHeader.from_buffer_copy(self.mmap)
+        assert self.header.magic == REPLAY_MAGIC, f"{path} is not a replay"
+        assert self.header.version <= REPLAY_VERSION, f"{path} is replay version {self.header.version}"
+        start = ctypes.sizeof(ReplayHeader)
+        self.layout = json.loads(bytes(self.mmap[start:start + self.header.layout_size]))
+        assert layout_hash(self.layout) == self.header.layout_hash, f"{path}: header layout is corrupt"
+        self.current = self.header.layout_hash == LAYOUT_HASH
+        self.dtype = layout_dtype(self.layout)
+
+        size = self.header.record_size
+        capacity = (len(self.mmap) - self.header.header_size) // size
+        everything = np.frombuffer(self.mmap, dtype=self.dtype, count=capacity, offset=self.header.header_size)
+        # A closed file ends at its last record; an untrimmed one at the first
+        # empty record at or after the count the writer last published
+        count = min(int(self.header.records), capacity)
+        kinds = everything["kind"]
+        while count < capacity and kinds[count] != RecordKind.Empty:
+            count += 1
+        self.records = everything[:count]
+        self.kind = self.records["kind"]
+
+        self.index = self._load_index() if build_index else None
+
+    def _load_index(self) -> np.ndarray:
+        """Record numbers of the ticks, from `<replay>.idx` if it matches"""
+        path = self.path.with_name(self.path.name + INDEX_SUFFIX)
+        if path.exists() and path.stat().st_mtime >= self.path.stat().st_mtime:
+            stored = np.load(path, mmap_mode="r")
+            # First entry is the record count the index was built for
+            if len(stored) and stored[0] == len(self.records):
+                return stored[1:]
+        index = np.flatnonzero(self.kind == RecordKind.Tick)
+        try:
+            with open(path, "wb") as f:
+                np.save(f, np.concatenate([[len(self.records)], index]).astype(np.int64))
+        except OSError:
+            pass
+        return index
+
+    def close(self):
+        # Views pin the map; it closes once they are gone
+        for name in ("records", "kind", "index"):
+            self.__dict__.pop(name, None)
+        try:
+            self.mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    # Single records
+
+    def record(self, i: int) -> np.void:
+        """Tick `i` (in recording order) as a NumPy record, O(1)"""
+        return self.records[self.index[i]]
+
+    def _struct(self, ctype, i: int, field: str):
+        assert self.current, f"{self.path} uses an older struct layout; read it through the columns"
+        record = int(self.index[i])
+        offset = self.header.header_size + record * self.header.record_size + self.dtype.fields["data"][1]
+        offset += self.dtype["data"]["tick"].fields[field][1]
+        return ctype.from_buffer_copy(self.mmap, offset)
+
+    def state(self, i: int) -> GameState:
+        """Tick `i` as a GameState, copied out of the file"""
+        return self._struct(GameState, i, "state")
+
+    def response(self, i: int) -> TickResponse:
+        return self._struct(TickResponse, i, "response")
+
+    def find(self, tick: int) -> int:
+        """Index of the first recorded tick at or after game tick `tick`"""
+        return int(np.searchsorted(self.tick[self.index], tick))
+
+    @property
+    def config(self) -> Optional[GameConfig]:
+        configs = np.flatnonzero(self.kind == RecordKind.Config)
+        if not len(configs):
+            return None
+        raw = self.records[configs[0]]["data"]["config"]["config"]
+        return GameConfig.from_buffer_copy(raw.tobytes()) if self.current else None
+
+    @property
+    def team(self) -> Optional[int]:
+        configs = np.flatnonzero(self.kind == RecordKind.Config)
+        return int(self.records["team"][configs[0]]) if len(configs) else None
+
+    def runs(self) -> List[Tuple[int, int]]:
+        """(start, stop) record ranges of consecutive ticks; slicing a column
+        with one stays zero-copy"""
+        ticks = np.r_[False, self.kind == RecordKind.Tick, False]
+        edges = np.flatnonzero(ticks[1:] != ticks[:-1])
+        return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+    def blocks(self, size: int = 1 << 16) -> Iterator[np.ndarray]:
+        """Tick records in zero-copy slices of at most `size`"""
+        for start, stop in self.runs():
+            for s in range(start, stop, size):
+                yield self.records[s:min(s + size, stop)]
+
+
+def main():
+    for path in sys.argv[1:]:
+        with Replay(path) as replay:
+            kinds = np.bincount(replay.kind, minlength=4)
+            elapsed = replay.elapsed_ns[replay.index] / 1e3
+            layout = "current layout" if replay.current else f"layout {replay.header.layout_hash:016x}"
+            print(f"{path}: team {replay.team}, {len(replay)} ticks, {kinds[RecordKind.Reset]} resets, {layout}")
+            if len(replay):
+                ticks = replay.tick[replay.index]
+                print(f"  game ticks {ticks[0]}-{ticks[-1]}, final score {replay.score[replay.index[-1]]}")
+                print(f"  strategy time: median {np.median(elapsed):.1f}us  p99 {np.percentile(elapsed, 99):.1f}us"
+                      f"  max {elapsed.max():.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Early-stopping A/B test between two strategies.
+
+Candidate and baseline play batches of games on the batch simulator, taking
+turns on each side of the field, in a process pool (see sim/tournament.py).
+After every batch a sequential probability ratio test on win/draw/loss
+decides between H0 "the candidate is at most elo0 stronger" and H1 "it is at
+least elo1 stronger". The run stops as soon as the test accepts one of them,
+or at --max-games, which is the size of the fixed run it replaces.
+
+Run from the MechMania directory:
+    python -m sim.ab CANDIDATE BASELINE [--elo0 E0] [--elo1 E1] [--alpha A]
+                     [--beta B] [--games G] [--max-games N] [--ticks T] [--workers W]
+
+Entries are named as in sim.tournament.
+"""
+import math
+import time
+import argparse
+from typing import List, NamedTuple, Optional
+from sim.tournament import Task, TaskResult, run_tournament
+
+H0 = "H0"
+H1 = "H1"
+
+
+def elo_to_score(elo: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def score_to_elo(score: float) -> float:
+    score = min(max(score, 1e-6), 1.0 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+class SPRT:
+    """Generalized SPRT on win/draw/loss counts, normal approximation of the
+    log-likelihood ratio. Counts get half a game of each result as a prior,
+    so a clean sweep still has a variance to test against"""
+
+    def __init__(self, elo0: float, elo1: float, alpha: float, beta: float):
+        self.score0 = elo_to_score(elo0)
+        self.score1 = elo_to_score(elo1)
+        self.lower = math.log(beta / (1.0 - alpha))
+        self.upper = math.log((1.0 - beta) / alpha)
+        self.wins = self.draws = self.losses = 0
+
+    def add(self, wins: int, draws: int, losses: int):
+        self.wins += wins
+        self.draws += draws
+        self.losses += losses
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score(self) -> float:
+        return (self.wins + 0.5 * self.draws) / max(self.games, 1)
+
+    def llr(self) -> float:
+        w, d, l = self.wins + 0.5, self.draws + 0.5, self.losses + 0.5
+        n = w + d + l
+        mean = (w + 0.5 * d) / n
+        var = (w + 0.25 * d) / n - mean * mean
+        s0, s1 = self.score0, self.score1
+        return self.games * (s1 - s0) * (2.0 * mean - s0 - s1) / (2.0 * var)
+
+    def decision(self) -> Optional[str]:
+        llr = self.llr()
+        if llr >= self.upper:
+            return H1
+        if llr <= self.lower:
+            return H0
+        return None
+
+
+class ABResult(NamedTuple):
+    decision: Optional[str]     # None when --max-games ran out first
+    sprt: SPRT
+    games_simulated: int        # includes batches that finished after the decision
+    max_games: int
+    seconds: float
+
+    @property
+    def games_saved(self) -> int:
+        return self.max_games - self.games_simulated
+
+
+def run_ab(
+        candidate: str,
+        baseline: str,
+        sprt: SPRT,
+        games: int = 8,
+        max_games: int = 1000,
+        ticks: Optional[int] = None,
+        workers: Optional[int] = None,
+        progress=None,
+) -> ABResult:
+    """Plays candidate vs baseline until `sprt` decides. `progress` is
+    called with the SPRT after every batch"""
+    start = time.perf_counter()
+    tasks = ab_tasks(candidate, baseline, games, max_games, ticks)
+
+    decision = None
+    simulated = 0
+    # Batches still running at the decision are waited for, so they count
+    late = []
+    results = run_tournament(tasks, workers, late)
+    try:
+        for result in results:
+            simulated += len(result.goals)
+            sprt.add(*_candidate_record(result, candidate))
+            if progress is not None:
+                progress(sprt)
+            decision = sprt.decision()
+            if decision is not None:
+                break
+    finally:
+        results.close()
+    simulated += sum(len(result.goals) for result in late)
+    return ABResult(decision, sprt, simulated, max_games, time.perf_counter() - start)
+
+
+def ab_tasks(candidate: str, baseline: str, games: int, max_games: int, ticks: Optional[int]) -> List[Task]:
+    """Batches of `games` that alternate sides and add up to exactly
+    `max_games`; the last one is cut short if needed"""
+    tasks = []
+    remaining = max_games
+    while remaining > 0:
+        i = len(tasks)
+        entries = (candidate, baseline) if i % 2 == 0 else (baseline, candidate)
+        tasks.append(Task(*entries, i // 2, min(games, remaining), ticks))
+        remaining -= tasks[-1].games
+    return tasks
+
+
+def _candidate_record(result: TaskResult, candidate: str):
+    side = 0 if result.task.entry_a == candidate else 1
+    wins = draws = losses = 0
+    for goals in result.goals:
+        own, other = goals[side], goals[1 - side]
+        wins += own > other
+        draws += own == other
+        losses += own < other
+    return wins, draws, losses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential A/B test between two strategies")
+    parser.add_argument("candidate")
+    parser.add_argument("baseline")
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=30.0)
+    parser.add_argument("--alpha", type=float, default=0.05, help="false positive rate")
+    parser.add_argument("--beta", type=float, default=0.05, help="false negative rate")
+    parser.add_argument("--games", type=int, default=8, help="games per batch")
+    parser.add_argument("--max-games", type=int, default=1000, help="size of the fixed run")
+    parser.add_argument("--ticks", type=int, default=None, help="ticks per game, default a full match")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    sprt = SPRT(args.elo0, args.elo1, args.alpha, args.beta)
+    print(f"H0: elo <= {args.elo0}  H1: elo >= {args.elo1}  "
+          f"bounds [{sprt.lower:.2f}, {sprt.upper:.2f}]")
+
+    def progress(s: SPRT):
+        print(f"{s.games:>6} games  W {s.wins} D {s.draws} L {s.losses}  "
+              f"elo {score_to_elo(s.score):+7.1f}  llr {s.llr():+6.2f}")
+
+    result = run_ab(args.candidate, args.baseline, sprt, args.games, args.max_games,
+                    args.ticks, args.workers, progress)
+    verdict = {H1: "candidate is stronger", H0: "candidate is not stronger", None: "no decision"}
+    print(f"\n{verdict[result.decision]} after {sprt.games} games ({result.seconds:.1f}s)")
+    print(f"saved {result.games_saved} of {result.max_games} games "
+          f"({result.games_saved / result.max_games:.0%}); {result.games_simulated} simulated in total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+import numpy as np
+from typing import Callable, NamedTuple, Optional, Sequence, Tuple
+from core.conf import GameConfig, NUM_PLAYERS
+from core.state import BallPossessionType, GameState, PlayerAction, ActionSlot, Score, Team
+from core.arrays import GAME_STATE_DTYPE, PLAYER_ACTION_DTYPE
+from core.ipc import Strategy, set_config
+
+# The rules of sim/rules.py for N games at once. Every game is a row of the
+# arrays below and one `step` advances all of them; games that need a kickoff
+# are reset in place while the rest keep playing, so the batch never stalls.
+# All games share the tick counter and finish together.
+#
+# As in rules.Match everything is kept in team A's frame. Policies see the
+# game from their own side through `BatchMatch.view`.
+
+P = 2 * NUM_PLAYERS
+
+# Event codes returned by `step`, one per game
+NO_EVENT = 0
+GOAL_A = 1
+GOAL_B = 2
+STAGNATION = 3
+ENDGAME = 4
+FINISHED = 5
+
+EVENT_NAMES = ("", "goal_a", "goal_b", "stagnation", "endgame", "finished")
+
+
+class BatchView(NamedTuple):
+    """All games as one team sees them: its own players first, its own goal at x = 0"""
+    tick: int
+    pos: np.ndarray             # (N, 8, 2)
+    dir: np.ndarray             # (N, 8, 2)
+    ball_pos: np.ndarray        # (N, 2)
+    ball_vel: np.ndarray        # (N, 2)
+    possession: np.ndarray      # (N,) BallPossessionType
+    owner: np.ndarray           # (N,) player index in this view, meaningful while possessed
+    capture_ticks: np.ndarray   # (N,)
+    passing_team: np.ndarray    # (N,) Team, meaningful while passing
+    stagnation_center: np.ndarray   # (N, 2)
+    stagnation_tick: np.ndarray     # (N,)
+    score: np.ndarray           # (N, 2) self, other
+
+
+# Actions in a team's own frame: dirs (N, 4, 2), pass targets (N, 4, 2), has_pass (N, 4)
+Actions = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class BatchPolicy(NamedTuple):
+    """The batched counterpart of core.ipc.Strategy.
+
+    `on_reset(scores, games)` gets the (G, 2) scores of the games being reset
+    and their indices, and returns formations as (G, 4, 2) or one (4, 2) for
+    all. `on_tick(view)` returns `Actions` for every game.
+    """
+    on_reset: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    on_tick: Callable[[BatchView], Actions]
+
+
+class BatchMatch:
+    """N games and the rules that advance them"""
+
+    def __init__(self, config: GameConfig, n: int, seed: Optional[int] = None):
+        self.config = config
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.width = float(config.field.width)
+        self.height = float(config.field.height)
+        self.games = np.arange(n)
+
+        self.tick = 0
+        self.score = np.zeros((n, 2), dtype=np.int64)
+        self.pos = np.zeros((n, P, 2))
+        self.dir = np.zeros((n, P, 2))
+        self.ball_pos = np.zeros((n, 2))
+        self.ball_vel = np.zeros((n, 2))
+        self.possession = np.full(n, BallPossessionType.Free, dtype=np.uint8)
+        self.owner = np.zeros(n, dtype=np.int64)
+        self.capture_ticks = np.zeros(n, dtype=np.int64)
+        self.passer = np.full(n, -1, dtype=np.int64)
+        self.stagnation_center = np.zeros((n, 2))
+        self.stagnation_tick = np.zeros(n, dtype=np.int64)
+
+        # Player speed is the same for everyone, only the ball carrier differs
+        self._speed = np.full((n, P), float(config.player.speed))
+
+    @property
+    def total_ticks(self) -> int:
+        return self.config.max_ticks + self.config.endgame_ticks
+
+    @property
+    def finished(self) -> bool:
+        return self.tick >= self.total_ticks
+
+    def goal_height(self) -> float:
+        return float(self.config.goal.current_height(self.config, self.tick))
+
+    def possession_team(self) -> np.ndarray:
+        """(N,) team holding or passing the ball, in A's frame"""
+        holder = np.where(self.possession == BallPossessionType.Possessed, self.owner, self.passer)
+        return np.where(holder < NUM_PLAYERS, Team.Self, Team.Other)
+
+    def reset(self, games: np.ndarray, formation_a: np.ndarray, formation_b: np.ndarray):
+        """Kickoff for `games`; see rules.Match.reset. Formations are (G, 4, 2)
+        or (4, 2), each in its team's own frame"""
+        config = self.config
+        radius = config.player.radius
+        g = len(games)
+        center = np.array([self.width * 0.5, self.height * 0.5])
+
+        pos = np.empty((g, P, 2))
+        pos[:, :NUM_PLAYERS] = formation_a
+        pos[:, NUM_PLAYERS:] = formation_b
+        np.clip(pos[..., 0], radius, self.width * 0.5 - radius, out=pos[..., 0])
+        np.clip(pos[..., 1], radius, self.height - radius, out=pos[..., 1])
+        pos[:, NUM_PLAYERS:, 0] = self.width - pos[:, NUM_PLAYERS:, 0]
+
+        offset = pos - center
+        dist = np.hypot(offset[..., 0], offset[..., 1])
+        close = dist < config.spawn_ball_dist
+        if close.any():
+            away = np.zeros((g, P, 2))
+            away[:, :NUM_PLAYERS, 0] = -1.0
+            away[:, NUM_PLAYERS:, 0] = 1.0
+            moved = dist > 0
+            away[moved] = offset[moved] / dist[moved, None]
+            pos[close] = center + away[close] * config.spawn_ball_dist
+
+        self.pos[games] = pos
+        self.dir[games] = 0.0
+        self.ball_pos[games] = center
+        self.ball_vel[games] = 0.0
+        self.possession[games] = BallPossessionType.Free
+        self.capture_ticks[games] = 0
+        self.passer[games] = -1
+        self.stagnation_center[games] = center
+        self.stagnation_tick[games] = self.tick
+
+    def step(self, dirs: np.ndarray, passes: np.ndarray, has_pass: np.ndarray) -> np.ndarray:
+        """Advances every game one tick. Arrays are (N, 8, 2) / (N, 8) in A's
+        frame. Returns the (N,) event codes that end the tick"""
+        config = self.config
+        games = self.games
+        events = np.zeros(self.n, dtype=np.int8)
+
+        # Movement
+        length = np.hypot(dirs[..., 0], dirs[..., 1])
+        scale = self._speed.copy()
+        possessed = self.possession == BallPossessionType.Possessed
+        carriers = games[possessed]
+        scale[carriers, self.owner[carriers]] *= config.player.possession_slowdown
+        scale /= np.maximum(length, 1.0)
+        self.pos += dirs * scale[..., None]
+        radius = config.player.radius
+        np.clip(self.pos[..., 0], radius, self.width - radius, out=self.pos[..., 0])
+        np.clip(self.pos[..., 1], radius, self.height - radius, out=self.pos[..., 1])
+        moving = length > 0
+        self.dir[moving] = dirs[moving] / length[moving, None]
+
+        # Ball: passes leave, carried balls follow their owner and are contested
+        if len(carriers):
+            owners = self.owner[carriers]
+            kicking = has_pass[carriers, owners]
+            self._kick(carriers[kicking], owners[kicking], passes[carriers[kicking], owners[kicking]])
+            carried = carriers[~kicking]
+            self.ball_pos[carried] = self.pos[carried, self.owner[carried]]
+            self._contest(carried)
+
+        loose = games[self.possession != BallPossessionType.Possessed]
+        if len(loose):
+            scored = self._roll(loose, events)
+            self._pickup(loose[~scored])
+        self._stagnation(events)
+        return self._end_tick(events)
+
+    def _kick(self, games: np.ndarray, owners: np.ndarray, aim: np.ndarray):
+        config = self.config
+        norm = np.hypot(aim[:, 0], aim[:, 1])
+        angle = np.radians(self.rng.uniform(-config.player.pass_error, config.player.pass_error, len(games)))
+        c, s = np.cos(angle), np.sin(angle)
+        unit = aim / np.where(norm > 0, norm, 1.0)[:, None]
+        vel = np.stack([unit[:, 0] * c - unit[:, 1] * s, unit[:, 0] * s + unit[:, 1] * c], axis=1)
+        self.ball_vel[games] = vel * config.player.pass_speed
+        self.ball_pos[games] = self.pos[games, owners]
+        self.possession[games] = BallPossessionType.Passing
+        self.passer[games] = owners
+        self.capture_ticks[games] = 0
+
+    def _contest(self, games: np.ndarray):
+        # Opponents in pickup range of a carried ball wear the owner down
+        if not len(games):
+            return
+        lo = np.where(self.owner[games] < NUM_PLAYERS, NUM_PLAYERS, 0)
+        rivals = lo[:, None] + np.arange(NUM_PLAYERS)
+        offset = self.pos[games[:, None], rivals] - self.ball_pos[games, None]
+        dist = np.hypot(offset[..., 0], offset[..., 1])
+        close = dist <= self.config.player.pickup_radius
+        pressed = close.any(axis=1)
+        ticks = np.where(pressed, self.capture_ticks[games] + 1, 0)
+        taken = ticks >= self.config.ball.capture_ticks
+        nearest = np.argmin(np.where(close, dist, np.inf), axis=1)
+        self.owner[games] = np.where(taken, lo + nearest, self.owner[games])
+        self.capture_ticks[games] = np.where(taken, 0, ticks)
+
+    def _roll(self, games: np.ndarray, events: np.ndarray) -> np.ndarray:
+        """Moves the loose balls in `games`, returns which of them went in"""
+        config = self.config
+        pos = self.ball_pos[games] + self.ball_vel[games]
+        vel = self.ball_vel[games] * (1.0 - config.ball.friction)
+
+        r = config.ball.radius
+        in_mouth = np.abs(pos[:, 1] - self.height * 0.5) <= self.goal_height() * 0.5
+        low = pos < r
+        high = pos > np.array([self.width, self.height]) - r
+        goal_b = low[:, 0] & in_mouth
+        goal_a = high[:, 0] & in_mouth & ~low[:, 0]
+        bounce_low = low & ~goal_b[:, None]
+        bounce_high = high & ~low & ~goal_a[:, None]
+        pos = np.where(bounce_low, 2 * r - pos, pos)
+        pos = np.where(bounce_high, 2 * (np.array([self.width, self.height]) - r) - pos, pos)
+        vel = np.where(bounce_low | bounce_high, -vel, vel)
+        self.ball_pos[games] = pos
+        self.ball_vel[games] = vel
+
+        events[games[goal_a]] = GOAL_A
+        events[games[goal_b]] = GOAL_B
+        scored = goal_a | goal_b
+
+        slow = np.hypot(vel[:, 0], vel[:, 1]) < config.player.speed
+        stopped = games[~scored & slow & (self.possession[games] == BallPossessionType.Passing)]
+        self.possession[stopped] = BallPossessionType.Free
+        self.passer[stopped] = -1
+        return scored
+
+    def _pickup(self, games: np.ndarray):
+        if not len(games):
+            return
+        offset = self.pos[games] - self.ball_pos[games, None]
+        dist = np.hypot(offset[..., 0], offset[..., 1])
+        passing = self.passer[games] >= 0
+        dist[passing, self.passer[games[passing]]] = np.inf
+        nearest = np.argmin(dist, axis=1)
+        near = dist[np.arange(len(games)), nearest] <= self.config.player.pickup_radius
+        picked, owner = games[near], nearest[near]
+        self.possession[picked] = BallPossessionType.Possessed
+        self.owner[picked] = owner
+        self.passer[picked] = -1
+        self.capture_ticks[picked] = 0
+        self.ball_pos[picked] = self.pos[picked, owner]
+        self.ball_vel[picked] = 0.0
+
+    def _stagnation(self, events: np.ndarray):
+        offset = self.ball_pos - self.stagnation_center
+        moved = (np.hypot(offset[:, 0], offset[:, 1]) > self.config.ball.stagnation_radius) & (events == NO_EVENT)
+        self.stagnation_center[moved] = self.ball_pos[moved]
+        self.stagnation_tick[moved] = self.tick
+        stale = ~moved & (events == NO_EVENT) & (self.tick - self.stagnation_tick >= self.config.ball.stagnation_ticks)
+        events[stale] = STAGNATION
+
+    def _end_tick(self, events: np.ndarray) -> np.ndarray:
+        self.score[:, 0] += events == GOAL_A
+        self.score[:, 1] += events == GOAL_B
+        self.tick += 1
+        if self.finished:
+            events[:] = FINISHED
+        elif self.tick == self.config.max_ticks + 1:
+            events[events == NO_EVENT] = ENDGAME
+        return events
+
+    def view(self, team: int) -> BatchView:
+        """The games as `team` sees them. The arrays are copies"""
+        possession = self.possession.copy()
+        if team == Team.Self:
+            pos, direction = self.pos.copy(), self.dir.copy()
+            ball_pos, ball_vel = self.ball_pos.copy(), self.ball_vel.copy()
+            stagnation_center = self.stagnation_center.copy()
+            owner = self.owner.copy()
+            score = self.score.copy()
+        else:
+            pos = np.roll(self.pos, -NUM_PLAYERS, axis=1)
+            direction = np.roll(self.dir, -NUM_PLAYERS, axis=1)
+            pos[..., 0] = self.width - pos[..., 0]
+            direction[..., 0] = -direction[..., 0]
+            ball_pos = self.ball_pos.copy()
+            ball_pos[:, 0] = self.width - ball_pos[:, 0]
+            ball_vel = self.ball_vel.copy()
+            ball_vel[:, 0] = -ball_vel[:, 0]
+            stagnation_center = self.stagnation_center.copy()
+            stagnation_center[:, 0] = self.width - stagnation_center[:, 0]
+            owner = (self.owner + NUM_PLAYERS) % P
+            score = self.score[:, ::-1].copy()
+        passing_team = (self.possession_team() != team).astype(np.uint8)
+        return BatchView(
+            self.tick, pos, direction, ball_pos, ball_vel, possession, owner,
+            self.capture_ticks.copy(), passing_team, stagnation_center,
+            self.stagnation_tick.copy(), score,
+        )
+
+
+def to_team_a(team: int, width: float, actions: Actions) -> Tuple[np.ndarray, np.ndarray]:
+    """(dirs, pass targets) of one team's actions in A's frame. Pass targets
+    are directions from the passer, like dirs"""
+    dirs, passes, _ = actions
+    if team == Team.Self:
+        return dirs, passes
+    dirs = np.array(dirs, dtype=np.float64)
+    passes = np.array(passes, dtype=np.float64)
+    dirs[..., 0] = -dirs[..., 0]
+    passes[..., 0] = -passes[..., 0]
+    return dirs, passes
+
+
+class BatchResult(NamedTuple):
+    score: np.ndarray       # (N, 2) goals for A, B
+    ticks: int
+    events: np.ndarray      # (N, len(EVENT_NAMES)) count of each event per game
+
+
+def play(
+        match: BatchMatch,
+        policies: Tuple[BatchPolicy, BatchPolicy],
+        ticks: Optional[int] = None,
+) -> BatchResult:
+    """Plays every game in `match` to the end (or for `ticks` ticks) and
+    resets games as their events require"""
+    counts = np.zeros((match.n, len(EVENT_NAMES)), dtype=np.int64)
+    _kickoff(match, policies, match.games)
+    limit = match.total_ticks if ticks is None else min(ticks, match.total_ticks)
+
+    dirs = np.empty((match.n, P, 2))
+    passes = np.empty((match.n, P, 2))
+    has_pass = np.empty((match.n, P), dtype=bool)
+    while match.tick < limit:
+        for team, policy in enumerate(policies):
+            actions = policy.on_tick(match.view(team))
+            team_slice = slice(team * NUM_PLAYERS, (team + 1) * NUM_PLAYERS)
+            dirs[:, team_slice], passes[:, team_slice] = to_team_a(team, match.width, actions)
+            has_pass[:, team_slice] = actions[2]
+        events = match.step(dirs, passes, has_pass)
+        counts[match.games, events] += 1
+        if events[0] == FINISHED:
+            break
+        resets = match.games[(events != NO_EVENT) & (events != FINISHED)]
+        if len(resets):
+            _kickoff(match, policies, resets)
+    counts[:, NO_EVENT] = 0
+    return BatchResult(match.score.copy(), match.tick, counts)
+
+
+def _kickoff(match: BatchMatch, policies: Tuple[BatchPolicy, BatchPolicy], games: np.ndarray):
+    formation_a = policies[0].on_reset(match.score[games], games)
+    formation_b = policies[1].on_reset(match.score[games, ::-1], games)
+    match.reset(games, formation_a, formation_b)
+
+
+def _write_states(raw: np.ndarray, view: BatchView, config: GameConfig):
+    """Fills an (N,) GAME_STATE_DTYPE array from a view"""
+    raw["tick"] = view.tick
+    ball = raw["ball"]
+    ball["pos"] = view.ball_pos
+    ball["vel"] = view.ball_vel
+    ball["radius"] = config.ball.radius
+    possession = raw["_ball_possession"]
+    possession["type"] = view.possession
+    possessed = possession["data"]["possessed"]
+    possessed["owner"] = view.owner
+    possessed["team"] = view.owner >= NUM_PLAYERS
+    possessed["capture_ticks"] = view.capture_ticks
+    # The passing team shares its byte with the owner; write it where it applies
+    passing = view.possession == BallPossessionType.Passing
+    possession["data"]["passing"]["team"][passing] = view.passing_team[passing]
+    raw["ball_stagnation"]["center"] = view.stagnation_center
+    raw["ball_stagnation"]["tick"] = view.stagnation_tick
+    players = raw["players"]
+    players["pos"] = view.pos
+    players["dir"] = view.dir
+    raw["score"]["self"] = view.score[:, 0]
+    raw["score"]["other"] = view.score[:, 1]
+
+
+class StrategyPolicy:
+    """Drives an existing `Strategy` over a batch, one GameState per game.
+
+    The states live in one NumPy array, so filling them is a handful of
+    vectorized writes; only the strategy calls themselves run per game. The
+    strategy is shared by all games, as it would be by consecutive matches.
+    """
+
+    def __init__(self, strategy: Strategy, config: GameConfig, n: int, team: int = 0):
+        self.strategy = strategy
+        self.config = config
+        self.team = team
+        set_config(config, team)
+
+        # ctypes cannot take a buffer from a union dtype, so both sides share a bytearray
+        self.buffer = bytearray(n * GAME_STATE_DTYPE.itemsize)
+        self.raw = np.frombuffer(self.buffer, dtype=GAME_STATE_DTYPE)
+        players = self.raw["players"]
+        players["id"] = np.arange(P)
+        players["speed"] = config.player.speed
+        players["radius"] = config.player.radius
+        players["pickup_radius"] = config.player.pickup_radius
+        self.states = [GameState.from_buffer(self.buffer, i * GAME_STATE_DTYPE.itemsize) for i in range(n)]
+
+        stride = NUM_PLAYERS * PLAYER_ACTION_DTYPE.itemsize
+        self.response_buffer = bytearray(n * stride)
+        self.response_raw = np.frombuffer(self.response_buffer, dtype=PLAYER_ACTION_DTYPE).reshape(n, NUM_PLAYERS)
+        self.responses = [(PlayerAction * NUM_PLAYERS).from_buffer(self.response_buffer, i * stride) for i in range(n)]
+        self.slots = [[ActionSlot(r, i) for i in range(NUM_PLAYERS)] for r in self.responses]
+        self.score = Score()
+
+    def on_reset(self, scores: np.ndarray, games: np.ndarray) -> np.ndarray:
+        set_config(self.config, self.team)
+        formations = np.zeros((len(games), NUM_PLAYERS, 2))
+        for g in range(len(games)):
+            self.score.self, self.score.other = int(scores[g, 0]), int(scores[g, 1])
+            for i, p in enumerate(self.strategy.on_reset(self.score)[:NUM_PLAYERS]):
+                formations[g, i] = (p.x, p.y)
+        return formations
+
+    def on_tick(self, view: BatchView) -> Actions:
+        set_config(self.config, self.team)
+        _write_states(self.raw, view, self.config)
+        self.response_raw.fill(0)
+        strategy = self.strategy
+        if strategy.in_place:
+            for game, slots in zip(self.states, self.slots):
+                strategy.on_tick(game, slots)
+        else:
+            for game, response in zip(self.states, self.responses):
+                actions = strategy.on_tick(game)
+                for i in range(min(len(actions), NUM_PLAYERS)):
+                    response[i] = actions[i]
+        out = self.response_raw
+        return (out["dir"].astype(np.float64), out["ball_pass"].astype(np.float64),
+                out["has_pass"].astype(bool))
+
+    def policy(self) -> BatchPolicy:
+        return BatchPolicy(self.on_reset, self.on_tick)
+
+
+def chase_policy(config: GameConfig, formation: Sequence[Tuple[float, float]]) -> BatchPolicy:
+    """Everyone runs at the ball and the carrier shoots at the enemy goal:
+    the simplest native batched policy, mostly for measuring the simulator"""
+    formation = np.asarray(formation, dtype=np.float64)
+    goal = np.array([float(config.field.width), config.field.height * 0.5])
+
+    def on_reset(scores: np.ndarray, games: np.ndarray) -> np.ndarray:
+        return formation
+
+    def on_tick(view: BatchView) -> Actions:
+        own = view.pos[:, :NUM_PLAYERS]
+        dirs = view.ball_pos[:, None] - own
+        passes = goal - own
+        has_pass = np.zeros((len(own), NUM_PLAYERS), dtype=bool)
+        holding = (view.possession == BallPossessionType.Possessed) & (view.owner < NUM_PLAYERS)
+        has_pass[holding, view.owner[holding]] = True
+        return dirs, passes, has_pass
+
+    return BatchPolicy(on_reset, on_tick)
@@ -0,0 +1,312 @@
+"""Distills a hand-written strategy into the MLP of strategy.mlp.
+
+The teacher (modified_strategy by default) plays simulated games against
+itself, and every `--every` ticks the states both teams see are recorded
+with the teacher's actions as labels; a small MLP is then fitted to them
+with sim/train.py. `--dagger R` adds R rounds where the student plays the
+teacher and the states it reaches are labelled by the teacher too, so it
+learns to recover from its own mistakes. The result is branch-free: one
+encode, one forward pass and one decode per tick, whatever the state.
+
+The report compares student and teacher on fresh states (move directions,
+pass decisions, per-tick latency) and in games: each against the teacher and
+against `--opponents`, on both sides of the field.
+
+Run from the MechMania directory:
+    python -m sim.distill [--teacher modified_strategy:cheese_formation]
+                          [--samples N] [--dagger R] [--hidden 64 32]
+                          [--epochs E] [--games G] [--ticks T]
+                          [--data DIR] [--out distilled.npz]
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Dict, NamedTuple
+from core.conf import GameConfig, default_config, NUM_PLAYERS
+from core.state import GameState
+from core.arrays import GAME_STATE_DTYPE
+from core.ipc import set_config
+
+TEACHER = "modified_strategy:cheese_formation"
+OPPONENTS = ("ball_chase:goalee_formation", "new_strategy:rush_formation")
+HIDDEN = (64, 32)
+
+# Teacher moves shorter than this have no direction to agree with
+MIN_MOVE = 1e-3
+
+
+def targets(actions) -> np.ndarray:
+    """(N, 4, OUTPUTS) network outputs that decode to the teacher's `actions`"""
+    from strategy.mlp import OUTPUTS
+    dirs, passes, has_pass = actions
+    out = np.zeros(dirs.shape[:2] + (OUTPUTS,), dtype=np.float32)
+    length = np.hypot(dirs[..., 0], dirs[..., 1])
+    moving = length > 0
+    out[moving, 0:2] = dirs[moving] / length[moving, None]
+    out[..., 5] = np.minimum(length, 1.0) * 2.0 - 1.0
+    aim = np.hypot(passes[..., 0], passes[..., 1])
+    kicking = has_pass & (aim > 0)
+    out[kicking, 2:4] = passes[kicking] / aim[kicking, None]
+    out[..., 4] = np.where(has_pass, 1.0, -1.0)
+    return out
+
+
+class StudentPolicy:
+    """An MLP playing a whole batch at once, with the teacher's formation"""
+
+    def __init__(self, model, config: GameConfig, n: int, on_reset):
+        self.model = model
+        self.config = config
+        self.on_reset = on_reset
+        self.raw = np.zeros(n, dtype=GAME_STATE_DTYPE)
+
+    def on_tick(self, view):
+        from sim.batch import _write_states
+        from strategy.mlp import FEATURES, OUTPUTS, encode_batch, decode_batch, holders
+        _write_states(self.raw, view, self.config)
+        x = encode_batch(self.raw, self.config).reshape(-1, FEATURES)
+        out = self.model.forward(x).reshape(len(self.raw), NUM_PLAYERS, OUTPUTS)
+        return decode_batch(out, holders(self.raw))
+
+    def policy(self):
+        from sim.batch import BatchPolicy
+        return BatchPolicy(self.on_reset, self.on_tick)
+
+
+class Recorder:
+    """Labels what one team sees with the teacher's actions, every `every`
+    ticks, while the teacher or a student plays"""
+
+    def __init__(self, teacher, config: GameConfig, n: int, team: int, sink, every: int = 1, student=None):
+        from sim.batch import StrategyPolicy
+        self.teacher = StrategyPolicy(teacher, config, n, team)
+        self.student = StudentPolicy(student, config, n, self.teacher.on_reset) if student is not None else None
+        self.config = config
+        self.sink = sink
+        self.every = every
+
+    def on_tick(self, view):
+        from strategy.mlp import encode_batch
+        actions = self.teacher.on_tick(view)
+        if view.tick % self.every == 0:
+            self.sink(self.teacher.raw.copy(), encode_batch(self.teacher.raw, self.config), targets(actions))
+        return actions if self.student is None else self.student.on_tick(view)
+
+    def policy(self):
+        from sim.batch import BatchPolicy
+        return BatchPolicy(self.teacher.on_reset, self.on_tick)
+
+
+def sample(teacher: str, config: GameConfig, sink, rows: int, games: int, ticks: int, every: int, seed: int,
+           student=None) -> int:
+    """Plays whole batches of games until `sink` has been given at least
+    `rows` player rows. With a student it plays team A of even batches and
+    team B of odd ones"""
+    from sim.batch import BatchMatch, play
+    from sim.tournament import load_strategy
+    given = 0
+
+    def counting(raw, x, y):
+        nonlocal given
+        given += x.shape[0] * x.shape[1]
+        sink(raw, x, y)
+
+    batch = 0
+    while given < rows:
+        random.seed(seed + batch)
+        match = BatchMatch(config, games, seed + batch)
+        students = (student, None) if batch % 2 == 0 else (None, student)
+        recorders = [Recorder(load_strategy(teacher), config, games, team, counting, every, students[team])
+                     for team in (0, 1)]
+        play(match, tuple(r.policy() for r in recorders), ticks)
+        batch += 1
+    return given
+
+
+class Agreement(NamedTuple):
+    move_angle_median: float    # degrees, over rows where the teacher moves
+    move_angle_p90: float
+    move_within_15: float       # share of those rows within 15 degrees
+    throttle_error: float       # mean absolute, in [0, 2]
+    pass_agreement: float       # share of ball-holder rows with the same pass decision
+    teacher_passes: float       # share of ball-holder rows where each side passes
+    student_passes: float
+    pass_angle_median: float    # degrees, where both pass
+
+
+def agreement(student: np.ndarray, teacher: np.ndarray, holder: np.ndarray) -> Agreement:
+    """Compares (N, 4, OUTPUTS) outputs; `holder` is (N,) from strategy.mlp.holders"""
+
+    def angles(a, b):
+        diff = np.arctan2(a[:, 1], a[:, 0]) - np.arctan2(b[:, 1], b[:, 0])
+        return np.abs(np.degrees((diff + np.pi) % (2 * np.pi) - np.pi))
+
+    student, teacher = student.reshape(-1, student.shape[-1]), teacher.reshape(-1, teacher.shape[-1])
+    moving = teacher[:, 5] > MIN_MOVE * 2.0 - 1.0
+    move = angles(student[moving, 0:2], teacher[moving, 0:2]) if moving.any() else np.zeros(1)
+    rows = (np.arange(NUM_PLAYERS) == holder[:, None]).ravel()
+    student_pass, teacher_pass = student[rows, 4] > 0, teacher[rows, 4] > 0
+    both = student_pass & teacher_pass
+    aim = angles(student[rows][both, 2:4], teacher[rows][both, 2:4]) if both.any() else np.full(1, np.nan)
+    return Agreement(
+        float(np.median(move)), float(np.percentile(move, 90)), float(np.mean(move <= 15.0)),
+        float(np.mean(np.abs(student[:, 5] - teacher[:, 5]))),
+        float(np.mean(student_pass == teacher_pass)) if rows.any() else float("nan"),
+        float(np.mean(teacher_pass)) if rows.any() else float("nan"),
+        float(np.mean(student_pass)) if rows.any() else float("nan"),
+        float(np.median(aim)),
+    )
+
+
+def tick_latencies(teacher: str, model, config: GameConfig, raw: np.ndarray) -> Dict[str, np.ndarray]:
+    """Seconds per on_tick call for teacher and student, one state at a time"""
+    from sim.tournament import load_strategy
+    from strategy.mlp import MLPPolicy
+    set_config(config, 0)
+    data = raw.tobytes()
+    size = GAME_STATE_DTYPE.itemsize
+    states = [GameState.from_buffer_copy(data, i * size) for i in range(len(raw))]
+    strategy = load_strategy(teacher)
+    assert not strategy.in_place, "timing needs a strategy that returns its actions"
+    out = {}
+    for name, fn in (("teacher", strategy.on_tick), ("student", MLPPolicy(model))):
+        seconds = np.empty(len(states))
+        for i, game in enumerate(states):
+            start = time.perf_counter()
+            fn(game)
+            seconds[i] = time.perf_counter() - start
+        out[name] = seconds
+    return out
+
+
+class Record(NamedTuple):
+    points: float       # per game: win 1, draw 0.5
+    goal_diff: float    # per game
+    games: int
+
+
+def head_to_head(teacher: str, model, opponent: str, config: GameConfig, games: int, ticks: int, seed: int) -> Record:
+    """The student (or the teacher itself when `model` is None) against
+    `opponent`, half the games on each side"""
+    from sim.batch import BatchMatch, StrategyPolicy, play
+    from sim.tournament import load_strategy
+    points = goal_diff = 0.0
+    per_side = max(games // 2, 1)
+    for side in (0, 1):
+        random.seed(seed + side)
+        match = BatchMatch(config, per_side, seed + side)
+        ours = StrategyPolicy(load_strategy(teacher), config, per_side, side)
+        if model is not None:
+            ours = StudentPolicy(model, config, per_side, ours.on_reset)
+        theirs = StrategyPolicy(load_strategy(opponent), config, per_side, 1 - side)
+        policies = (ours.policy(), theirs.policy()) if side == 0 else (theirs.policy(), ours.policy())
+        score = play(match, policies, ticks).score
+        own, other = score[:, side], score[:, 1 - side]
+        points += float((own > other).sum() + 0.5 * (own == other).sum())
+        goal_diff += float((own - other).sum())
+    return Record(points / (2 * per_side), goal_diff / (2 * per_side), 2 * per_side)
+
+
+def distill(args, data: Path):
+    from sim.train import ShardWriter, Shards, train, init_layers
+    from strategy.mlp import FEATURES, OUTPUTS, MLP, save_layers
+    config = default_config()
+    writer = ShardWriter(data)
+
+    def to_shards(raw, x, y):
+        writer.add(x.reshape(-1, FEATURES), y.reshape(-1, OUTPUTS))
+
+    def fit(model, epochs):
+        writer.flush()
+        shards = Shards(sorted(data.glob("*.npz")))
+        print(f"training on {len(shards)} rows")
+        return train(shards, model, epochs, args.batch, args.lr, args.seed, None,
+                     lambda e, loss, _, s: print(f"  epoch {e:>3}: {loss:.5f}  ({s:.1f}s)"))
+
+    start = time.perf_counter()
+    rows = sample(args.teacher, config, to_shards, args.samples, args.sample_games, args.sample_ticks, args.every, args.seed)
+    print(f"sampled {rows} rows from the teacher in {time.perf_counter() - start:.1f}s")
+    model = fit(MLP(*init_layers([FEATURES, *args.hidden, OUTPUTS], np.random.default_rng(args.seed))), args.epochs)
+    for r in range(args.dagger):
+        start = time.perf_counter()
+        rows = sample(args.teacher, config, to_shards, args.samples // 2, args.sample_games, args.sample_ticks,
+                      args.every, args.seed + 1000 * (r + 1), model)
+        print(f"dagger round {r}: {rows} rows from student games in {time.perf_counter() - start:.1f}s")
+        model = fit(model, max(args.epochs // 2, 1))
+
+    tmp = args.out.with_name(args.out.name + ".tmp")
+    with open(tmp, "wb") as f:
+        save_layers(f, model.weights, model.biases)
+    os.replace(tmp, args.out)
+    print(f"wrote {args.out}\n")
+    return model
+
+
+def report(args, model):
+    from strategy.mlp import FEATURES, holders
+    config = default_config()
+    raws, xs, ys = [], [], []
+    sample(args.teacher, config, lambda raw, x, y: (raws.append(raw), xs.append(x), ys.append(y)),
+           args.eval_rows, args.sample_games, args.sample_ticks, args.every, args.seed + 99991)
+    # np.concatenate would repack the union dtype; the bytes keep its layout
+    raw = np.frombuffer(b"".join(r.tobytes() for r in raws), dtype=GAME_STATE_DTYPE)
+    x, y = np.concatenate(xs), np.concatenate(ys)
+    out = model.forward(x.reshape(-1, FEATURES)).reshape(y.shape)
+    a = agreement(out, y, holders(raw))
+    print(f"agreement on {len(raw)} fresh teacher states:")
+    print(f"  move direction: median {a.move_angle_median:.1f} deg, p90 {a.move_angle_p90:.1f} deg, "
+          f"{a.move_within_15:.1%} within 15 deg; throttle error {a.throttle_error:.3f}")
+    print(f"  pass decision: {a.pass_agreement:.1%} agree (teacher passes {a.teacher_passes:.1%}, "
+          f"student {a.student_passes:.1%}); pass direction median {a.pass_angle_median:.1f} deg\n")
+
+    print(f"{'per tick (us)':<14} {'median':>8} {'p99':>8} {'max':>8} {'p99/median':>11}")
+    for name, seconds in tick_latencies(args.teacher, model, config, raw[:args.time_states]).items():
+        us = seconds * 1e6
+        p50, p99 = np.median(us), np.percentile(us, 99)
+        print(f"{name:<14} {p50:>8.1f} {p99:>8.1f} {us.max():>8.1f} {p99 / p50:>11.1f}")
+
+    print(f"\n{'opponent':<36} {'teacher pts':>11} {'student pts':>11} {'teacher gd':>10} {'student gd':>10}")
+    for opponent in [args.teacher, *args.opponents]:
+        teacher = head_to_head(args.teacher, None, opponent, config, args.games, args.ticks, args.seed)
+        student = head_to_head(args.teacher, model, opponent, config, args.games, args.ticks, args.seed)
+        print(f"{opponent:<36} {teacher.points:>11.2f} {student.points:>11.2f} "
+              f"{teacher.goal_diff:>+10.2f} {student.goal_diff:>+10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill a strategy into a small MLP")
+    parser.add_argument("--teacher", default=TEACHER)
+    parser.add_argument("--samples", type=int, default=500_000, help="player rows sampled from teacher games")
+    parser.add_argument("--dagger", type=int, default=1, help="rounds of student games relabelled by the teacher")
+    parser.add_argument("--every", type=int, default=2, help="record every this many ticks")
+    parser.add_argument("--sample-games", type=int, default=16, help="games played side by side while sampling")
+    parser.add_argument("--sample-ticks", type=int, default=2000, help="ticks per sampled game")
+    parser.add_argument("--hidden", type=int, nargs="+", default=list(HIDDEN))
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=512)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--eval-rows", type=int, default=50_000, help="player rows of fresh states for agreement")
+    parser.add_argument("--time-states", type=int, default=2000, help="states to time both sides on")
+    parser.add_argument("--opponents", nargs="*", default=list(OPPONENTS))
+    parser.add_argument("--games", type=int, default=8, help="games per win-rate comparison")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks per win-rate game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", type=Path, default=None, help="keep the sampled shards here")
+    parser.add_argument("--out", type=Path, default=Path("distilled.npz"))
+    args = parser.parse_args()
+
+    if args.data is not None:
+        model = distill(args, args.data)
+    else:
+        with tempfile.TemporaryDirectory() as data:
+            model = distill(args, Path(data))
+    report(args, model)
+    print(f"\nplay it with mlp_strategy by copying {args.out} to soccer_weights.npz")
+
+
+if __name__ == "__main__":
+    main()
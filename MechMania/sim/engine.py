@@ -0,0 +1,243 @@
+"""Headless stand-in for the game engine.
+
+Creates a shared memory file and a wakeup FIFO per bot, starts the bots and
+drives the same HandshakeMsg -> ResetMsg -> TickMsg protocol as the real
+engine (see core/ipc.py), with the rules in sim/rules.py. There is no frame
+rate: every tick is sent as soon as both bots have answered the last one, so
+the timings it reports are the bots' real round trips.
+
+Run from the MechMania directory:
+    python -m sim.engine [--ticks N] [--seed S] [--bot-a CMD] [--bot-b CMD]
+"""
+import os
+import sys
+import time
+import ctypes
+import mmap
+import shlex
+import argparse
+import tempfile
+import subprocess
+import statistics
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Sequence
+from core.conf import GameConfig, NUM_PLAYERS, default_config
+from core.ipc import Shm, Protocol, ProtocolId, EngineStatus, HANDSHAKE_BOT, ResetResponse
+from core.arrays import PLAYER_ACTION_DTYPE
+from core.state import Team
+from core.wake import WakeNotifier
+from sim.rules import Match, StateWriter, RESET_EVENTS, FINISHED, to_team_a
+
+# How long a bot may take to answer one message before the match is abandoned
+RESPONSE_TIMEOUT = 5.0
+# Spin this many checks of the sync byte before yielding the CPU to the bots
+SPIN_CHECKS = 200
+
+DEFAULT_BOT = [sys.executable, str(Path(__file__).resolve().parent.parent / "__main__.py")]
+
+
+class BotTimeout(Exception):
+    pass
+
+
+class BotLink:
+    """Engine side of one bot's shared memory channel"""
+
+    def __init__(self, team: int, directory: Path, command: Optional[Sequence[str]] = None):
+        self.team = team
+        self.path = directory / f"bot{team}.shm"
+        self.wake_path = directory / f"bot{team}.wake"
+        self.path.write_bytes(bytes(ctypes.sizeof(Shm)))
+        os.mkfifo(self.wake_path)
+
+        self.file = open(self.path, "r+b")
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        self.shm = Shm.from_buffer(self.mmap)
+        self.protocol = self.shm.protocol
+        self.shm.sync = EngineStatus.Busy
+        self.notifier = WakeNotifier.from_fifo(self.wake_path)
+
+        offset = Shm.protocol.offset + Protocol.data.offset
+        self.state = StateWriter(self.mmap, offset)
+        self.actions = np.frombuffer(self.mmap, dtype=PLAYER_ACTION_DTYPE, count=NUM_PLAYERS, offset=offset)
+        self.formation = ResetResponse.from_buffer(self.mmap, offset)
+
+        self.latencies: List[float] = []
+        self.sent_at = 0.0
+        self.answered_at = 0.0
+        self.process = None
+        if command is not None:
+            self.process = subprocess.Popen([*command, str(self.path), str(self.wake_path)])
+
+    def send(self, message_type: int):
+        self.protocol.type = message_type
+        self.sent_at = time.perf_counter()
+        self.shm.sync = EngineStatus.Ready
+        self.notifier.notify()
+
+    def answered(self) -> bool:
+        return self.shm.sync == EngineStatus.Busy
+
+    def received(self, expected_type: int):
+        self.latencies.append(self.answered_at - self.sent_at)
+        assert self.protocol.type == expected_type, \
+            f"bot {self.team} answered with message {self.protocol.type}, expected {expected_type}"
+
+    def close(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.shm.sync = EngineStatus.Finished
+        self.notifier.close()
+        del self.shm, self.protocol, self.state, self.actions, self.formation
+        self.mmap.close()
+        self.file.close()
+
+
+def wait_for(links: Sequence[BotLink], timeout: float = RESPONSE_TIMEOUT):
+    """Returns once every bot has handed its channel back, stamping when each did"""
+    deadline = time.perf_counter() + timeout
+    pending = list(links)
+    checks = 0
+    while pending:
+        for link in pending:
+            if link.answered():
+                link.answered_at = time.perf_counter()
+        pending = [link for link in pending if not link.answered()]
+        checks += 1
+        if not pending or checks < SPIN_CHECKS:
+            continue
+        if time.perf_counter() > deadline:
+            raise BotTimeout(f"bot(s) {[link.team for link in pending]} did not answer within {timeout}s")
+        # Let the bots have the CPU
+        time.sleep(0)
+
+
+class LocalEngine:
+    def __init__(
+            self,
+            config: GameConfig,
+            commands: Sequence[Optional[Sequence[str]]] = (DEFAULT_BOT, DEFAULT_BOT),
+            seed: Optional[int] = None,
+            directory: Optional[Path] = None,
+    ):
+        self.config = config
+        self.match = Match(config, seed)
+        self._tmp = None
+        if directory is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="mm-engine-")
+            directory = Path(self._tmp.name)
+        self.links = [BotLink(team, directory, commands[team]) for team in (Team.Self, Team.Other)]
+
+        self.dirs = np.zeros((2 * NUM_PLAYERS, 2))
+        self.passes = np.zeros((2 * NUM_PLAYERS, 2))
+        self.has_pass = np.zeros(2 * NUM_PLAYERS, dtype=bool)
+        self.events: List[tuple] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        for link in self.links:
+            link.close()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+    def handshake(self):
+        for link in self.links:
+            link.protocol.data.handshake_msg.team = link.team
+            link.protocol.data.handshake_msg.config = self.config
+            link.send(ProtocolId.HandshakeMsg)
+        wait_for(self.links)
+        for link in self.links:
+            link.received(ProtocolId.HandshakeResponse)
+            assert link.protocol.data.handshake_response == HANDSHAKE_BOT.value, \
+                f"bot {link.team} sent a bad handshake"
+
+    def reset(self):
+        for link in self.links:
+            score = link.protocol.data.reset_msg
+            score.self = self.match.score[link.team]
+            score.other = self.match.score[1 - link.team]
+            link.send(ProtocolId.ResetMsg)
+        wait_for(self.links)
+        formations = []
+        for link in self.links:
+            link.received(ProtocolId.ResetResponse)
+            formations.append([(p.x, p.y) for p in link.formation])
+        self.match.reset(formations[0], formations[1])
+
+    def tick(self) -> Optional[str]:
+        match = self.match
+        for link in self.links:
+            link.state.write(match, link.team)
+            link.send(ProtocolId.TickMsg)
+        wait_for(self.links)
+
+        for link in self.links:
+            link.received(ProtocolId.TickResponse)
+            team = slice(link.team * NUM_PLAYERS, (link.team + 1) * NUM_PLAYERS)
+            actions = link.actions
+            self.dirs[team] = to_team_a(link.team, match.width, actions["dir"], False)
+            self.passes[team] = to_team_a(link.team, match.width, actions["ball_pass"], False)
+            self.has_pass[team] = actions["has_pass"]
+        return match.step(self.dirs, self.passes, self.has_pass)
+
+    def run(self, ticks: Optional[int] = None) -> Match:
+        """Plays a full match (or the first `ticks` ticks of one)"""
+        self.handshake()
+        self.reset()
+        limit = self.match.total_ticks if ticks is None else ticks
+        while self.match.tick < limit:
+            event = self.tick()
+            if event is None:
+                continue
+            self.events.append((self.match.tick, event))
+            if event == FINISHED:
+                break
+            if event in RESET_EVENTS:
+                self.reset()
+        return self.match
+
+
+def _summary(latencies: List[float]) -> str:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (f"median {statistics.median(ordered) * 1e6:8.1f}us  "
+            f"p99 {p99 * 1e6:8.1f}us  max {ordered[-1] * 1e6:8.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run two bots against each other locally")
+    parser.add_argument("--ticks", type=int, default=None, help="stop after this many ticks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bot-a", default=None, help="command for team A, gets [shm path] [wake fifo]")
+    parser.add_argument("--bot-b", default=None, help="command for team B")
+    args = parser.parse_args()
+
+    commands = [shlex.split(cmd) if cmd else DEFAULT_BOT for cmd in (args.bot_a, args.bot_b)]
+    config = default_config()
+    with LocalEngine(config, commands, args.seed) as engine:
+        start = time.perf_counter()
+        match = engine.run(args.ticks)
+        elapsed = time.perf_counter() - start
+
+        print(f"score {match.score[0]} - {match.score[1]} after {match.tick} ticks "
+              f"({match.tick / elapsed:.0f} ticks/s)")
+        resets = {}
+        for _, event in engine.events:
+            resets[event] = resets.get(event, 0) + 1
+        print("events:", ", ".join(f"{name} x{count}" for name, count in sorted(resets.items())) or "none")
+        for link, name in zip(engine.links, "AB"):
+            print(f"bot {name} round trip: {_summary(link.latencies)}")
+
+
+if __name__ == "__main__":
+    main()
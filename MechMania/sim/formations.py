@@ -0,0 +1,188 @@
+"""Evolves reset formations against a fixed on-tick policy.
+
+A candidate is four (x, y) slots as fractions of the field, like
+CHEESE_SLOTS. Its fitness is measured over short simulated kickoffs: the
+candidate formation with the given tick function against the baseline,
+`--ticks` ticks from the reset, scored by goals plus how far up the field
+the ball spent its time. Every candidate plays the same kickoffs, so
+fitness is a fixed function of the slots and is cached; repeated or
+surviving candidates are never replayed. `--cache` keeps the cache across
+runs.
+
+The population evolves (mu + lambda): uniform crossover and Gaussian
+mutation, evaluated in a process pool one generation at a time.
+
+Run from the MechMania directory:
+    python -m sim.formations [--tick modified_strategy] [--start CHEESE_SLOTS]
+                             [--population P] [--generations G] [--kickoffs K]
+                             [--ticks T] [--workers W] [--cache cache.json]
+"""
+import os
+import json
+import random
+import argparse
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+from core.conf import default_config, NUM_PLAYERS
+
+BASELINE = "modified_strategy:cheese_formation"
+
+# Weight of mean ball position (-1 at our goal line, +1 at theirs) against goals
+TERRITORY_WEIGHT = 0.25
+
+# Slots are cached at this precision, about a unit on a 1000-wide field
+CACHE_DECIMALS = 3
+
+
+def slot_key(vector: Sequence[float]) -> Tuple[float, ...]:
+    return tuple(round(float(v), CACHE_DECIMALS) for v in vector)
+
+
+def kickoff_fitness(key: Tuple[float, ...], tick: str, baseline: str, kickoffs: int, ticks: int, seed: int) -> float:
+    """Mean kickoff score of a slot table; executed in the workers"""
+    from sim.batch import BatchMatch, BatchPolicy, StrategyPolicy, NO_EVENT, GOAL_A, GOAL_B, to_team_a
+    from sim.tournament import load_strategy
+    config = default_config()
+    random.seed(seed)
+    match = BatchMatch(config, kickoffs, seed)
+
+    w, h = float(config.field.width), float(config.field.height)
+    formation = np.array(key).reshape(NUM_PLAYERS, 2) * (w, h)
+    candidate = StrategyPolicy(load_strategy(tick), config, kickoffs, 0).policy()
+    opponent = StrategyPolicy(load_strategy(baseline), config, kickoffs, 1)
+    policies = (BatchPolicy(lambda scores, games: formation, candidate.on_tick), opponent.policy())
+
+    match.reset(match.games, formation, opponent.on_reset(match.score, match.games))
+    live = np.ones(kickoffs, dtype=bool)
+    goals = np.zeros(kickoffs)
+    territory = np.zeros(kickoffs)
+    dirs = np.empty((kickoffs, 2 * NUM_PLAYERS, 2))
+    passes = np.empty_like(dirs)
+    has_pass = np.empty((kickoffs, 2 * NUM_PLAYERS), dtype=bool)
+    for _ in range(ticks):
+        for team, policy in enumerate(policies):
+            actions = policy.on_tick(match.view(team))
+            side = slice(team * NUM_PLAYERS, (team + 1) * NUM_PLAYERS)
+            dirs[:, side], passes[:, side] = to_team_a(team, w, actions)
+            has_pass[:, side] = actions[2]
+        events = match.step(dirs, passes, has_pass)
+        territory[live] += match.ball_pos[live, 0] / w * 2.0 - 1.0
+        goals[live & (events == GOAL_A)] += 1
+        goals[live & (events == GOAL_B)] -= 1
+        # A kickoff ends with its first reset; the game keeps running unscored
+        live &= events == NO_EVENT
+        if not live.any():
+            break
+    return float(np.mean(goals + TERRITORY_WEIGHT * territory / ticks))
+
+
+class FitnessCache:
+    def __init__(self, path: Optional[Path], settings: Dict):
+        self.path = path
+        self.settings = settings
+        self.values: Dict[Tuple[float, ...], float] = {}
+        if path is not None and path.exists():
+            data = json.loads(path.read_text())
+            if data["settings"] == settings:
+                self.values = {tuple(k): v for k, v in data["values"]}
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"settings": self.settings, "values": [[list(k), v] for k, v in self.values.items()]}))
+        os.replace(tmp, self.path)
+
+
+def evolve(
+        start: np.ndarray,
+        cache: FitnessCache,
+        tick: str,
+        baseline: str = BASELINE,
+        population: int = 16,
+        generations: int = 10,
+        kickoffs: int = 16,
+        ticks: int = 200,
+        sigma: float = 0.05,
+        seed: int = 0,
+        workers: Optional[int] = None,
+        progress=None,
+) -> Tuple[Tuple[float, ...], float]:
+    """Best slot table found and its fitness"""
+    from strategy.params import PARAM_BOUNDS
+    bounds = PARAM_BOUNDS[4:]
+    low, high = bounds[:, 0], bounds[:, 1]
+    rng = np.random.default_rng(seed)
+
+    def fitness_of(keys, pool):
+        missing = [k for k in dict.fromkeys(keys) if k not in cache.values]
+        results = pool.map(kickoff_fitness, missing, *zip(*[(tick, baseline, kickoffs, ticks, seed)] * len(missing)))
+        for key, value in zip(missing, results):
+            cache.values[key] = value
+        cache.save()
+        return [cache.values[k] for k in keys]
+
+    parents = [slot_key(np.clip(start, low, high))]
+    parents += [slot_key(np.clip(start + rng.normal(size=start.shape) * sigma, low, high)) for _ in range(population - 1)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        scores = fitness_of(parents, pool)
+        for generation in range(generations):
+            children = []
+            for _ in range(population):
+                a, b = rng.choice(len(parents), size=2)
+                mask = rng.random(len(start)) < 0.5
+                child = np.where(mask, parents[a], parents[b]) + rng.normal(size=start.shape) * sigma
+                children.append(slot_key(np.clip(child, low, high)))
+            pool_keys = parents + children
+            pool_scores = scores + fitness_of(children, pool)
+            # Survivors: the best `population` distinct tables
+            order = sorted(dict(zip(pool_keys, pool_scores)).items(), key=lambda kv: -kv[1])[:population]
+            parents = [k for k, _ in order]
+            scores = [s for _, s in order]
+            if progress is not None:
+                progress(generation, scores[0], len(cache.values))
+    return parents[0], scores[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evolve reset formations in simulation")
+    parser.add_argument("--tick", default="modified_strategy", help="on-tick function the formation is for")
+    parser.add_argument("--start", default="CHEESE_SLOTS", help="slot table in strategy.main to start from")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--kickoffs", type=int, default=16, help="kickoffs per evaluation")
+    parser.add_argument("--ticks", type=int, default=200, help="ticks per kickoff")
+    parser.add_argument("--sigma", type=float, default=0.05, help="mutation size in field fractions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", type=Path, default=None)
+    args = parser.parse_args()
+
+    from strategy import main as strategies
+    start = np.array(getattr(strategies, args.start), dtype=np.float64).ravel()
+    settings = {k: getattr(args, k) for k in ("tick", "baseline", "kickoffs", "ticks", "seed")}
+    cache = FitnessCache(args.cache, settings)
+    if cache.values:
+        print(f"{len(cache.values)} cached evaluations from {args.cache}")
+
+    def progress(generation: int, best: float, evaluated: int):
+        print(f"generation {generation:>3}: best {best:+.4f}  ({evaluated} formations evaluated)")
+
+    best, score = evolve(
+        start, cache, args.tick, args.baseline, args.population, args.generations,
+        args.kickoffs, args.ticks, args.sigma, args.seed, args.workers, progress,
+    )
+    initial = cache.values[slot_key(start)]
+    print(f"\n{args.start}: {initial:+.4f}  evolved: {score:+.4f}\n")
+    print("EVOLVED_SLOTS = (")
+    for i in range(NUM_PLAYERS):
+        print(f"    ({best[2 * i]}, {best[2 * i + 1]}),")
+    print(")")
+    print("evolved_formation = fixed_formation(EVOLVED_SLOTS)")
+
+
+if __name__ == "__main__":
+    main()
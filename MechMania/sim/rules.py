@@ -0,0 +1,322 @@
+import math
+import random
+import numpy as np
+from typing import Optional, Sequence, Tuple
+from core.conf import GameConfig, NUM_PLAYERS
+from core.state import BallPossessionType, Team
+
+# Reference rules for running bots offline. The real engine is authoritative;
+# this follows GameConfig as closely as the config describes it:
+#
+# - Players move `speed` per tick along their action's direction (shorter
+#   directions move proportionally slower), `possession_slowdown` times that
+#   while carrying the ball, and are kept inside the field. They do not
+#   collide with each other.
+# - A carried ball sits on its owner. Opponents standing within pickup range
+#   of it for `capture_ticks` consecutive ticks take it.
+# - A pass leaves at `pass_speed`, turned by up to `pass_error` degrees. Until
+#   it slows below player speed the passer cannot pick it up again.
+# - A loose ball moves by its velocity, then loses `friction` of it, every
+#   tick, and bounces off the walls outside the goal mouths.
+# - The nearest player within `pickup_radius` picks up a loose ball.
+# - The field resets after a goal, when the ball stays within
+#   `stagnation_radius` for `stagnation_ticks`, and when endgame starts. In
+#   endgame the goals span the whole side (GoalConfig.current_height).
+#
+# Everything is kept in team A's frame: A defends x = 0, B defends x = width.
+
+Event = Optional[str]
+GOAL_A = "goal_a"           # team A scored
+GOAL_B = "goal_b"
+STAGNATION = "stagnation"
+ENDGAME = "endgame"
+FINISHED = "finished"
+
+RESET_EVENTS = (GOAL_A, GOAL_B, STAGNATION, ENDGAME)
+
+
+class Match:
+    """One game's state and the rules that advance it"""
+
+    def __init__(self, config: GameConfig, seed: Optional[int] = None):
+        self.config = config
+        self.rng = random.Random(seed)
+        self.width = float(config.field.width)
+        self.height = float(config.field.height)
+
+        self.tick = 0
+        self.score = [0, 0]
+        self.pos = np.zeros((2 * NUM_PLAYERS, 2))
+        self.dir = np.zeros((2 * NUM_PLAYERS, 2))
+        self.ball_pos = np.zeros(2)
+        self.ball_vel = np.zeros(2)
+        self.possession = BallPossessionType.Free
+        self.owner = 0
+        self.capture_ticks = 0
+        self.passer = -1            # player who released the current pass
+        self.stagnation_center = np.zeros(2)
+        self.stagnation_tick = 0
+
+    @property
+    def total_ticks(self) -> int:
+        return self.config.max_ticks + self.config.endgame_ticks
+
+    @property
+    def finished(self) -> bool:
+        return self.tick >= self.total_ticks
+
+    def goal_height(self) -> float:
+        return float(self.config.goal.current_height(self.config, self.tick))
+
+    def possession_team(self) -> int:
+        """Team holding or passing the ball, in A's frame"""
+        owner = self.owner if self.possession == BallPossessionType.Possessed else self.passer
+        return Team.Self if owner < NUM_PLAYERS else Team.Other
+
+    def reset(self, formation_a: Sequence[Tuple[float, float]], formation_b: Sequence[Tuple[float, float]]):
+        """Places both teams and the ball for a kickoff.
+
+        Formations are in each team's own frame; they are kept in the team's
+        half and at least `spawn_ball_dist` from the ball at the center.
+        """
+        center = np.array([self.width * 0.5, self.height * 0.5])
+        radius = self.config.player.radius
+        for team, formation in ((0, formation_a), (1, formation_b)):
+            for i in range(NUM_PLAYERS):
+                x, y = formation[i] if i < len(formation) else (self.width * 0.25, self.height * 0.5)
+                x = min(max(x, radius), self.width * 0.5 - radius)
+                y = min(max(y, radius), self.height - radius)
+                if team == 1:
+                    x = self.width - x
+                p = np.array([x, y])
+                offset = p - center
+                dist = math.hypot(offset[0], offset[1])
+                if dist < self.config.spawn_ball_dist:
+                    away = offset / dist if dist > 0 else np.array([-1.0 if team == 0 else 1.0, 0.0])
+                    p = center + away * self.config.spawn_ball_dist
+                self.pos[team * NUM_PLAYERS + i] = p
+        self.dir[:] = 0.0
+        self.ball_pos[:] = center
+        self.ball_vel[:] = 0.0
+        self.possession = BallPossessionType.Free
+        self.capture_ticks = 0
+        self.passer = -1
+        self.stagnation_center[:] = center
+        self.stagnation_tick = self.tick
+
+    def step(self, dirs: np.ndarray, passes: np.ndarray, has_pass: np.ndarray) -> Event:
+        """Advances one tick. Arrays are (8, 2) / (8,) in A's frame. Returns
+        the event that ends the tick, if any"""
+        config = self.config
+        speed = config.player.speed
+
+        # Movement
+        length = np.hypot(dirs[:, 0], dirs[:, 1])
+        step = dirs / np.maximum(length, 1.0)[:, None]
+        scale = np.full(2 * NUM_PLAYERS, speed)
+        if self.possession == BallPossessionType.Possessed:
+            scale[self.owner] *= config.player.possession_slowdown
+        self.pos += step * scale[:, None]
+        radius = config.player.radius
+        np.clip(self.pos[:, 0], radius, self.width - radius, out=self.pos[:, 0])
+        np.clip(self.pos[:, 1], radius, self.height - radius, out=self.pos[:, 1])
+        moving = length > 0
+        self.dir[moving] = dirs[moving] / length[moving, None]
+
+        # Ball
+        if self.possession == BallPossessionType.Possessed:
+            owner = self.owner
+            if has_pass[owner]:
+                self._kick(owner, passes[owner])
+            else:
+                self.ball_pos[:] = self.pos[owner]
+                self._contest()
+
+        if self.possession != BallPossessionType.Possessed:
+            event = self._roll()
+            if event is not None:
+                return self._end_tick(event)
+            self._pickup()
+
+        return self._end_tick(self._stagnation())
+
+    def _kick(self, owner: int, aim: np.ndarray):
+        config = self.config
+        norm = math.hypot(aim[0], aim[1])
+        if norm > 0:
+            angle = math.radians(self.rng.uniform(-config.player.pass_error, config.player.pass_error))
+            c, s = math.cos(angle), math.sin(angle)
+            ux, uy = aim[0] / norm, aim[1] / norm
+            self.ball_vel[:] = (
+                (ux * c - uy * s) * config.player.pass_speed,
+                (ux * s + uy * c) * config.player.pass_speed,
+            )
+        else:
+            self.ball_vel[:] = 0.0
+        self.ball_pos[:] = self.pos[owner]
+        self.possession = BallPossessionType.Passing
+        self.passer = owner
+        self.capture_ticks = 0
+
+    def _contest(self):
+        # Opponents in pickup range of a carried ball wear the owner down
+        owner = self.owner
+        lo = NUM_PLAYERS if owner < NUM_PLAYERS else 0
+        offset = self.pos[lo:lo + NUM_PLAYERS] - self.ball_pos
+        dist = np.hypot(offset[:, 0], offset[:, 1])
+        close = dist <= self.config.player.pickup_radius
+        if not close.any():
+            self.capture_ticks = 0
+            return
+        self.capture_ticks += 1
+        if self.capture_ticks >= self.config.ball.capture_ticks:
+            self.owner = lo + int(np.argmin(np.where(close, dist, np.inf)))
+            self.capture_ticks = 0
+
+    def _roll(self) -> Event:
+        config = self.config
+        self.ball_pos += self.ball_vel
+        self.ball_vel *= 1.0 - config.ball.friction
+
+        r = config.ball.radius
+        mouth = self.goal_height() * 0.5
+        in_mouth = abs(self.ball_pos[1] - self.height * 0.5) <= mouth
+        if self.ball_pos[0] < r:
+            if in_mouth:
+                return GOAL_B
+            self.ball_pos[0] = 2 * r - self.ball_pos[0]
+            self.ball_vel[0] = -self.ball_vel[0]
+        elif self.ball_pos[0] > self.width - r:
+            if in_mouth:
+                return GOAL_A
+            self.ball_pos[0] = 2 * (self.width - r) - self.ball_pos[0]
+            self.ball_vel[0] = -self.ball_vel[0]
+        if self.ball_pos[1] < r:
+            self.ball_pos[1] = 2 * r - self.ball_pos[1]
+            self.ball_vel[1] = -self.ball_vel[1]
+        elif self.ball_pos[1] > self.height - r:
+            self.ball_pos[1] = 2 * (self.height - r) - self.ball_pos[1]
+            self.ball_vel[1] = -self.ball_vel[1]
+
+        if self.possession == BallPossessionType.Passing:
+            if math.hypot(self.ball_vel[0], self.ball_vel[1]) < config.player.speed:
+                self.possession = BallPossessionType.Free
+                self.passer = -1
+        return None
+
+    def _pickup(self):
+        offset = self.pos - self.ball_pos
+        dist = np.hypot(offset[:, 0], offset[:, 1])
+        if self.passer >= 0:
+            dist[self.passer] = np.inf
+        nearest = int(np.argmin(dist))
+        if dist[nearest] <= self.config.player.pickup_radius:
+            self.possession = BallPossessionType.Possessed
+            self.owner = nearest
+            self.passer = -1
+            self.capture_ticks = 0
+            self.ball_pos[:] = self.pos[nearest]
+            self.ball_vel[:] = 0.0
+
+    def _stagnation(self) -> Event:
+        offset = self.ball_pos - self.stagnation_center
+        if math.hypot(offset[0], offset[1]) > self.config.ball.stagnation_radius:
+            self.stagnation_center[:] = self.ball_pos
+            self.stagnation_tick = self.tick
+            return None
+        if self.tick - self.stagnation_tick >= self.config.ball.stagnation_ticks:
+            return STAGNATION
+        return None
+
+    def _end_tick(self, event: Event) -> Event:
+        if event == GOAL_A:
+            self.score[0] += 1
+        elif event == GOAL_B:
+            self.score[1] += 1
+        self.tick += 1
+        if self.finished:
+            return FINISHED
+        if event is None and self.tick == self.config.max_ticks + 1:
+            return ENDGAME
+        return event
+
+
+class StateWriter:
+    """Writes a Match into a GameState buffer as one team sees it: its own
+    players first and its own goal at x = 0. The field views are taken once"""
+
+    def __init__(self, buffer, offset: int = 0):
+        from core.arrays import GAME_STATE_DTYPE
+        raw = np.frombuffer(buffer, dtype=GAME_STATE_DTYPE, count=1, offset=offset)
+        ball = raw["ball"]
+        possession = raw["_ball_possession"]
+        data = possession["data"]
+        players = raw["players"][0]
+        self.tick = raw["tick"]
+        self.ball_pos = ball["pos"][0]
+        self.ball_vel = ball["vel"][0]
+        self.ball_radius = ball["radius"]
+        self.possession_type = possession["type"]
+        self.owner = data["possessed"]["owner"]
+        self.owner_team = data["possessed"]["team"]
+        self.capture_ticks = data["possessed"]["capture_ticks"]
+        self.passing_team = data["passing"]["team"]
+        self.stagnation_center = raw["ball_stagnation"]["center"][0]
+        self.stagnation_tick = raw["ball_stagnation"]["tick"]
+        self.ids = players["id"]
+        self.pos = players["pos"]
+        self.dir = players["dir"]
+        self.speed = players["speed"]
+        self.radius = players["radius"]
+        self.pickup_radius = players["pickup_radius"]
+        self.score_self = raw["score"]["self"]
+        self.score_other = raw["score"]["other"]
+
+    def write(self, match: Match, team: int):
+        config = match.config
+        # Player i of this team's view is player `order[i]` in A's frame
+        order = np.roll(np.arange(2 * NUM_PLAYERS), -NUM_PLAYERS * team)
+        flip = team == Team.Other
+
+        def frame_pos(p):
+            return (match.width - p[..., 0], p[..., 1]) if flip else (p[..., 0], p[..., 1])
+
+        self.tick[0] = match.tick
+        self.ball_pos[:] = frame_pos(match.ball_pos)
+        self.ball_vel[:] = (-match.ball_vel[0], match.ball_vel[1]) if flip else match.ball_vel
+        self.ball_radius[0] = config.ball.radius
+
+        self.possession_type[0] = match.possession
+        if match.possession == BallPossessionType.Possessed:
+            owner = (match.owner - NUM_PLAYERS * team) % (2 * NUM_PLAYERS)
+            self.owner[0] = owner
+            self.owner_team[0] = Team.Self if owner < NUM_PLAYERS else Team.Other
+            self.capture_ticks[0] = match.capture_ticks
+        elif match.possession == BallPossessionType.Passing:
+            self.passing_team[0] = Team.Self if match.possession_team() == team else Team.Other
+        self.stagnation_center[:] = frame_pos(match.stagnation_center)
+        self.stagnation_tick[0] = match.stagnation_tick
+
+        pos = match.pos[order]
+        direction = match.dir[order]
+        if flip:
+            pos[:, 0] = match.width - pos[:, 0]
+            direction[:, 0] = -direction[:, 0]
+        self.ids[:] = np.arange(2 * NUM_PLAYERS)
+        self.pos[:] = pos
+        self.dir[:] = direction
+        self.speed[:] = config.player.speed
+        self.radius[:] = config.player.radius
+        self.pickup_radius[:] = config.player.pickup_radius
+
+        self.score_self[0] = match.score[team]
+        self.score_other[0] = match.score[1 - team]
+
+
+def to_team_a(team: int, width: float, xy: np.ndarray, is_position: bool) -> np.ndarray:
+    """Converts (..., 2) points or directions from `team`'s frame to A's"""
+    if team == Team.Self:
+        return xy
+    out = np.array(xy, dtype=np.float64)
+    out[..., 0] = width - out[..., 0] if is_position else -out[..., 0]
+    return out
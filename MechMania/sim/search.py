@@ -0,0 +1,205 @@
+"""Successive halving over StrategyParams, evaluated in simulation.
+
+Candidates are drawn around the current defaults (Gaussian, `--sigma` of
+each parameter's range, clipped to PARAM_BOUNDS); candidate 0 is the
+defaults themselves. Each rung plays every surviving candidate against the
+baseline for `games * eta**rung` games, both sides of the field and the same
+seeds for everyone, and keeps the best 1/eta. `--rungs 1` is plain random
+search.
+
+Every finished evaluation is written to the checkpoint before the next one
+is taken, so an interrupted search resumes from it with nothing replayed.
+
+Run from the MechMania directory:
+    python -m sim.search [--candidates N] [--eta E] [--rungs R] [--games G]
+                         [--ticks T] [--sigma S] [--seed S] [--workers W]
+                         [--checkpoint search.json]
+"""
+import os
+import json
+import math
+import random
+import argparse
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from core.conf import default_config
+from core.ipc import Strategy
+
+BASELINE = "modified_strategy:cheese_formation"
+
+# Fitness is points per game (win 1, draw 0.5) plus this much per goal of
+# goal difference per game, which separates the many drawn candidates
+GOAL_WEIGHT = 0.05
+
+
+class Evaluation(NamedTuple):
+    fitness: float
+    points: float           # per game
+    goal_diff: float        # per game
+    games: int
+
+
+def with_params(strategy: Strategy, params) -> Strategy:
+    """`strategy` with `params` installed around each call, so two sides in
+    one process can play with different constants"""
+    from strategy.params import set_params
+
+    def on_reset(score):
+        set_params(params)
+        return strategy.on_reset(score)
+
+    def on_tick(*args):
+        set_params(params)
+        return strategy.on_tick(*args)
+
+    return Strategy(on_reset, on_tick, strategy.in_place)
+
+
+def evaluate(vector: Sequence[float], seed: int, games: int, ticks: Optional[int], baseline: str) -> Evaluation:
+    """Plays params `vector` in modified_strategy against `baseline`, half the
+    games on each side; executed in the workers"""
+    from sim.batch import BatchMatch, StrategyPolicy, play
+    from sim.tournament import load_strategy
+    from strategy.params import StrategyParams, DEFAULT_PARAMS
+    config = default_config()
+    params = StrategyParams.from_vector(vector)
+    candidate = with_params(load_strategy(BASELINE), params)
+    opponent = with_params(load_strategy(baseline), DEFAULT_PARAMS)
+
+    points = goal_diff = 0.0
+    per_side = max(games // 2, 1)
+    for side in (0, 1):
+        random.seed(seed + side)
+        sides = (candidate, opponent) if side == 0 else (opponent, candidate)
+        match = BatchMatch(config, per_side, seed + side)
+        policies = tuple(StrategyPolicy(s, config, per_side, team).policy() for team, s in enumerate(sides))
+        score = play(match, policies, ticks).score
+        own, other = score[:, side], score[:, 1 - side]
+        points += float((own > other).sum() + 0.5 * (own == other).sum())
+        goal_diff += float((own - other).sum())
+    played = 2 * per_side
+    return Evaluation(
+        points / played + GOAL_WEIGHT * goal_diff / played,
+        points / played,
+        goal_diff / played,
+        played,
+    )
+
+
+def sample_candidates(n: int, sigma: float, seed: int) -> np.ndarray:
+    """(n, D) parameter vectors; row 0 is the defaults"""
+    from strategy.params import DEFAULT_PARAMS, PARAM_BOUNDS
+    rng = np.random.default_rng(seed)
+    low, high = PARAM_BOUNDS[:, 0], PARAM_BOUNDS[:, 1]
+    center = DEFAULT_PARAMS.to_vector()
+    samples = center + rng.normal(size=(n, len(center))) * sigma * (high - low)
+    samples[0] = center
+    return np.clip(samples, low, high)
+
+
+class Checkpoint:
+    """Finished evaluations by (rung, candidate), saved atomically to `path`"""
+
+    def __init__(self, path: Optional[Path], settings: Dict):
+        self.path = path
+        self.settings = settings
+        self.scores: Dict[str, Evaluation] = {}
+        if path is not None and path.exists():
+            data = json.loads(path.read_text())
+            if data["settings"] != settings:
+                raise ValueError(f"{path} was written by a search with different settings: {data['settings']}")
+            self.scores = {k: Evaluation(*v) for k, v in data["scores"].items()}
+
+    @staticmethod
+    def key(rung: int, candidate: int) -> str:
+        return f"{rung}:{candidate}"
+
+    def get(self, rung: int, candidate: int) -> Optional[Evaluation]:
+        return self.scores.get(self.key(rung, candidate))
+
+    def put(self, rung: int, candidate: int, evaluation: Evaluation):
+        self.scores[self.key(rung, candidate)] = evaluation
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"settings": self.settings, "scores": self.scores}))
+        os.replace(tmp, self.path)
+
+
+def successive_halving(
+        candidates: np.ndarray,
+        checkpoint: Checkpoint,
+        eta: int = 3,
+        rungs: int = 3,
+        games: int = 8,
+        ticks: Optional[int] = None,
+        seed: int = 0,
+        baseline: str = BASELINE,
+        workers: Optional[int] = None,
+        progress=None,
+) -> List[int]:
+    """Candidate indices that survive every rung, best first"""
+    survivors = list(range(len(candidates)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rung in range(rungs):
+            budget = games * eta ** rung
+            # Same seeds for every candidate of a rung, so they face the same games
+            rung_seed = seed * 1000 + rung * 10
+            futures = {
+                pool.submit(evaluate, candidates[c].tolist(), rung_seed, budget, ticks, baseline): c
+                for c in survivors if checkpoint.get(rung, c) is None
+            }
+            for future in as_completed(futures):
+                c = futures[future]
+                checkpoint.put(rung, c, future.result())
+                if progress is not None:
+                    progress(rung, c, checkpoint.get(rung, c))
+
+            ranked = sorted(survivors, key=lambda c: -checkpoint.get(rung, c).fitness)
+            keep = max(1, math.ceil(len(survivors) / eta)) if rung < rungs - 1 else len(survivors)
+            survivors = ranked[:keep]
+    return survivors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune StrategyParams in simulation")
+    parser.add_argument("--candidates", type=int, default=27)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--rungs", type=int, default=3)
+    parser.add_argument("--games", type=int, default=8, help="games per candidate in the first rung")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks per game")
+    parser.add_argument("--sigma", type=float, default=0.15, help="spread as a fraction of each range")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", type=Path, default=None)
+    args = parser.parse_args()
+
+    from strategy.params import StrategyParams
+    settings = {k: v for k, v in vars(args).items() if k not in ("workers", "checkpoint")}
+    checkpoint = Checkpoint(args.checkpoint, settings)
+    if checkpoint.scores:
+        print(f"resuming with {len(checkpoint.scores)} evaluations from {args.checkpoint}")
+
+    candidates = sample_candidates(args.candidates, args.sigma, args.seed)
+
+    def progress(rung: int, c: int, e: Evaluation):
+        print(f"rung {rung} candidate {c:>3}: fitness {e.fitness:+.3f}  "
+              f"points {e.points:.2f}  goals {e.goal_diff:+.2f}  ({e.games} games)")
+
+    ranked = successive_halving(
+        candidates, checkpoint, args.eta, args.rungs, args.games, args.ticks,
+        args.seed, args.baseline, args.workers, progress,
+    )
+    last = args.rungs - 1
+    print("\nfinal rung:")
+    for c in ranked:
+        e = checkpoint.get(last, c)
+        print(f"  candidate {c:>3} fitness {e.fitness:+.3f}" + ("  (defaults)" if c == 0 else ""))
+    print(f"\nbest: {StrategyParams.from_vector(candidates[ranked[0]])!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Round-robin tournaments between strategies on the batch simulator.
+
+Every ordered pair of entries plays `rounds` tasks of `games` games each, so
+both sides of the field are covered. Tasks run in a process pool and results
+stream back as they finish; each is appended to the results file as it
+arrives, so a crashed worker (or a crashed run) only costs unfinished tasks.
+Restarting with the same --out picks up where it stopped.
+
+Run from the MechMania directory:
+    python -m sim.tournament [--entries A B ...] [--rounds R] [--games G]
+                             [--ticks T] [--workers W] [--out results.jsonl]
+
+An entry is `tick_fn` or `tick_fn:formation_fn`. Plain names are looked up
+in strategy.main, dotted ones (`strategy.experimental.modified_strategy`)
+are imported from their module.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import importlib
+import itertools
+import numpy as np
+from pathlib import Path
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from core.conf import default_config
+from core.ipc import Strategy
+
+DEFAULT_ENTRIES = (
+    "modified_strategy:cheese_formation",
+    "new_strategy:rush_formation",
+    "ball_chase:goalee_formation",
+    "do_nothing:cheese_formation",
+)
+DEFAULT_FORMATION = "cheese_formation"
+
+# A task is retried this many times after its worker dies before it is dropped
+MAX_RETRIES = 2
+
+
+class Task(NamedTuple):
+    entry_a: str
+    entry_b: str
+    seed: int
+    games: int
+    ticks: Optional[int]
+
+    @property
+    def key(self) -> str:
+        return f"{self.entry_a}|{self.entry_b}|{self.seed}"
+
+
+class TaskResult(NamedTuple):
+    task: Task
+    goals: List[Tuple[int, int]]    # per game, (A, B)
+    tick_seconds: Tuple[float, float]   # time spent in each side's on_tick
+    game_ticks: int                 # ticks played times games
+    wall_seconds: float
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "task": self.task._asdict(),
+            "goals": self.goals,
+            "tick_seconds": self.tick_seconds,
+            "game_ticks": self.game_ticks,
+            "wall_seconds": self.wall_seconds,
+        })
+
+    @classmethod
+    def from_json(cls, line: str) -> "TaskResult":
+        data = json.loads(line)
+        return cls(
+            Task(**data["task"]),
+            [tuple(g) for g in data["goals"]],
+            tuple(data["tick_seconds"]),
+            data["game_ticks"],
+            data["wall_seconds"],
+        )
+
+
+def _resolve(name: str):
+    module, _, attr = name.rpartition(".")
+    return getattr(importlib.import_module(module or "strategy.main"), attr)
+
+
+def load_strategy(entry: str) -> Strategy:
+    """Strategy for an entry name"""
+    tick_name, _, formation_name = entry.partition(":")
+    return Strategy(_resolve(formation_name or DEFAULT_FORMATION), _resolve(tick_name))
+
+
+def _timed(on_tick, spent: List[float]):
+    def wrapper(view):
+        start = time.perf_counter()
+        actions = on_tick(view)
+        spent[0] += time.perf_counter() - start
+        return actions
+    return wrapper
+
+
+def play_task(task: Task) -> TaskResult:
+    """Runs one task; executed in the workers"""
+    from sim.batch import BatchMatch, BatchPolicy, StrategyPolicy, play
+    start = time.perf_counter()
+    random.seed(task.seed)
+    config = default_config()
+    match = BatchMatch(config, task.games, task.seed)
+
+    spent = [[0.0], [0.0]]
+    policies = []
+    for team, entry in enumerate((task.entry_a, task.entry_b)):
+        policy = StrategyPolicy(load_strategy(entry), config, task.games, team).policy()
+        policies.append(BatchPolicy(policy.on_reset, _timed(policy.on_tick, spent[team])))
+
+    result = play(match, tuple(policies), task.ticks)
+    return TaskResult(
+        task,
+        [(int(a), int(b)) for a, b in result.score],
+        (spent[0][0], spent[1][0]),
+        result.ticks * task.games,
+        time.perf_counter() - start,
+    )
+
+
+def schedule(entries: Sequence[str], rounds: int, games: int, ticks: Optional[int]) -> List[Task]:
+    """Every ordered pair of distinct entries, `rounds` times"""
+    return [
+        Task(a, b, seed, games, ticks)
+        for seed in range(rounds)
+        for a, b in itertools.permutations(entries, 2)
+    ]
+
+
+def _run_pool(queue: Deque[Task], workers: int, play: Callable[[Task], TaskResult],
+              crashed: List[Task], late: Optional[List[TaskResult]]) -> Iterator[TaskResult]:
+    """Runs tasks off `queue`, at most `workers` submitted at a time so every
+    submitted task is running. Stops when the pool breaks, with the tasks
+    that were running in `crashed`; the rest stay queued"""
+    pool = ProcessPoolExecutor(max_workers=workers)
+    running: Dict[Future, Task] = {}
+    try:
+        while queue or running:
+            while queue and len(running) < workers:
+                task = queue.popleft()
+                running[pool.submit(play, task)] = task
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                task = running.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    crashed.append(task)
+                except Exception as e:
+                    # The strategy itself failed; retrying will not help
+                    print(f"{task.key} failed: {e!r}", file=sys.stderr)
+            if broken:
+                # Everything still in flight died with the pool
+                crashed.extend(running.values())
+                running.clear()
+                return
+    finally:
+        # Closed early: running tasks finish anyway, queued ones never start
+        pool.shutdown(wait=True, cancel_futures=True)
+        if late is not None:
+            late.extend(f.result() for f in running if not f.cancelled() and f.exception() is None)
+
+
+def run_tournament(tasks: Sequence[Task], workers: Optional[int] = None,
+                   late: Optional[List[TaskResult]] = None, play: Callable[[Task], TaskResult] = play_task,
+                   ) -> Iterator[TaskResult]:
+    """Yields results as tasks finish. A worker crash breaks the pool; the
+    tasks that were running are then rerun one at a time, so only a task
+    that crashes on its own is charged a retry, and the pool is rebuilt for
+    the rest. Closing the iterator early cancels the tasks that have not
+    started; the results of those still running are added to `late`"""
+    workers = workers or os.cpu_count() or 1
+    queue = deque(tasks)
+    retries: Dict[str, int] = {}
+    while queue:
+        crashed: List[Task] = []
+        yield from _run_pool(queue, workers, play, crashed, late)
+        for task in crashed:
+            while True:
+                alone: List[Task] = []
+                yield from _run_pool(deque([task]), 1, play, alone, late)
+                if not alone:
+                    break
+                retries[task.key] = retries.get(task.key, 0) + 1
+                if retries[task.key] > MAX_RETRIES:
+                    print(f"dropping {task.key} after {MAX_RETRIES} worker crashes", file=sys.stderr)
+                    break
+
+
+class Standings:
+    """Running totals per entry"""
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, float]] = {}
+
+    def _row(self, entry: str) -> Dict[str, float]:
+        return self.rows.setdefault(entry, dict(
+            games=0, wins=0, draws=0, losses=0, goals_for=0, goals_against=0,
+            tick_seconds=0.0, game_ticks=0,
+        ))
+
+    def add(self, result: TaskResult):
+        goals = np.array(result.goals).reshape(-1, 2)
+        for side, entry in enumerate((result.task.entry_a, result.task.entry_b)):
+            own, other = goals[:, side], goals[:, 1 - side]
+            row = self._row(entry)
+            row["games"] += len(goals)
+            row["wins"] += int((own > other).sum())
+            row["draws"] += int((own == other).sum())
+            row["losses"] += int((own < other).sum())
+            row["goals_for"] += int(own.sum())
+            row["goals_against"] += int(other.sum())
+            row["tick_seconds"] += result.tick_seconds[side]
+            row["game_ticks"] += result.game_ticks
+
+    def table(self) -> str:
+        lines = [f"{'entry':<40} {'games':>6} {'W':>5} {'D':>5} {'L':>5} {'win%':>6} "
+                 f"{'GF':>6} {'GA':>6} {'us/tick':>8}"]
+        order = sorted(self.rows.items(), key=lambda kv: -(kv[1]["wins"] + 0.5 * kv[1]["draws"]) / max(kv[1]["games"], 1))
+        for entry, row in order:
+            games = max(row["games"], 1)
+            per_tick = row["tick_seconds"] / max(row["game_ticks"], 1) * 1e6
+            lines.append(
+                f"{entry:<40} {row['games']:>6} {row['wins']:>5} {row['draws']:>5} {row['losses']:>5} "
+                f"{row['wins'] / games:>6.1%} {row['goals_for']:>6} {row['goals_against']:>6} {per_tick:>8.1f}"
+            )
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between strategies")
+    parser.add_argument("--entries", nargs="+", default=list(DEFAULT_ENTRIES))
+    parser.add_argument("--rounds", type=int, default=2, help="tasks per ordered pair")
+    parser.add_argument("--games", type=int, default=8, help="games per task, played as one batch")
+    parser.add_argument("--ticks", type=int, default=None, help="ticks per game, default a full match")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--out", type=Path, default=None, help="append results here, and resume from it")
+    args = parser.parse_args()
+
+    standings = Standings()
+    done = set()
+    if args.out is not None and args.out.exists():
+        for line in args.out.read_text().splitlines():
+            if line.strip():
+                result = TaskResult.from_json(line)
+                standings.add(result)
+                done.add(result.task.key)
+
+    tasks = [t for t in schedule(args.entries, args.rounds, args.games, args.ticks) if t.key not in done]
+    print(f"{len(tasks)} tasks to play, {len(done)} already done, {args.workers or os.cpu_count()} workers")
+
+    out = open(args.out, "a") if args.out is not None else None
+    start = time.perf_counter()
+    try:
+        for i, result in enumerate(run_tournament(tasks, args.workers), 1):
+            if out is not None:
+                out.write(result.to_json() + "\n")
+                out.flush()
+            standings.add(result)
+            a, b = np.array(result.goals).reshape(-1, 2).sum(axis=0)
+            print(f"[{i}/{len(tasks)}] {result.task.entry_a} vs {result.task.entry_b} "
+                  f"seed {result.task.seed}: {a}-{b} in {result.wall_seconds:.1f}s")
+    finally:
+        if out is not None:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{elapsed:.1f}s wall")
+    print(standings.table())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Trains the strategy MLP in NumPy and writes it to soccer_weights.npz.
+
+The network is the one strategy.mlp runs: FEATURES inputs, ReLU hidden
+layers, tanh outputs, fitted to target outputs with mean squared error and
+minibatch Adam. Training data is a directory of shards, each an uncompressed
+.npz holding `x` (N, FEATURES) and `y` (N, OUTPUTS) float32 arrays (see
+ShardWriter). Shards are memory-mapped and read one block of rows at a time,
+shuffled within the block, so memory use does not grow with the data.
+
+Run from the MechMania directory:
+    python -m sim.train DATA_DIR [--out soccer_weights.npz] [--init weights.npz]
+                        [--hidden 128 64 32] [--epochs E] [--batch B] [--lr LR]
+                        [--holdout H] [--seed S]
+"""
+import os
+import time
+import argparse
+import numpy as np
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+from strategy.mlp import FEATURES, OUTPUTS, DEFAULT_WEIGHTS, MLP, load_npz, read_layers, save_layers
+
+HIDDEN = (128, 64, 32)
+
+# Rows read from a shard at once; the shuffle is within a block
+BLOCK_ROWS = 1 << 16
+
+
+class ShardWriter:
+    """Appends (x, y) rows and writes them out as a shard whenever `shard_rows` have collected"""
+
+    def __init__(self, directory: Path, shard_rows: int = 1 << 18, prefix: str = "shard"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shard_rows = shard_rows
+        self.prefix = prefix
+        self.count = len(list(self.directory.glob(f"{prefix}_*.npz")))
+        self.x: List[np.ndarray] = []
+        self.y: List[np.ndarray] = []
+        self.rows = 0
+
+    def add(self, x: np.ndarray, y: np.ndarray):
+        assert x.shape[1:] == (FEATURES,) and y.shape[1:] == (OUTPUTS,) and len(x) == len(y), \
+            f"expected (N, {FEATURES}) and (N, {OUTPUTS}), got {x.shape} and {y.shape}"
+        self.x.append(np.asarray(x, dtype=np.float32))
+        self.y.append(np.asarray(y, dtype=np.float32))
+        self.rows += len(x)
+        if self.rows >= self.shard_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        path = self.directory / f"{self.prefix}_{self.count:05d}.npz"
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, x=np.concatenate(self.x), y=np.concatenate(self.y))
+        os.replace(tmp, path)
+        self.count += 1
+        self.x, self.y, self.rows = [], [], 0
+
+
+class Shards:
+    """Memory-mapped shards of one directory"""
+
+    def __init__(self, paths: Sequence[Path]):
+        self.paths = list(paths)
+        self.arrays = [load_npz(p) for p in self.paths]
+        for path, a in zip(self.paths, self.arrays):
+            assert a["x"].shape[1:] == (FEATURES,) and a["y"].shape[1:] == (OUTPUTS,), f"{path} has the wrong shapes"
+
+    def __len__(self) -> int:
+        return sum(len(a["x"]) for a in self.arrays)
+
+    def blocks(self) -> List[Tuple[int, int]]:
+        return [(s, start) for s, a in enumerate(self.arrays) for start in range(0, len(a["x"]), BLOCK_ROWS)]
+
+    def block(self, shard: int, start: int) -> Tuple[np.ndarray, np.ndarray]:
+        a = self.arrays[shard]
+        return np.array(a["x"][start:start + BLOCK_ROWS]), np.array(a["y"][start:start + BLOCK_ROWS])
+
+    def batches(self, batch: int, rng: Optional[np.random.Generator] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Minibatches over every row once; blocks and rows in random order if `rng` is given"""
+        blocks = self.blocks()
+        if rng is not None:
+            blocks = [blocks[i] for i in rng.permutation(len(blocks))]
+        for shard, start in blocks:
+            x, y = self.block(shard, start)
+            if rng is not None:
+                order = rng.permutation(len(x))
+                x, y = x[order], y[order]
+            for i in range(0, len(x), batch):
+                yield x[i:i + batch], y[i:i + batch]
+
+
+def init_layers(sizes: Sequence[int], rng: np.random.Generator) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """He-initialized weights and zero biases for layer sizes `sizes`"""
+    weights = [(rng.standard_normal((a, b)) * np.sqrt(2.0 / a)).astype(np.float32) for a, b in zip(sizes, sizes[1:])]
+    return weights, [np.zeros(b, dtype=np.float32) for b in sizes[1:]]
+
+
+class Adam:
+    def __init__(self, params: List[np.ndarray], lr: float = 1e-3, beta1: float = 0.9, beta2: float = 0.999, eps: float = 1e-8):
+        self.params = params
+        self.lr, self.beta1, self.beta2, self.eps = lr, beta1, beta2, eps
+        self.m = [np.zeros_like(p) for p in params]
+        self.v = [np.zeros_like(p) for p in params]
+        self.t = 0
+
+    def step(self, grads: List[np.ndarray]):
+        self.t += 1
+        lr = self.lr * np.sqrt(1.0 - self.beta2 ** self.t) / (1.0 - self.beta1 ** self.t)
+        for p, g, m, v in zip(self.params, grads, self.m, self.v):
+            m *= self.beta1
+            m += (1.0 - self.beta1) * g
+            v *= self.beta2
+            v += (1.0 - self.beta2) * g * g
+            p -= lr * m / (np.sqrt(v) + self.eps)
+
+
+def loss_and_grads(model: MLP, x: np.ndarray, y: np.ndarray) -> Tuple[float, List[np.ndarray], List[np.ndarray]]:
+    """Mean squared error of one batch and its gradients for every weight and bias"""
+    activations = [x]
+    last = len(model.weights) - 1
+    for i, (w, b) in enumerate(zip(model.weights, model.biases)):
+        z = activations[-1] @ w
+        z += b
+        activations.append(np.maximum(z, 0.0) if i < last else np.tanh(z))
+    out = activations[-1]
+    diff = out - y
+    loss = float(np.mean(diff * diff))
+
+    # d loss / d pre-activation of the output layer, through tanh
+    delta = diff * (2.0 / diff.size) * (1.0 - out * out)
+    weight_grads, bias_grads = [], []
+    for i in range(last, -1, -1):
+        weight_grads.append(activations[i].T @ delta)
+        bias_grads.append(delta.sum(axis=0))
+        if i:
+            delta = delta @ model.weights[i].T
+            delta *= activations[i] > 0
+    return loss, weight_grads[::-1], bias_grads[::-1]
+
+
+def evaluate(model: MLP, shards: Shards, batch: int = 1 << 14) -> float:
+    total = rows = 0.0
+    for x, y in shards.batches(batch):
+        diff = model.forward(x) - y
+        total += float(np.sum(diff * diff))
+        rows += diff.size
+    return total / max(rows, 1.0)
+
+
+def train(
+        train_shards: Shards,
+        model: MLP,
+        epochs: int = 10,
+        batch: int = 512,
+        lr: float = 1e-3,
+        seed: int = 0,
+        holdout: Optional[Shards] = None,
+        progress=None,
+) -> MLP:
+    """Fits `model` in place and returns it"""
+    rng = np.random.default_rng(seed)
+    optimizer = Adam(model.weights + model.biases, lr)
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        total = batches = 0
+        for x, y in train_shards.batches(batch, rng):
+            loss, weight_grads, bias_grads = loss_and_grads(model, x, y)
+            optimizer.step(weight_grads + bias_grads)
+            total += loss
+            batches += 1
+        if progress is not None:
+            val = evaluate(model, holdout) if holdout is not None and len(holdout) else None
+            progress(epoch, total / max(batches, 1), val, time.perf_counter() - start)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the strategy MLP on shards of (x, y) rows")
+    parser.add_argument("data", type=Path, help="directory of .npz shards")
+    parser.add_argument("--out", type=Path, default=DEFAULT_WEIGHTS)
+    parser.add_argument("--init", type=Path, default=None, help="start from these weights")
+    parser.add_argument("--hidden", type=int, nargs="+", default=list(HIDDEN))
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=512)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--holdout", type=int, default=1, help="shards kept out for validation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = sorted(args.data.glob("*.npz"))
+    if not paths:
+        parser.error(f"no shards in {args.data}")
+    held = min(args.holdout, len(paths) - 1)
+    train_shards = Shards(paths[held:])
+    holdout = Shards(paths[:held])
+    print(f"{len(train_shards)} training rows in {len(paths) - held} shards, {len(holdout)} held out")
+
+    if args.init is not None:
+        weights, biases = read_layers(load_npz(args.init))
+        # Mapped arrays are read-only; training needs its own copies
+        model = MLP([np.array(w, dtype=np.float32) for w in weights], [np.array(b, dtype=np.float32) for b in biases])
+    else:
+        model = MLP(*init_layers([FEATURES, *args.hidden, OUTPUTS], np.random.default_rng(args.seed)))
+
+    def progress(epoch: int, loss: float, val: Optional[float], seconds: float):
+        held_out = f"  holdout {val:.5f}" if val is not None else ""
+        print(f"epoch {epoch:>3}: train {loss:.5f}{held_out}  ({seconds:.1f}s)")
+
+    train(train_shards, model, args.epochs, args.batch, args.lr, args.seed, holdout, progress)
+    tmp = args.out.with_name(args.out.name + ".tmp")
+    with open(tmp, "wb") as f:
+        save_layers(f, model.weights, model.biases)
+    os.replace(tmp, args.out)
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import sys
+import importlib
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# The packages are imported as `core` and `strategy` but live in Core/ and
+# Strategy/, which only resolves on case-insensitive filesystems
+for name, directory in (("core", "Core"), ("strategy", "Strategy")):
+    try:
+        importlib.import_module(name)
+    except ModuleNotFoundError:
+        spec = importlib.util.spec_from_file_location(
+            name, ROOT / directory / "__init__.py", submodule_search_locations=[str(ROOT / directory)])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
@@ -0,0 +1,16 @@
+from sim.ab import SPRT, ab_tasks, run_ab
+
+
+def test_tasks_add_up_to_max_games():
+    tasks = ab_tasks("a", "b", 8, 30, None)
+    assert [t.games for t in tasks] == [8, 8, 8, 6]
+    assert [(t.entry_a, t.seed) for t in tasks] == [("a", 0), ("b", 0), ("a", 1), ("b", 1)]
+
+
+def test_games_saved_counts_every_simulated_game():
+    # An impossible band: the test can never decide, so every game is played
+    sprt = SPRT(-1000.0, 1000.0, 1e-9, 1e-9)
+    result = run_ab("do_nothing", "do_nothing", sprt, games=2, max_games=5, ticks=5, workers=1)
+    assert result.decision is None
+    assert result.games_simulated == sprt.games == 5
+    assert result.games_saved == 0
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from core.conf import NUM_PLAYERS
+from core.replay import ReplayRecorder, RecordKind, HEADER_SIZE
+from core.state import BallPossessionType, Team
+from replay.analytics import Cache, Frames, Heatmap, Passes, Possession, Resets, Shots, HEATMAP_BINS
+from replay.reader import Replay
+
+POSSESSED, PASSING, FREE = BallPossessionType.Possessed, BallPossessionType.Passing, BallPossessionType.Free
+
+
+@pytest.fixture(scope="module")
+def frames(tmp_path_factory):
+    """Two runs split by a reset, in which we score:
+
+        0 we hold   1-2 our pass   3 we catch it   4 our shot   5 they intercept
+        reset
+        6 loose     7 their shot, never caught     8 loose
+    """
+    path = str(tmp_path_factory.mktemp("analytics") / "game.mmr")
+    ReplayRecorder(path, capacity=HEADER_SIZE + (1 << 16)).close()
+    with Replay(path, build_index=False) as empty:
+        dtype = empty.dtype
+    records = np.zeros(10, dtype=dtype)
+    records["kind"] = RecordKind.Tick
+    records["kind"][6] = RecordKind.Reset
+    ticks = np.flatnonzero(records["kind"] == RecordKind.Tick)
+    state = records["data"]["tick"]["state"]
+    possession = state["_ball_possession"]
+    state["tick"][ticks] = np.arange(9)
+    possession["type"][ticks] = [POSSESSED, PASSING, PASSING, POSSESSED, PASSING, POSSESSED, FREE, PASSING, FREE]
+    for i, owner in ((0, 0), (3, 2), (5, 5)):
+        possession["data"]["possessed"]["owner"][ticks[i]] = owner
+    for i, team in ((1, Team.Self), (2, Team.Self), (4, Team.Self), (7, Team.Other)):
+        possession["data"]["passing"]["team"][ticks[i]] = team
+    state["ball"]["vel"][ticks[1]] = (0.0, 5.0)
+    state["ball"]["pos"][ticks[4]] = (800.0, 300.0)
+    state["ball"]["vel"][ticks[4]] = (10.0, 0.0)
+    state["ball"]["pos"][ticks[7]] = (200.0, 300.0)
+    state["ball"]["vel"][ticks[7]] = (-5.0, 0.0)
+    state["score"]["self"][ticks[6:]] = 1
+    return Frames(path, records)
+
+
+def test_frames_split_runs_at_resets(frames):
+    assert len(frames) == 9
+    assert frames.starts.tolist() == [0, 6] and frames.stops.tolist() == [6, 9]
+    index, team = frames.pass_starts()
+    assert index.tolist() == [1, 4, 7] and team.tolist() == [Team.Self, Team.Self, Team.Other]
+
+
+def test_possession(frames):
+    partial = Possession().reduce(frames)
+    assert {k: int(v) for k, v in partial.items()} == dict(ticks=9, own=2, other=1, passing_own=3, passing_other=1)
+    figures = Possession().finish(partial)
+    assert figures["share"] == 2 / 3 and figures["loose"] == 2 / 9
+
+
+def test_passes(frames):
+    partial = Passes().reduce(frames)
+    assert partial["attempts"].tolist() == [2, 1]
+    assert partial["completed"].tolist() == [1, 0]
+    assert partial["intercepted"].tolist() == [1, 0]
+    assert Passes().finish(partial)["completion"] == 0.5
+
+
+def test_shots(frames):
+    partial = Shots().reduce(frames)
+    assert (int(partial["taken"]), int(partial["conceded"])) == (1, 1)
+
+
+def test_resets(frames):
+    partial = Resets().reduce(frames)
+    assert {k: int(v) for k, v in partial.items()} == dict(replays=1, goals_for=1, goals_against=0, stagnation=0, other=0)
+
+
+def test_heatmap(frames):
+    partial = Heatmap().reduce(frames)
+    assert partial["own"].shape == HEATMAP_BINS
+    assert partial["own"].sum() == partial["other"].sum() == 9 * NUM_PLAYERS
+    assert partial["ball"][40, 15] == 1 and partial["ball"].sum() == 9
+
+
+def test_partials_merge_and_survive_the_cache(frames, tmp_path):
+    reducer = Passes()
+    partial = reducer.reduce(frames)
+    total = reducer.merge(reducer.merge({}, partial), partial)
+    assert total["attempts"].tolist() == [4, 2]
+
+    cache = Cache(tmp_path / "cache")
+    file_hash = cache.file_hash(frames.path)
+    assert cache.load(file_hash) == {}
+    cache.store(file_hash, {reducer.key: partial})
+    loaded = cache.load(file_hash)[reducer.key]
+    assert {k: v.tolist() for k, v in loaded.items()} == {k: v.tolist() for k, v in partial.items()}
+    assert cache.file_hash(frames.path) == file_hash
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from core.replay import RecordKind, HEADER_SIZE
+from replay.archive import (Archive, QUANTIZED, decode_block, encode_block, errors, load_records, pack,
+                            _columns)
+from replay.reader import Replay
+from bench.archive import write_game
+
+
+@pytest.fixture(scope="module")
+def game(tmp_path_factory):
+    """A raw replay of 300 played ticks, with a reset, a NaN and a teleport
+    mixed in, and its records"""
+    path = str(tmp_path_factory.mktemp("archive") / "game.mmr")
+    write_game(path, 300)
+    with Replay(path, build_index=False) as replay:
+        records = replay.records.copy()
+    records["kind"][100] = RecordKind.Reset
+    records["data"]["tick"]["state"]["ball"]["pos"][150, 0] = np.nan
+    # Too far for an int16 delta
+    records["data"]["tick"]["state"]["players"]["pos"][200, 3, 0] += 1000.0
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE)
+        f.write(records.tobytes())
+    return path, records
+
+
+def _rows(records, rows) -> bytes:
+    # Byte for byte: indexing a structured array does not keep the padding
+    return b"".join(records[i:i + 1].tobytes() for i in rows)
+
+
+def _check(original, decoded):
+    assert decoded.dtype == original.dtype and len(decoded) == len(original)
+    for (path, step), error in zip(QUANTIZED, errors(original, decoded).values()):
+        assert error <= step / 2, path
+    # Rows that are not quantized come back byte for byte
+    exact = (original["kind"] != RecordKind.Tick) | np.isnan(original["data"]["tick"]["state"]["ball"]["pos"]).any(axis=1)
+    rows = np.flatnonzero(exact)
+    assert _rows(original, rows) == _rows(decoded, rows)
+    # So does everything outside the quantized fields of the other rows
+    a, b = (np.frombuffer(bytearray(r.tobytes()), dtype=r.dtype) for r in (original, decoded))
+    for x, y in zip(_columns(a["data"]["tick"], QUANTIZED), _columns(b["data"]["tick"], QUANTIZED)):
+        x[~exact] = 0.0
+        y[~exact] = 0.0
+    assert a.tobytes() == b.tobytes()
+
+
+def test_block_round_trip(game):
+    _, records = game
+    _check(records, decode_block(encode_block(records), records.dtype))
+
+
+def test_single_record_blocks(game):
+    _, records = game
+    for i in (0, 100, 150):
+        _check(records[i:i + 1], decode_block(encode_block(records[i:i + 1]), records.dtype))
+
+
+def test_blocks_walk_both_ways(game, tmp_path):
+    path, records = game
+    target = tmp_path / "game.mma"
+    with Replay(path, build_index=False) as replay, open(target, "wb") as f:
+        pack(replay, f, block_records=64)
+    with Archive(target) as archive:
+        assert len(archive) == 5
+        forwards = list(archive.blocks())
+        backwards = list(archive.blocks(reverse=True))
+        assert [len(b) for b in forwards] == [64, 64, 64, 64, 44]
+        assert [b.tobytes() for b in backwards] == [b.tobytes() for b in reversed(forwards)]
+        assert archive.block(3).tobytes() == forwards[3].tobytes()
+    decoded = load_records(target)
+    assert decoded.tobytes() == b"".join(b.tobytes() for b in forwards)
+    _check(records, decoded)
@@ -0,0 +1,79 @@
+import math
+import random
+import numpy as np
+from core.conf import default_config, NUM_PLAYERS
+from core.ipc import set_config, get_geometry
+from core.util import FastVec2
+from strategy.bounce import get_planner, plan_shot
+from strategy.context import TickContext
+from strategy.lanes import lane_gap, lane_gaps
+from bench.states import random_states
+
+
+def _setup():
+    config = default_config()
+    set_config(config)
+    geometry = get_geometry()
+    mouth = (geometry.own_goal.top.y, geometry.own_goal.bottom.y)
+    return config, geometry, mouth
+
+
+def test_plan_is_the_fastest_candidate_of_evaluate():
+    config, geometry, mouth = _setup()
+    goal = geometry.enemy_goal
+    rng = random.Random(0)
+    for game in random_states(300, config):
+        ctx = TickContext(game, config)
+        for targets in ((goal.top, goal.bottom), (goal.center,)):
+            planner = get_planner(geometry, targets)
+            args = (ctx.positions[rng.randrange(NUM_PLAYERS)], ctx.points[NUM_PLAYERS:], ctx.block_radius,
+                    config.player.pass_speed, config.ball.friction, mouth)
+            ticks, gap, first = planner.evaluate(*args)
+            shot = planner.plan(*args)
+            best = int(np.argmin(ticks))
+            if not math.isfinite(ticks[best]):
+                assert shot is None
+                continue
+            assert abs(shot.ticks - ticks[best]) < 1e-9
+            assert math.isclose(shot.gap, gap[best], rel_tol=1e-9)
+            assert abs(complex(shot.aim.x, shot.aim.y) - first[best]) < 1e-9
+
+
+def test_open_field_shoots_straight():
+    config, geometry, mouth = _setup()
+    target = geometry.enemy_goal.center
+    shooter = FastVec2(target.x - 100.0, target.y)
+    shot = get_planner(geometry, (target,)).plan(
+        shooter, np.zeros(0, np.complex128), 0.0, config.player.pass_speed, config.ball.friction, mouth)
+    assert shot.bounces == 0
+    assert abs(shot.direction.x - 1.0) < 1e-9 and abs(shot.direction.y) < 1e-9
+
+
+def test_blocked_shot_goes_off_a_wall():
+    config, geometry, mouth = _setup()
+    target = geometry.enemy_goal.center
+    # Close enough to the top wall for a bounce off it to stay in range
+    shooter = FastVec2(target.x - 100.0, target.y - 200.0)
+    blocker = np.array([complex(target.x - 50.0, target.y - 100.0)])
+    shot = get_planner(geometry, (target,)).plan(
+        shooter, blocker, 5.0, config.player.pass_speed, config.ball.friction, mouth)
+    assert shot is not None and shot.bounces >= 1 and shot.gap >= 5.0
+
+
+def test_plan_shot_is_cached_per_tick():
+    config, geometry, _ = _setup()
+    ctx = TickContext(random_states(1, config)[0], config)
+    targets = (geometry.enemy_goal.top, geometry.enemy_goal.bottom)
+    shooter = ctx.positions[0]
+    shot = plan_shot(shooter, targets, ctx)
+    assert len(ctx.shots) == 1
+    assert plan_shot(shooter, targets, ctx) is shot
+
+
+def test_lane_gap_matches_lane_gaps():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        start, end = rng.uniform(0, 100, 2) + 1j * rng.uniform(0, 100, 2)
+        blockers = rng.uniform(0, 100, 4) + 1j * rng.uniform(0, 100, 4)
+        expected = lane_gaps(np.array([start]), np.array([end - start]), blockers)[0]
+        assert math.isclose(lane_gap(complex(start), complex(end), blockers.tolist()), expected, rel_tol=1e-9)
@@ -0,0 +1,21 @@
+from core.conf import default_config
+from core.ipc import set_config
+from core.state import Score
+from strategy.main import RUSH_SLOTS, fixed_formation
+
+
+def test_fixed_formation_is_built_once_per_geometry():
+    formation = fixed_formation(RUSH_SLOTS)
+    config = default_config()
+    set_config(config)
+    positions = formation(Score())
+    assert formation(Score()) is positions
+    assert [(p.x, p.y) for p in positions] == [(config.field.width * fx, config.field.height * fy) for fx, fy in RUSH_SLOTS]
+
+    wider = default_config()
+    wider.field.width *= 2
+    set_config(wider)
+    rebuilt = formation(Score())
+    assert rebuilt is not positions
+    assert [p.x for p in rebuilt] == [2 * p.x for p in positions]
+    set_config(default_config())
@@ -0,0 +1,66 @@
+import math
+from core.conf import default_config
+from core.state import GameState, BallPossessionType
+from core.util import Vec2
+from strategy.intercept import intercept_time, intercept_point, intercept_times, ball_motion, ball_position_at
+
+
+def brute_force_time(player, ball, vel, friction, speed, reach, dt=1e-3, limit=2000.0):
+    t = 0.0
+    while t < limit:
+        b = ball_position_at(ball, vel, friction, t)
+        if math.hypot(b.x - player.x, b.y - player.y) <= speed * t + reach:
+            return t
+        t += dt
+    return None
+
+
+def test_intercept_time_matches_brute_force():
+    cases = [
+        (Vec2(0, 0), Vec2(100, 0), Vec2(-5, 0), 0.05, 3.0, 5.0),
+        (Vec2(0, 0), Vec2(50, 50), Vec2(10, -2), 0.02, 2.0, 0.0),
+        # A fast ball runs away, then slows down and gets caught
+        (Vec2(0, 0), Vec2(10, 0), Vec2(20, 0), 0.1, 1.5, 1.0),
+    ]
+    for case in cases:
+        expected = brute_force_time(*case)
+        assert abs(intercept_time(*case) - expected) < 1e-2
+
+
+def test_intercept_time_edge_cases():
+    assert intercept_time(Vec2(0, 0), Vec2(3, 4), Vec2(1, 0), 0.1, 2.0, reach=5.0) == 0.0
+    assert intercept_time(Vec2(0, 0), Vec2(10, 0), Vec2(0, 0), 0.1, 0.0) is None
+    # Without friction a ball faster than the player is never caught
+    assert intercept_time(Vec2(0, 0), Vec2(10, 0), Vec2(5, 0), 0.0, 2.0) is None
+    assert abs(intercept_time(Vec2(0, 0), Vec2(10, 0), Vec2(1, 0), 0.0, 2.0) - 10.0) < 1e-9
+
+
+def test_intercept_times_agrees_with_scalar():
+    players = [(0.0, 0.0), (200.0, 40.0), (-30.0, 80.0)]
+    ball, vel = (100.0, 50.0), (8.0, -3.0)
+    times = intercept_times(players, ball, vel, 0.05, 2.5, 1.0)
+    for (x, y), t in zip(players, times):
+        assert abs(t - intercept_time(Vec2(x, y), Vec2(*ball), Vec2(*vel), 0.05, 2.5, 1.0)) < 0.1
+
+
+def test_intercept_point_falls_back_to_the_ball_if_never_caught():
+    p = intercept_point(Vec2(0, 0), Vec2(10, 0), Vec2(5, 0), 0.0, 2.0)
+    assert (p.x, p.y) == (10.0, 0.0)
+
+
+def test_ball_motion_follows_the_carrier():
+    config = default_config()
+    game = GameState()
+    game.ball.pos = Vec2(10, 20)
+    game.ball.vel = Vec2(3, 4)
+    game._ball_possession.type = BallPossessionType.Free
+    pos, vel, friction = ball_motion(game, config)
+    assert (pos.x, pos.y, vel.x, vel.y, friction) == (10.0, 20.0, 3.0, 4.0, config.ball.friction)
+
+    game._ball_possession.type = BallPossessionType.Possessed
+    game._ball_possession.data.possessed.owner = 5
+    game.players[5].dir = Vec2(0, -2)
+    pos, vel, friction = ball_motion(game, config)
+    carried = config.player.speed * config.player.possession_slowdown
+    assert friction == 0.0
+    assert abs(vel.x) < 1e-9 and abs(vel.y + carried) < 1e-6
@@ -0,0 +1,69 @@
+import ctypes
+import asyncio
+from core.ipc import EngineChannel, EngineStatus, ProtocolId, Shm, Strategy, get_geometry, set_config
+from core.state import PlayerAction
+from core.util import Vec2
+from core.conf import NUM_PLAYERS, default_config
+from bench.alloc import respond_peak
+
+
+def _in_place_tick(game, actions):
+    # No loop: even a list iterator would be an allocation
+    actions[0].set_dir(1.0, 0.0)
+    actions[0].set_pass(0.0, 1.0)
+    actions[1].set(PASS)
+    actions[2].set_dir(1.0, 0.0)
+    actions[3].set_dir(0.0, 1.0)
+
+
+PASS = PlayerAction(Vec2(0, 1), Vec2(1, 0))
+
+
+def _list_tick(game):
+    return [PlayerAction(Vec2(1, 0), None) for _ in range(NUM_PLAYERS)]
+
+
+def _channel(tmp_path) -> EngineChannel:
+    path = tmp_path / "shm"
+    path.write_bytes(bytes(ctypes.sizeof(Shm)))
+    return EngineChannel(path, adaptive=False)
+
+
+def _tick(chan: EngineChannel, strategy: Strategy):
+    chan.shm.protocol.type = ProtocolId.TickMsg
+    chan.shm.sync = EngineStatus.Ready
+    asyncio.run(chan.handle_msg(strategy))
+
+
+def test_in_place_tick_allocates_nothing(tmp_path):
+    strategy = Strategy(lambda score: [], _in_place_tick, in_place=True)
+    with _channel(tmp_path) as chan:
+        chan._bind()
+        for _ in range(10):
+            _tick(chan, strategy)
+        assert respond_peak(chan, strategy, 1000) == 0
+        response = chan.shm.protocol.data.tick_response
+        answered = [(a.dir.x, a.dir.y, a.has_pass, a.ball_pass.x, a.ball_pass.y) for a in response]
+        # The views pin the mmap until they go
+        del response
+        assert answered == [(1.0, 0.0, True, 0.0, 1.0), (0.0, 1.0, True, 1.0, 0.0),
+                            (1.0, 0.0, False, 0.0, 0.0), (0.0, 1.0, False, 0.0, 0.0)]
+
+
+def test_allocations_are_detected(tmp_path):
+    # The list path builds PlayerActions every tick, which has to show
+    strategy = Strategy(lambda score: [], _list_tick)
+    with _channel(tmp_path) as chan:
+        chan._bind()
+        _tick(chan, strategy)
+        assert respond_peak(chan, strategy, 100) > 0
+
+
+def test_reinstalling_a_config_keeps_its_geometry():
+    config = default_config()
+    set_config(config, 0)
+    geometry = get_geometry()
+    set_config(config, 1)
+    assert get_geometry() is geometry
+    set_config(default_config(), 0)
+    assert get_geometry() is not geometry
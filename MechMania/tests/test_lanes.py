@@ -0,0 +1,52 @@
+import math
+import numpy as np
+from strategy.lanes import as_points, lane_clearance
+
+
+def slow_gap(origin, target, blockers):
+    # One blocker at a time, as the old per-pair checks did it
+    dx, dy = target[0] - origin[0], target[1] - origin[1]
+    length = math.hypot(dx, dy)
+    if length < 1.0:
+        return math.inf
+    gap = math.inf
+    for bx, by in blockers:
+        along = ((bx - origin[0]) * dx + (by - origin[1]) * dy) / length
+        if 0 <= along <= length:
+            gap = min(gap, abs((bx - origin[0]) * dy - (by - origin[1]) * dx) / length)
+    return gap
+
+
+def test_matches_one_lane_at_a_time():
+    rng = np.random.default_rng(0)
+    origins = rng.uniform(0, 100, (4, 2))
+    targets = rng.uniform(0, 100, (5, 2))
+    blockers = rng.uniform(0, 100, (4, 2))
+    clear, gap = lane_clearance(origins, targets, blockers, 5.0)
+    assert clear.shape == gap.shape == (4, 5)
+    for i, o in enumerate(origins):
+        for j, t in enumerate(targets):
+            expected = slow_gap(o, t, blockers)
+            assert math.isclose(gap[i, j], expected, rel_tol=1e-9, abs_tol=1e-9)
+            assert clear[i, j] == (expected >= 5.0)
+
+
+def test_blockers_outside_the_lane_do_not_count():
+    # Behind the origin, past the target, and right on the lane
+    blockers = [(-5.0, 0.0), (15.0, 0.0), (5.0, 1.0)]
+    clear, gap = lane_clearance((0.0, 0.0), [(10.0, 0.0), (0.0, 10.0)], blockers, 2.0)
+    assert gap.tolist() == [[1.0, 5.0]]
+    assert clear.tolist() == [[False, True]]
+
+
+def test_degenerate_lane_and_no_blockers_are_clear():
+    clear, gap = lane_clearance((0.0, 0.0), (0.5, 0.0), [(0.25, 0.0)], 1.0)
+    assert clear[0, 0] and math.isinf(gap[0, 0])
+    clear, gap = lane_clearance((0.0, 0.0), (10.0, 0.0), np.zeros((0, 2)), 1.0)
+    assert clear[0, 0] and math.isinf(gap[0, 0])
+
+
+def test_as_points_accepts_pairs_and_complex():
+    assert as_points((1.0, 2.0)).tolist() == [1 + 2j]
+    assert as_points([(1.0, 2.0), (3.0, 4.0)]).tolist() == [1 + 2j, 3 + 4j]
+    assert as_points(np.array([1 + 2j])).tolist() == [1 + 2j]
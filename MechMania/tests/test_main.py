@@ -0,0 +1,8 @@
+from strategy.main import STRATEGY_ENV, get_strategy, modified_strategy
+from strategy.mlp import mlp_strategy
+
+
+def test_get_strategy_plays_the_network_on_request(monkeypatch):
+    assert get_strategy(0).on_tick is modified_strategy
+    monkeypatch.setenv(STRATEGY_ENV, "mlp")
+    assert get_strategy(1).on_tick is mlp_strategy
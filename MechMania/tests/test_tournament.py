@@ -0,0 +1,29 @@
+import os
+from sim.tournament import Task, TaskResult, run_tournament
+
+
+def crash_on_seed_one(task: Task) -> TaskResult:
+    if task.seed == 1:
+        os._exit(1)
+    return TaskResult(task, [(1, 0)] * task.games, (0.0, 0.0), task.games, 0.0)
+
+
+def test_worker_crash_only_drops_the_crashing_task(capsys):
+    tasks = [Task("do_nothing", "do_nothing", seed, 1, 1) for seed in range(20)]
+    results = list(run_tournament(tasks, workers=2, play=crash_on_seed_one))
+    assert sorted(r.task.seed for r in results) == [s for s in range(20) if s != 1]
+    assert "dropping do_nothing|do_nothing|1" in capsys.readouterr().err
+
+
+def test_closing_early_reports_running_tasks():
+    tasks = [Task("do_nothing", "do_nothing", seed, 1, 1) for seed in range(20)]
+    late = []
+    results = run_tournament(tasks, workers=2, late=late, play=finish)
+    first = next(results)
+    results.close()
+    seeds = {first.task.seed} | {r.task.seed for r in late}
+    assert len(late) <= 2 and len(seeds) == 1 + len(late)
+
+
+def finish(task: Task) -> TaskResult:
+    return TaskResult(task, [(0, 0)] * task.games, (0.0, 0.0), task.games, 0.0)